@@ -1,11 +1,19 @@
 """
 Provides support for working with Algorand accounts
 """
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from contextlib import aclosing
+from dataclasses import dataclass
 from typing import Any, cast
 
+import msgpack  # type: ignore
+from algosdk.encoding import encode_address
 from algosdk.v2client.algod import AlgodClient
 
 from oysterpack.algorand import Address, MicroAlgos
+from oysterpack.core.asyncio.concurrency import map_concurrently
 from oysterpack.core.asyncio.task_manager import schedule_blocking_io_task
 
 
@@ -21,24 +29,193 @@ async def get_auth_address(address: Address, algod_client: AlgodClient) -> Addre
     If the account is not rekeyed, then the account is the authorized account, i.e., the account signs for itself.
     """
 
-    account_info = cast(
-        dict[str, Any],
-        await schedule_blocking_io_task(algod_client.account_info, address, "all"),
+    auth_address, _round = await get_auth_address_with_round(address, algod_client)
+    return auth_address
+
+
+async def get_auth_address_with_round(
+    address: Address, algod_client: AlgodClient
+) -> tuple[Address, int]:
+    """
+    :return: (auth address, round at which the account info was retrieved)
+    """
+
+    account = await get_account_summary(address, algod_client)
+    return account.auth_address, account.round
+
+
+@dataclass(slots=True)
+class AccountSummary:
+    """
+    Account fields that are retrieved by the lean account lookups
+    """
+
+    address: Address
+    amount: MicroAlgos
+    # if the account is not rekeyed, then the account is the auth address
+    auth_address: Address
+    # round at which the account info was retrieved
+    round: int
+
+
+def _decode_account_summary(address: Address, data: bytes) -> AccountSummary:
+    """
+    Decodes a msgpack encoded account info response.
+
+    Both the REST API field names and the ledger field names are supported.
+    """
+    account_info: dict[str, Any] = msgpack.unpackb(
+        data, raw=False, strict_map_key=False
+    )
+    auth_address = account_info.get("auth-addr", account_info.get("spend"))
+    if isinstance(auth_address, bytes):
+        auth_address = encode_address(auth_address)
+    return AccountSummary(
+        address=address,
+        amount=MicroAlgos(account_info.get("amount", account_info.get("algo", 0))),
+        auth_address=Address(auth_address) if auth_address else address,
+        round=account_info["round"],
     )
-    if "auth-addr" in account_info:
-        return Address(account_info["auth-addr"])
-    return address
 
 
-async def get_algo_balance(address: Address, algod_client: AlgodClient) -> MicroAlgos:
+async def get_account_summary(
+    address: Address, algod_client: AlgodClient
+) -> AccountSummary:
     """
-    Returns the authorized signing account for the specified address. This only applies to rekeyed acccounts.
-    If the account is not rekeyed, then the account is the authorized account, i.e., the account signs for itself.
+    Lean account lookup, which only retrieves the account's top level fields.
+
+    Notes
+    -----
+    - Asset holdings, created assets, created apps, and app local states are excluded. For accounts that hold many
+      assets or have opted into many apps, those make up almost all of the full account info response.
+    - The response is msgpack encoded, which is more compact than JSON and faster to decode.
     """
 
-    account_info = cast(
-        dict[str, Any],
-        await schedule_blocking_io_task(algod_client.account_info, address, "all"),
+    data = await schedule_blocking_io_task(
+        algod_client.algod_request,
+        "GET",
+        f"/accounts/{address}",
+        {"exclude": "all", "format": "msgpack"},
+        None,
+        None,
+        "msgpack",
     )
+    return _decode_account_summary(address, cast(bytes, data))
+
+
+async def get_account_summaries(
+    addresses: Iterable[Address],
+    algod_client: AlgodClient,
+    max_concurrency: int = 10,
+) -> dict[Address, AccountSummary]:
+    """
+    Bulk version of `get_account_summary()`.
+
+    :param max_concurrency: max number of concurrent algod requests
+    """
+
+    async def get(address: Address) -> AccountSummary:
+        return await get_account_summary(address, algod_client)
+
+    async with aclosing(
+        map_concurrently(get, set(addresses), max_concurrency)
+    ) as results:
+        return {address: account async for address, account in results}
+
+
+class AuthAddressCache:
+    """
+    Bounded LRU cache of account auth addresses, i.e., the addresses that are authorized to sign for the accounts.
+
+    Cache entries expire after `ttl_rounds` rounds. The cache tracks the current round via `observe_round()`,
+    which is fed the rounds observed in algod responses. Between observations, the current round is estimated
+    using the average round time.
+
+    Notes
+    -----
+    - If an account is rekeyed outside this process, then the cached auth address will be stale until it expires.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl_rounds: int = 10,
+        avg_round_time: float = 3.3,
+    ):
+        """
+        :param max_size: max number of cached auth addresses
+        :param ttl_rounds: number of rounds that a cached auth address is valid for
+        :param avg_round_time: average round time in seconds, used to estimate the current round
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        if ttl_rounds < 0:
+            raise ValueError("ttl_rounds must be >= 0")
+
+        self._max_size = max_size
+        self._ttl_rounds = ttl_rounds
+        self._avg_round_time = avg_round_time
+        # address -> (auth address, round)
+        self._entries: OrderedDict[Address, tuple[Address, int]] = OrderedDict()
+        self._last_round = 0
+        self._last_round_observed_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def current_round(self) -> int:
+        """
+        :return: estimated current round
+        """
+        elapsed = time.monotonic() - self._last_round_observed_at
+        return self._last_round + int(elapsed / self._avg_round_time)
+
+    def observe_round(self, round_num: int):
+        """
+        Records a round that was observed on chain.
+        """
+        if round_num > self._last_round:
+            self._last_round = round_num
+            self._last_round_observed_at = time.monotonic()
+
+    def get(self, address: Address) -> Address | None:
+        """
+        :return: None if the address is not cached or the cached entry has expired
+        """
+        entry = self._entries.get(address)
+        if entry is None:
+            return None
+        auth_address, round_num = entry
+        if self.current_round - round_num > self._ttl_rounds:
+            del self._entries[address]
+            return None
+        self._entries.move_to_end(address)
+        return auth_address
+
+    def put(self, address: Address, auth_address: Address, round_num: int):
+        """
+        :param round_num: round at which the auth address was retrieved or changed
+        """
+        self.observe_round(round_num)
+        self._entries[address] = (auth_address, round_num)
+        self._entries.move_to_end(address)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, address: Address | None = None):
+        """
+        :param address: if None, then all entries are invalidated
+        """
+        if address is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(address, None)
+
+
+async def get_algo_balance(address: Address, algod_client: AlgodClient) -> MicroAlgos:
+    """
+    Returns the account's ALGO balance.
+    """
 
-    return MicroAlgos(account_info["amount"])
+    return (await get_account_summary(address, algod_client)).amount
@@ -1,32 +1,257 @@
 """
 AsyncAlgodClient wraps an AlgodClient to enable
 """
+import asyncio
+import copy
+import logging
+import time
+from collections.abc import AsyncIterator, Iterable
+from contextlib import aclosing
 from typing import Any, cast
 
-from algosdk.transaction import (
-    GenericSignedTransaction,
-    SuggestedParams,
-    wait_for_confirmation,
-)
+from algosdk.transaction import GenericSignedTransaction, SuggestedParams
 from algosdk.v2client.algod import AlgodClient
 
 from oysterpack.algorand import Address, TxnId
-from oysterpack.algorand.accounts import get_auth_address
-from oysterpack.algorand.transactions import suggested_params_with_flat_flee
-from oysterpack.core.asyncio.task_manager import schedule_blocking_io_task
+from oysterpack.algorand.accounts import AuthAddressCache, get_auth_address_with_round
+from oysterpack.algorand.algod_metrics import (
+    AlgodRequestMetrics,
+    InstrumentedAlgodClient,
+)
+from oysterpack.algorand.algod_pool import AlgodClientPool
+from oysterpack.algorand.blocks import Block, BlockCheckpoint, follow_blocks
+from oysterpack.algorand.confirmations import (
+    ConfirmationTracker,
+    get_confirmation_tracker,
+)
+from oysterpack.core.asyncio.concurrency import map_concurrently
+from oysterpack.core.asyncio.task_manager import schedule, schedule_blocking_io_task
+
+_logger = logging.getLogger(__name__)
+
+
+class SuggestedParamsCache:
+    """
+    Caches the suggested transaction params retrieved from an algod node.
+
+    Cached params are refreshed in the background when they become stale, i.e., when a newer round is observed or
+    when the TTL expires. While the refresh is in flight, callers are served the stale params, which are still valid
+    for transactions because the params validity window spans many rounds. Callers only wait for algod when the cache
+    is empty, or the cached params are older than `max_age`.
+
+    Notes
+    -----
+    - The cache is bound to the algod client's network, i.e., it must not be shared across networks.
+    - Concurrent refreshes are coalesced into a single algod request.
+    """
+
+    def __init__(
+        self,
+        algod_client: AlgodClient,
+        ttl: float = 3.3,
+        max_age: float = 60.0,
+    ):
+        """
+        :param ttl: number of seconds after which the cached params are refreshed in the background
+        :param max_age: number of seconds after which callers wait for the cached params to be refreshed
+        """
+        if ttl < 0:
+            raise ValueError("ttl must be >= 0")
+        if max_age < ttl:
+            raise ValueError("max_age must be >= ttl")
+
+        self._algod_client = algod_client
+        self._ttl = ttl
+        self._max_age = max_age
+        self._suggested_params: SuggestedParams | None = None
+        self._retrieved_at = 0.0
+        self._last_round = 0
+        self._refresh_task: asyncio.Task[SuggestedParams] | None = None
+
+    @property
+    def suggested_params(self) -> SuggestedParams | None:
+        """
+        :return: cached suggested params, which may be stale
+        """
+        return self._suggested_params
+
+    def observe_round(self, round_num: int):
+        """
+        Records a round that was observed on chain. If the round is newer than the round of the cached params,
+        then the cached params are stale.
+        """
+        if round_num > self._last_round:
+            self._last_round = round_num
+
+    def invalidate(self):
+        """
+        Forces the next lookup to wait for fresh params.
+        """
+        self._suggested_params = None
+
+    def _is_stale(self) -> bool:
+        if self._suggested_params is None:
+            return True
+        return (
+            self._last_round > self._suggested_params.first
+            or time.monotonic() - self._retrieved_at > self._ttl
+        )
+
+    async def _retrieve(self) -> SuggestedParams:
+        suggested_params = await schedule_blocking_io_task(
+            self._algod_client.suggested_params
+        )
+        self._suggested_params = suggested_params
+        self._retrieved_at = time.monotonic()
+        self.observe_round(suggested_params.first)
+        return suggested_params
+
+    def _refresh(self) -> asyncio.Task[SuggestedParams]:
+        task = self._refresh_task
+        # tasks are bound to the event loop that they were created on
+        if (
+            task is None
+            or task.done()
+            or task.get_loop() is not asyncio.get_running_loop()
+        ):
+            task = schedule(f"{self.__class__.__name__}.refresh", self._retrieve())
+            task.add_done_callback(self._on_refresh_done)
+            self._refresh_task = task
+        return task
+
+    def _on_refresh_done(self, task: asyncio.Task[SuggestedParams]):
+        if not task.cancelled() and (err := task.exception()) is not None:
+            _logger.warning("failed to refresh suggested params: %s", err)
+
+    async def get(self, txn_count: int = 1) -> SuggestedParams:
+        """
+        Returns a copy of the cached suggested txn params using the min flat fee.
+
+        :param txn_count: specifies how many transactions to pay for
+        """
+        if txn_count < 1:
+            raise ValueError("txn_count must be >= 1")
+
+        suggested_params = self._suggested_params
+        if self._is_stale():
+            task = self._refresh()
+            if (
+                suggested_params is None
+                or time.monotonic() - self._retrieved_at > self._max_age
+            ):
+                # shielded because the refresh is shared with other callers
+                suggested_params = await asyncio.shield(task)
+
+        suggested_params = copy.copy(cast(SuggestedParams, suggested_params))
+        suggested_params.fee = suggested_params.min_fee * txn_count
+        suggested_params.flat_fee = True
+        return suggested_params
 
 
 class AsyncAlgodClient:
-    def __init__(self, client: AlgodClient):
+    def __init__(
+        self,
+        client: AlgodClient,
+        auth_address_cache: AuthAddressCache | None = None,
+        suggested_params_ttl: float = 3.3,
+        metrics: AlgodRequestMetrics | None = None,
+    ):
+        """
+        :param auth_address_cache: can be shared between clients - if None, then a new cache is created
+        :param suggested_params_ttl: number of seconds after which cached suggested params are refreshed
+        :param metrics: if specified, then algod requests are recorded. If the client is an AlgodClientPool, then
+                        each node's requests are recorded. Otherwise, the client is wrapped by an
+                        InstrumentedAlgodClient.
+        """
+        if metrics is not None:
+            if isinstance(client, AlgodClientPool):
+                client.instrument(metrics)
+            elif not isinstance(client, InstrumentedAlgodClient):
+                client = InstrumentedAlgodClient(client, metrics)
         self.__client = client
+        self.__metrics = metrics
+        self.__auth_address_cache = (
+            auth_address_cache if auth_address_cache else AuthAddressCache()
+        )
+        self.__suggested_params_cache = SuggestedParamsCache(
+            client, ttl=suggested_params_ttl
+        )
+        self.__confirmation_tracker = get_confirmation_tracker(client)
+
+    @property
+    def algod_client(self) -> AlgodClient:
+        return self.__client
+
+    @property
+    def metrics(self) -> AlgodRequestMetrics | None:
+        return self.__metrics
+
+    @property
+    def auth_address_cache(self) -> AuthAddressCache:
+        return self.__auth_address_cache
+
+    @property
+    def suggested_params_cache(self) -> SuggestedParamsCache:
+        return self.__suggested_params_cache
+
+    @property
+    def confirmation_tracker(self) -> ConfirmationTracker:
+        return self.__confirmation_tracker
+
+    def observe_round(self, round_num: int):
+        """
+        Records a round that was observed on chain, which is used to expire cached data.
+        """
+        self.__auth_address_cache.observe_round(round_num)
+        self.__suggested_params_cache.observe_round(round_num)
 
     async def get_auth_address(self, address: Address) -> Address:
-        return await get_auth_address(address, self.__client)
+        """
+        Auth addresses are cached.
+        """
+        if (auth_address := self.__auth_address_cache.get(address)) is not None:
+            return auth_address
+        auth_address, round_num = await get_auth_address_with_round(
+            address, self.__client
+        )
+        self.__auth_address_cache.put(address, auth_address, round_num)
+        self.__suggested_params_cache.observe_round(round_num)
+        return auth_address
+
+    async def get_auth_addresses(
+        self,
+        addresses: Iterable[Address],
+        max_concurrency: int = 10,
+    ) -> dict[Address, Address]:
+        """
+        Bulk version of `get_auth_address()`.
+        Auth addresses that are not cached are retrieved concurrently.
+
+        :param max_concurrency: max number of concurrent algod requests
+        """
+        auth_addresses: dict[Address, Address] = {}
+        uncached_addresses: set[Address] = set()
+        for address in addresses:
+            if (auth_address := self.__auth_address_cache.get(address)) is not None:
+                auth_addresses[address] = auth_address
+            else:
+                uncached_addresses.add(address)
+
+        async for address, auth_address in map_concurrently(
+            self.get_auth_address, uncached_addresses, max_concurrency
+        ):
+            auth_addresses[address] = auth_address
+        return auth_addresses
 
     async def suggested_params_with_flat_flee(
         self, txn_count: int = 1
     ) -> SuggestedParams:
-        return await suggested_params_with_flat_flee(self.__client, txn_count)
+        """
+        Suggested params are cached, and refreshed in the background.
+
+        :param txn_count: specifies how many transactions to pay for
+        """
+        return await self.__suggested_params_cache.get(txn_count)
 
     async def send_transaction(self, txn: GenericSignedTransaction) -> TxnId:
         return TxnId(
@@ -36,18 +261,78 @@ class AsyncAlgodClient:
             )
         )
 
-    async def wait_for_confirmation(self, txid: TxnId, wait_rounds: int = 0):
-        await schedule_blocking_io_task(
-            wait_for_confirmation, self.__client, txid, wait_rounds
+    async def send_transactions(self, txns: list[GenericSignedTransaction]) -> TxnId:
+        """
+        Sends the transactions in a single submission, i.e., the transactions must form an atomic transaction group.
+
+        :return: first transaction ID
+        """
+        return TxnId(
+            await schedule_blocking_io_task(
+                self.__client.send_transactions,
+                txns,
+            )
+        )
+
+    async def wait_for_confirmation(
+        self, txid: TxnId, wait_rounds: int = 0
+    ) -> dict[str, Any]:
+        """
+        Confirmations are tracked by the ConfirmationTracker that is shared by all users of the algod client.
+
+        :param wait_rounds: number of rounds to wait for before timing out - if 0, then 1000 rounds
+        :return: pending transaction info
+        """
+        txn_info = await self.__confirmation_tracker.wait_for_confirmation(
+            txid, wait_rounds
         )
+        self.observe_round(txn_info["confirmed-round"])
+        return txn_info
+
+    async def follow_blocks(
+        self,
+        start_round: int | None = None,
+        *,
+        prefetch: int = 4,
+        checkpoint: BlockCheckpoint | None = None,
+    ) -> AsyncIterator[Block]:
+        """
+        Yields blocks in round order, starting from `start_round`, and then follows the chain as new blocks are
+        produced. Blocks are retrieved in msgpack format, and prefetched up to `prefetch` rounds ahead.
+
+        Observed rounds are used to expire cached data.
+
+        :param start_round: if None, then the follower starts from the current round
+        :param checkpoint: if the checkpoint has been saved, then the follower resumes after the checkpoint round
+        """
+        async with aclosing(
+            follow_blocks(
+                self.__client,
+                start_round,
+                prefetch=prefetch,
+                checkpoint=checkpoint,
+            )
+        ) as blocks:
+            async for block in blocks:
+                self.observe_round(block.round)
+                yield block
 
     async def check_node_status(self):
         """
         Asserts that the algod node is caught up.
 
+        If the client is an AlgodClientPool, then all nodes are checked, and the status is retrieved from the
+        preferred healthy node.
+
         :raises AssertionError: if failed to connect to algod node
         :raises AssertionError: if algod node is not caught up
         """
+        if isinstance(self.__client, AlgodClientPool):
+            node_statuses = await schedule_blocking_io_task(self.__client.check_nodes)
+            if not any(node_status.healthy for node_status in node_statuses):
+                raise AssertionError(
+                    f"No healthy Algorand nodes are available: {node_statuses}"
+                )
         try:
             result = cast(
                 dict[str, Any], await schedule_blocking_io_task(self.__client.status)
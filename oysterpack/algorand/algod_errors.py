@@ -0,0 +1,15 @@
+"""
+Classifies algod request errors
+"""
+from algosdk.error import AlgodHTTPError, AlgodResponseError
+
+
+def is_node_error(err: Exception) -> bool:
+    """
+    Node errors, e.g., connection errors, 5xx responses, or rate limited requests, are caused by the algod node, i.e.,
+    the request can be retried or routed to another node.
+    Client errors, e.g., 404 or an invalid transaction, are caused by the request.
+    """
+    if isinstance(err, AlgodHTTPError):
+        return err.code is None or err.code == 429 or err.code >= 500
+    return isinstance(err, (OSError, AlgodResponseError))
@@ -0,0 +1,301 @@
+"""
+Per-endpoint algod request instrumentation
+
+InstrumentedAlgodClient wraps an AlgodClient, and records each outbound request into AlgodRequestMetrics, keyed by
+endpoint. Because all AlgodClient API methods are routed through `AlgodClient.algod_request()`, every request that is
+made via AsyncAlgodClient, or the `accounts` and `transactions` helpers, is instrumented.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+from algosdk.error import AlgodHTTPError, AlgodResponseError
+from algosdk.v2client.algod import AlgodClient, AlgodResponseType, ParamsType
+
+from oysterpack.core.asyncio.task_manager import schedule
+
+_logger = logging.getLogger(__name__)
+
+# latency histogram bucket upper bounds in seconds - the last bucket counts everything above 10 secs
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    float("inf"),
+)
+
+_address_len = 58
+_txid_len = 52
+_base32_chars = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ234567")
+
+# status that is recorded for requests that failed without an HTTP response, e.g., connection errors
+ERROR_STATUS = 0
+
+
+def endpoint_name(method: str, requrl: str) -> str:
+    """
+    Normalizes the request URL into an endpoint name, i.e., path parameters are replaced by placeholders,
+    e.g., `GET /accounts/{address}`, `GET /blocks/{id}`
+    """
+    segments = []
+    for segment in requrl.split("?", 1)[0].split("/"):
+        if segment.isdigit():
+            segment = "{id}"
+        elif len(segment) in (_address_len, _txid_len) and _base32_chars.issuperset(
+            segment
+        ):
+            segment = "{address}" if len(segment) == _address_len else "{txid}"
+        segments.append(segment)
+    return f"{method} {'/'.join(segments)}"
+
+
+@dataclass(slots=True)
+class EndpointStats:
+    """
+    Request stats for an algod endpoint
+    """
+
+    endpoint: str
+    count: int = 0
+    errors: int = 0
+    retries: int = 0
+    bytes_out: int = 0
+    bytes_in: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    # HTTP status code -> count - ERROR_STATUS is used when no HTTP response was received
+    status_codes: dict[int, int] = field(default_factory=dict)
+    # request counts per LATENCY_BUCKETS bucket
+    latency_histogram: list[int] = field(
+        default_factory=lambda: [0] * len(LATENCY_BUCKETS)
+    )
+
+    @property
+    def avg_time(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+    def latency_percentile(self, percentile: float) -> float:
+        """
+        :param percentile: [0.0, 1.0]
+        :return: upper bound of the histogram bucket that contains the percentile
+        """
+        if not 0 <= percentile <= 1:
+            raise ValueError("percentile must be between 0.0 and 1.0")
+        threshold = percentile * self.count
+        total = 0
+        for upper_bound, count in zip(
+            LATENCY_BUCKETS, self.latency_histogram, strict=True
+        ):
+            total += count
+            if total >= threshold and total > 0:
+                return upper_bound
+        return 0.0
+
+    def copy(self) -> "EndpointStats":
+        return EndpointStats(
+            endpoint=self.endpoint,
+            count=self.count,
+            errors=self.errors,
+            retries=self.retries,
+            bytes_out=self.bytes_out,
+            bytes_in=self.bytes_in,
+            total_time=self.total_time,
+            max_time=self.max_time,
+            status_codes=dict(self.status_codes),
+            latency_histogram=list(self.latency_histogram),
+        )
+
+
+class AlgodRequestMetrics:
+    """
+    Thread safe per-endpoint algod request metrics.
+
+    Recording a request is O(1), i.e., it is cheap enough to be always on.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, EndpointStats] = {}
+
+    def _stats(self, endpoint: str) -> EndpointStats:
+        if (stats := self._endpoints.get(endpoint)) is None:
+            stats = EndpointStats(endpoint)
+            self._endpoints[endpoint] = stats
+        return stats
+
+    def record(
+        self,
+        endpoint: str,
+        latency: float,
+        status: int,
+        bytes_out: int = 0,
+        bytes_in: int = 0,
+    ):
+        """
+        :param status: HTTP status code, or ERROR_STATUS if no HTTP response was received
+        """
+        bucket = bisect_left(LATENCY_BUCKETS, latency)
+        with self._lock:
+            stats = self._stats(endpoint)
+            stats.count += 1
+            if status == ERROR_STATUS or status >= 400:
+                stats.errors += 1
+            stats.bytes_out += bytes_out
+            stats.bytes_in += bytes_in
+            stats.total_time += latency
+            stats.max_time = max(stats.max_time, latency)
+            stats.status_codes[status] = stats.status_codes.get(status, 0) + 1
+            stats.latency_histogram[bucket] += 1
+
+    def record_retry(self, endpoint: str):
+        with self._lock:
+            self._stats(endpoint).retries += 1
+
+    def snapshot(self) -> dict[str, EndpointStats]:
+        """
+        :return: copy of the current stats per endpoint
+        """
+        with self._lock:
+            return {
+                endpoint: stats.copy() for endpoint, stats in self._endpoints.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def log_summary(self, logger: logging.Logger = _logger):
+        for stats in sorted(self.snapshot().values(), key=lambda stats: stats.endpoint):
+            logger.info(
+                "%s: count=%d errors=%d retries=%d avg=%.4fs p50<=%.4fs p99<=%.4fs max=%.4fs "
+                "bytes_out=%d bytes_in=%d status_codes=%s",
+                stats.endpoint,
+                stats.count,
+                stats.errors,
+                stats.retries,
+                stats.avg_time,
+                stats.latency_percentile(0.5),
+                stats.latency_percentile(0.99),
+                stats.max_time,
+                stats.bytes_out,
+                stats.bytes_in,
+                stats.status_codes,
+            )
+
+    def schedule_periodic_log(
+        self, interval: float, logger: logging.Logger = _logger
+    ) -> asyncio.Task:
+        """
+        Logs a summary every `interval` seconds, until the returned task is cancelled.
+        """
+        if interval <= 0:
+            raise ValueError("interval must be > 0")
+
+        async def log_periodically():
+            while True:
+                await asyncio.sleep(interval)
+                self.log_summary(logger)
+
+        return schedule(f"{self.__class__.__name__}.log", log_periodically())
+
+
+class InstrumentedAlgodClient(AlgodClient):
+    """
+    Wraps an AlgodClient, and records each request into AlgodRequestMetrics.
+
+    Notes
+    -----
+    - JSON responses are retrieved as bytes and decoded by this client, which enables the response size to be recorded.
+    - If the wrapped client is a plain AlgodClient, then the request is sent via `AlgodClient.algod_request()`, using
+      the wrapped client's address, token, and headers. Otherwise, e.g., for an AlgodClientPool, the request is
+      delegated to the wrapped client. To record each node's responses, instrument the pool's nodes, i.e., see
+      `AlgodClientPool.instrument()`.
+    - AlgodClient does not expose the HTTP status of successful responses. Thus, successful responses are recorded as
+      200, while error responses are recorded with their HTTP status.
+    """
+
+    def __init__(self, client: AlgodClient, metrics: AlgodRequestMetrics | None = None):
+        """
+        :param metrics: can be shared between clients - if None, then new metrics are created
+        """
+        super().__init__(
+            algod_token=client.algod_token,
+            algod_address=client.algod_address,
+            headers=client.headers,
+        )
+        self._client = client
+        self._metrics = metrics if metrics is not None else AlgodRequestMetrics()
+
+    @property
+    def metrics(self) -> AlgodRequestMetrics:
+        return self._metrics
+
+    def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params: ParamsType | None = None,
+        data: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        response_format: str | None = "json",
+    ) -> AlgodResponseType:
+        endpoint = endpoint_name(method, requrl)
+        bytes_out = len(data) if data else 0
+        start = time.perf_counter()
+        if type(self._client).algod_request is AlgodClient.algod_request:
+            send_request = super().algod_request
+        else:
+            send_request = self._client.algod_request
+        try:
+            response = send_request(
+                method,
+                requrl,
+                params,
+                data,
+                headers,
+                "bytes" if response_format == "json" else response_format,
+            )
+        except AlgodHTTPError as err:
+            self._metrics.record(
+                endpoint,
+                time.perf_counter() - start,
+                err.code if err.code is not None else ERROR_STATUS,
+                bytes_out,
+            )
+            raise
+        except Exception:
+            self._metrics.record(
+                endpoint, time.perf_counter() - start, ERROR_STATUS, bytes_out
+            )
+            raise
+
+        latency = time.perf_counter() - start
+        if not isinstance(response, bytes):
+            self._metrics.record(endpoint, latency, 200, bytes_out)
+            return response
+        self._metrics.record(endpoint, latency, 200, bytes_out, len(response))
+        if response_format != "json":
+            return response
+        if not response:
+            # some algod responses return 200 OK with an empty response
+            return {}
+        try:
+            return json.loads(response)
+        except ValueError as err:
+            raise AlgodResponseError(
+                "Failed to parse JSON response from algod"
+            ) from err
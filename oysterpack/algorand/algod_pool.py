@@ -0,0 +1,345 @@
+"""
+AlgodClientPool spreads algod requests over multiple algod nodes
+
+All AlgodClient API methods are routed through `AlgodClient.algod_request()`, which the pool overrides. Thus, the pool
+can be used anywhere an AlgodClient is used, e.g., it can be wrapped by an AsyncAlgodClient.
+"""
+import logging
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, cast
+
+from algosdk.v2client.algod import AlgodClient, AlgodResponseType, ParamsType
+
+from oysterpack.algorand.algod_errors import is_node_error
+from oysterpack.algorand.algod_metrics import (
+    AlgodRequestMetrics,
+    InstrumentedAlgodClient,
+    endpoint_name,
+)
+
+_logger = logging.getLogger(__name__)
+
+# long polling requests are never hedged, and their latency is not tracked
+_long_poll_path = "/status/wait-for-block-after/"
+
+
+@dataclass(slots=True)
+class AlgodNodeStatus:
+    url: str
+    # False if the node is ejected, e.g., because it failed, is catching up, or is lagging
+    healthy: bool
+    # exponentially weighted moving average request latency in seconds
+    latency: float
+    # last round reported by the node's status
+    last_round: int
+    # reason the node was ejected
+    reason: str | None
+
+
+class _AlgodNode:
+    def __init__(self, client: AlgodClient):
+        self.client = client
+        self.latency = 0.0
+        self.last_round = 0
+        self.ejected_until = 0.0
+        self.reason: str | None = None
+        self._lock = threading.Lock()
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def record_latency(self, latency: float, alpha: float):
+        with self._lock:
+            if self.latency == 0.0:
+                self.latency = latency
+            else:
+                self.latency += alpha * (latency - self.latency)
+
+    def eject(self, duration: float, reason: str):
+        with self._lock:
+            self.ejected_until = time.monotonic() + duration
+            self.reason = reason
+
+    def restore(self):
+        with self._lock:
+            self.ejected_until = 0.0
+            self.reason = None
+
+    def status(self) -> AlgodNodeStatus:
+        return AlgodNodeStatus(
+            url=self.client.algod_address,
+            healthy=self.is_available(time.monotonic()),
+            latency=self.latency,
+            last_round=self.last_round,
+            reason=self.reason,
+        )
+
+
+class AlgodClientPool(AlgodClient):
+    """
+    Routes algod requests to the lowest latency healthy node.
+
+    - Requests fail over to the next node on node errors, e.g., connection errors or 5xx responses. The failed node is
+      ejected for `eject_secs`.
+    - Nodes are health checked every `health_check_interval` seconds in the background. Nodes that are catching up,
+      or whose last round lags behind the most caught up node by more than `max_lag_rounds`, are ejected until the
+      next health check.
+    - GET requests are hedged: if the first node does not respond within the hedge delay, then the request is also
+      sent to the next node, and the first successful response is returned. The hedge delay adapts to the node's
+      latency, i.e., `max(min_hedge_delay, 2 * latency)`.
+
+    Notes
+    -----
+    - If all healthy nodes fail, then the request falls back to the ejected nodes, in ejection order. If all nodes are
+      ejected, then requests are still attempted against all nodes, in ejection order.
+    - Long polling requests, i.e., `status/wait-for-block-after`, are not hedged.
+    """
+
+    def __init__(
+        self,
+        clients: Sequence[AlgodClient],
+        *,
+        min_hedge_delay: float = 0.05,
+        max_lag_rounds: int = 2,
+        eject_secs: float = 5.0,
+        health_check_interval: float = 5.0,
+        latency_alpha: float = 0.2,
+        metrics: AlgodRequestMetrics | None = None,
+    ):
+        """
+        :param clients: algod node clients - all nodes must be on the same network
+        :param min_hedge_delay: min number of seconds to wait before hedging a GET request - 0 disables hedging
+        :param max_lag_rounds: nodes that lag behind the most caught up node by more rounds are ejected
+        :param eject_secs: number of seconds that a failed node is ejected for
+        :param health_check_interval: number of seconds between node health checks
+        :param latency_alpha: smoothing factor for the node latency moving averages
+        :param metrics: if specified, then failovers and hedged requests are recorded as retries
+        """
+        if not clients:
+            raise ValueError("at least 1 algod client is required")
+        if min_hedge_delay < 0:
+            raise ValueError("min_hedge_delay must be >= 0")
+        if max_lag_rounds < 0:
+            raise ValueError("max_lag_rounds must be >= 0")
+        if not 0 < latency_alpha <= 1:
+            raise ValueError("latency_alpha must be > 0 and <= 1")
+
+        super().__init__(
+            algod_token=clients[0].algod_token,
+            algod_address=clients[0].algod_address,
+            headers=clients[0].headers,
+        )
+        self._nodes = [_AlgodNode(client) for client in clients]
+        self._min_hedge_delay = min_hedge_delay
+        self._max_lag_rounds = max_lag_rounds
+        self._eject_secs = eject_secs
+        self._health_check_interval = health_check_interval
+        self._latency_alpha = latency_alpha
+        self._metrics = metrics
+        # pool requests run on their own threads because algod_request() is already called from worker threads
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(4, len(clients) * 4),
+            thread_name_prefix="AlgodClientPool",
+        )
+        self._health_check_lock = threading.Lock()
+        self._last_health_check = 0.0
+
+    @classmethod
+    def from_urls(
+        cls, urls: Sequence[str], token: str, **kwargs: Any
+    ) -> "AlgodClientPool":
+        return cls(
+            [AlgodClient(algod_token=token, algod_address=url) for url in urls],
+            **kwargs,
+        )
+
+    def node_statuses(self) -> list[AlgodNodeStatus]:
+        return [node.status() for node in self._nodes]
+
+    def instrument(self, metrics: AlgodRequestMetrics):
+        """
+        Records each node request, including health checks, and the pool's failovers and hedged requests as retries.
+        Nodes that are already instrumented are left as is.
+        """
+        for node in self._nodes:
+            if not isinstance(node.client, InstrumentedAlgodClient):
+                node.client = InstrumentedAlgodClient(node.client, metrics)
+        self._metrics = metrics
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def check_nodes(self) -> list[AlgodNodeStatus]:
+        """
+        Checks each node's status concurrently, and ejects nodes that are unreachable, catching up, or lagging.
+        Nodes that pass the check are restored.
+        """
+        self._last_health_check = time.monotonic()
+
+        def check(node: _AlgodNode) -> dict[str, Any] | None:
+            try:
+                return cast(dict[str, Any], self._call(node, ("GET", "/status")))
+            except Exception as err:
+                node.eject(self._eject_secs, f"status check failed: {err}")
+                return None
+
+        statuses = list(self._executor.map(check, self._nodes))
+        last_round = max(
+            (status["last-round"] for status in statuses if status is not None),
+            default=0,
+        )
+        for node, status in zip(self._nodes, statuses, strict=True):
+            if status is None:
+                continue
+            node.last_round = status["last-round"]
+            if status.get("catchup-time", 0) > 0:
+                node.eject(self._health_check_interval, "node is catching up")
+            elif last_round - node.last_round > self._max_lag_rounds:
+                node.eject(
+                    self._health_check_interval,
+                    f"node is lagging {last_round - node.last_round} rounds behind",
+                )
+            else:
+                node.restore()
+        return self.node_statuses()
+
+    def _run_health_check(self):
+        try:
+            self.check_nodes()
+        except Exception:
+            _logger.exception("algod node health check failed")
+        finally:
+            self._health_check_lock.release()
+
+    def _schedule_health_check(self):
+        if time.monotonic() - self._last_health_check < self._health_check_interval:
+            return
+        # only one health check runs at a time, and callers never wait for it
+        if self._health_check_lock.acquire(blocking=False):
+            self._last_health_check = time.monotonic()
+            try:
+                self._executor.submit(self._run_health_check)
+            except RuntimeError:
+                # executor has been shut down
+                self._health_check_lock.release()
+
+    def _select_nodes(self) -> tuple[list[_AlgodNode], list[_AlgodNode]]:
+        """
+        :return: (nodes ordered by preference, ejected nodes that are fallen back to if all preferred nodes fail)
+        """
+        now = time.monotonic()
+        available = sorted(
+            (node for node in self._nodes if node.is_available(now)),
+            key=lambda node: node.latency,
+        )
+        ejected = sorted(
+            (node for node in self._nodes if not node.is_available(now)),
+            key=lambda node: node.ejected_until,
+        )
+        if available:
+            return available, ejected
+        return ejected, []
+
+    def _call(
+        self,
+        node: _AlgodNode,
+        args: tuple[Any, ...],
+        *,
+        record_latency: bool = True,
+    ) -> AlgodResponseType:
+        start = time.perf_counter()
+        try:
+            result = node.client.algod_request(*args)
+        except Exception as err:
+            if is_node_error(err):
+                _logger.warning(
+                    "algod node failed [%s]: %s", node.client.algod_address, err
+                )
+                node.eject(self._eject_secs, f"request failed: {err}")
+            raise
+        if record_latency:
+            node.record_latency(time.perf_counter() - start, self._latency_alpha)
+        return result
+
+    def _record_retry(self, args: tuple[Any, ...]):
+        if self._metrics is not None:
+            self._metrics.record_retry(endpoint_name(args[0], args[1]))
+
+    def _request_with_failover(
+        self,
+        nodes: Sequence[_AlgodNode],
+        args: tuple[Any, ...],
+        *,
+        record_latency: bool = True,
+    ) -> AlgodResponseType:
+        last_err: Exception | None = None
+        for node in nodes:
+            if last_err is not None:
+                self._record_retry(args)
+            try:
+                return self._call(node, args, record_latency=record_latency)
+            except Exception as err:
+                if not is_node_error(err):
+                    raise
+                last_err = err
+        raise cast(Exception, last_err)
+
+    def _hedged_request(
+        self,
+        nodes: Sequence[_AlgodNode],
+        fallback_nodes: Sequence[_AlgodNode],
+        args: tuple[Any, ...],
+    ) -> AlgodResponseType:
+        primary, others = nodes[0], [*nodes[1:], *fallback_nodes]
+        primary_future = self._executor.submit(self._call, primary, args)
+        done, _ = wait(
+            [primary_future],
+            timeout=max(self._min_hedge_delay, 2 * primary.latency),
+        )
+        if done:
+            try:
+                return primary_future.result()
+            except Exception as err:
+                if not is_node_error(err):
+                    raise
+                self._record_retry(args)
+                return self._request_with_failover(others, args)
+
+        self._record_retry(args)
+        hedge_future = self._executor.submit(self._request_with_failover, others, args)
+        pending: set[Future] = {primary_future, hedge_future}
+        last_err: Exception | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as err:
+                    if not is_node_error(err):
+                        raise
+                    last_err = err
+        raise cast(Exception, last_err)
+
+    def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params: ParamsType | None = None,
+        data: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        response_format: str | None = "json",
+    ) -> AlgodResponseType:
+        self._schedule_health_check()
+        nodes, fallback_nodes = self._select_nodes()
+        args = (method, requrl, params, data, headers, response_format)
+        if requrl.startswith(_long_poll_path):
+            return self._request_with_failover(
+                [*nodes, *fallback_nodes], args, record_latency=False
+            )
+        if method == "GET" and len(nodes) > 1 and self._min_hedge_delay > 0:
+            return self._hedged_request(nodes, fallback_nodes, args)
+        return self._request_with_failover([*nodes, *fallback_nodes], args)
@@ -0,0 +1,164 @@
+"""
+Provides support for following the chain block by block
+"""
+import asyncio
+import os
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, cast
+
+import msgpack  # type: ignore
+from algosdk.v2client.algod import AlgodClient
+
+from oysterpack.core.asyncio.task_manager import schedule_blocking_io_task
+
+
+@dataclass(slots=True)
+class Block:
+    """
+    msgpack decoded block
+
+    The header and transactions use the ledger's msgpack field names, e.g., transaction addresses are raw 32 byte
+    public keys.
+    """
+
+    round: int
+    timestamp: int
+    # block header fields, excluding the transactions
+    header: dict[str, Any]
+    # signed transactions with apply data, i.e., ledger `SignedTxnInBlock` maps
+    txns: list[dict[str, Any]]
+
+
+def decode_block(data: bytes) -> Block:
+    """
+    Decodes a msgpack encoded block response.
+
+    Notes
+    -----
+    - algod encodes some binary values as msgpack strings, e.g., app state delta keys, byte slice values, and logs,
+      which may not be valid UTF-8. Such strings are decoded using the `surrogateescape` error handler, i.e., the raw
+      bytes are recovered via `value.encode("utf-8", "surrogateescape")`.
+    """
+    block: dict[str, Any] = msgpack.unpackb(
+        data, raw=False, strict_map_key=False, unicode_errors="surrogateescape"
+    )["block"]
+    txns = block.pop("txns", None) or []
+    return Block(
+        round=block.get("rnd", 0),
+        timestamp=block.get("ts", 0),
+        header=block,
+        txns=txns,
+    )
+
+
+def get_block(algod_client: AlgodClient, round_num: int) -> Block:
+    """
+    Retrieves the msgpack encoded block, which is more compact and faster to decode than the JSON encoded block.
+    """
+    return decode_block(cast(bytes, algod_client.block_info(round_num, "msgpack")))
+
+
+class BlockCheckpoint:
+    """
+    File based checkpoint that tracks the last processed block round.
+
+    The file is replaced atomically, i.e., a crash while saving leaves the previous checkpoint in place.
+    """
+
+    def __init__(self, path: Path):
+        self._path = path
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self) -> int | None:
+        """
+        :return: None if the checkpoint has not been saved
+        """
+        try:
+            return int(self._path.read_text().strip())
+        except FileNotFoundError:
+            return None
+
+    def save(self, round_num: int):
+        tmp_path = self._path.with_name(f"{self._path.name}.tmp")
+        with tmp_path.open("w") as file:
+            file.write(str(round_num))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self._path)
+
+
+async def follow_blocks(
+    algod_client: AlgodClient,
+    start_round: int | None = None,
+    *,
+    prefetch: int = 4,
+    checkpoint: BlockCheckpoint | None = None,
+) -> AsyncIterator[Block]:
+    """
+    Yields blocks in round order, starting from `start_round`, and then follows the chain as new blocks are produced.
+
+    Blocks that are available are prefetched concurrently, up to `prefetch` rounds ahead. When the follower reaches
+    the tip of the chain, it waits for the next block using `status/wait-for-block-after`.
+
+    Notes
+    -----
+    - If the checkpoint has been saved, then the follower resumes from the round after the checkpoint round,
+      i.e., `start_round` is ignored.
+    - The checkpoint is saved after the consumer has processed the block, i.e., when the consumer requests the next
+      block. Thus, a block may be processed again after a crash, but is never skipped.
+    - Request errors are raised. Use the checkpoint to resume.
+
+    :param start_round: if None, then the follower starts from the current round
+    :param prefetch: max number of blocks that are retrieved ahead of the consumer
+    """
+    if prefetch < 1:
+        raise ValueError("prefetch must be >= 1")
+
+    next_round: int | None = start_round
+    if checkpoint is not None:
+        checkpoint_round = await schedule_blocking_io_task(checkpoint.load)
+        if checkpoint_round is not None:
+            next_round = checkpoint_round + 1
+
+    status = cast(dict[str, Any], await schedule_blocking_io_task(algod_client.status))
+    last_round: int = status["last-round"]
+    if next_round is None:
+        next_round = last_round
+
+    # prefetched blocks in round order
+    pending: deque[asyncio.Task[Block]] = deque()
+    # next round to fetch
+    fetch_round = next_round
+    try:
+        while True:
+            while len(pending) < prefetch and fetch_round <= last_round:
+                pending.append(
+                    asyncio.create_task(
+                        schedule_blocking_io_task(get_block, algod_client, fetch_round)
+                    )
+                )
+                fetch_round += 1
+
+            if not pending:
+                status = cast(
+                    dict[str, Any],
+                    await schedule_blocking_io_task(
+                        algod_client.status_after_block, last_round
+                    ),
+                )
+                last_round = max(last_round, status["last-round"])
+                continue
+
+            block = await pending.popleft()
+            yield block
+            if checkpoint is not None:
+                await schedule_blocking_io_task(checkpoint.save, block.round)
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,361 @@
+"""
+Provides support for tracking transaction confirmations
+
+A single round driven tracker is used to wait for any number of transaction confirmations, i.e., instead of polling
+each transaction on its own thread.
+"""
+import asyncio
+import logging
+import weakref
+from collections.abc import Callable
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, TypeVar, cast
+
+from algosdk.error import (
+    AlgodHTTPError,
+    AlgodResponseError,
+    ConfirmationTimeoutError,
+    TransactionRejectedError,
+)
+from algosdk.v2client.algod import AlgodClient
+
+from oysterpack.algorand import TxnId
+from oysterpack.algorand.algod_errors import is_node_error
+from oysterpack.core.asyncio.concurrency import map_concurrently
+from oysterpack.core.asyncio.task_manager import schedule, schedule_blocking_io_task
+
+_logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# same default as algosdk.transaction.wait_for_confirmation()
+_default_wait_rounds = 1000
+
+# transient node errors are retried using exponential backoff
+_initial_retry_delay = 0.1
+_max_retry_delay = 5.0
+
+# number of consecutive block txids lookups that are not found before the endpoint is assumed to be unsupported
+_max_blocks_not_found = 3
+
+# errors that fail a single pending transaction info lookup, which is retried on a later round
+_txn_info_errors = (AlgodHTTPError, AlgodResponseError, OSError)
+
+
+def _is_transient_error(err: Exception) -> bool:
+    # 501 means the endpoint is not implemented by the node, i.e., retrying will not help
+    if isinstance(err, AlgodHTTPError) and err.code == 501:
+        return False
+    return is_node_error(err)
+
+
+@dataclass(slots=True)
+class _PendingTxn:
+    future: asyncio.Future[dict[str, Any]]
+    wait_rounds: int
+    # assigned by the tracker, once the current round is known
+    deadline: int | None = None
+    # number of callers that are waiting for the confirmation
+    waiters: int = 0
+
+
+class ConfirmationTracker:
+    """
+    Waits for transaction confirmations using a single background task.
+
+    Each round, the tracker:
+    1. waits for the next block using `status/wait-for-block-after`
+    2. retrieves the block's transaction IDs, and resolves the pending transactions that were confirmed in the block.
+       If a block is not found, e.g., because the request was routed to a lagging node, then the block is retried
+       on the next round. If the algod node does not support the block txids endpoint, then the tracker falls back
+       to checking each pending transaction's info with bounded concurrency.
+    3. fails the pending transactions whose round deadline has passed
+
+    Newly tracked transactions are checked using their pending transaction info, because they may have been
+    confirmed before they were tracked. Rejected transactions are never included in a block. Thus, pending transaction
+    info is also rechecked every `pending_check_rounds` rounds, which fails rejected transactions promptly.
+
+    Transient node errors, e.g., connection errors or 5xx responses, are retried using exponential backoff.
+
+    Notes
+    -----
+    - Thread usage is bounded by `max_concurrency`, independent of how many transactions are being tracked.
+    - The background task runs only while there are pending transactions.
+    - A transaction stops being tracked when all callers that are waiting for its confirmation are cancelled.
+    - Futures are bound to the event loop that the tracker is running on. While transactions are pending, the tracker
+      cannot be used from another event loop.
+    """
+
+    def __init__(
+        self,
+        algod_client: AlgodClient,
+        max_concurrency: int = 10,
+        pending_check_rounds: int = 4,
+    ):
+        """
+        :param max_concurrency: max number of concurrent algod requests
+        :param pending_check_rounds: number of rounds between pending transaction info rechecks
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        if pending_check_rounds < 1:
+            raise ValueError("pending_check_rounds must be >= 1")
+
+        self._algod_client = algod_client
+        self._max_concurrency = max_concurrency
+        self._pending_check_rounds = pending_check_rounds
+        self._pending: dict[TxnId, _PendingTxn] = {}
+        self._task: asyncio.Task | None = None
+        # set to False if the algod node does not support the block txids endpoint
+        self._block_txids_supported = True
+        self._blocks_not_found = 0
+
+    @property
+    def pending_count(self) -> int:
+        """
+        :return: number of transactions that are waiting to be confirmed
+        """
+        return len(self._pending)
+
+    async def wait_for_confirmation(
+        self, txid: TxnId, wait_rounds: int = 0
+    ) -> dict[str, Any]:
+        """
+        :param wait_rounds: number of rounds to wait for before timing out - if 0, then 1000 rounds
+        :return: pending transaction info
+        :raises ConfirmationTimeoutError: if the transaction is not confirmed within `wait_rounds`
+        :raises TransactionRejectedError: if the transaction was rejected from the transaction pool
+        """
+        if wait_rounds < 0:
+            raise ValueError("wait_rounds must be >= 0")
+
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done():
+            if self._task.get_loop() is not loop:
+                raise RuntimeError(
+                    "ConfirmationTracker is running on a different event loop"
+                )
+        else:
+            self._task = schedule(f"{self.__class__.__name__}.run", self._run())
+
+        if (pending_txn := self._pending.get(txid)) is None:
+            pending_txn = _PendingTxn(
+                future=loop.create_future(),
+                wait_rounds=wait_rounds if wait_rounds else _default_wait_rounds,
+            )
+            self._pending[txid] = pending_txn
+        pending_txn.waiters += 1
+        try:
+            # shielded because the future may be shared by multiple callers
+            return await asyncio.shield(pending_txn.future)
+        finally:
+            pending_txn.waiters -= 1
+            if not pending_txn.waiters and not pending_txn.future.done():
+                # all callers were cancelled, i.e., the transaction is no longer tracked
+                pending_txn.future.cancel()
+                if self._pending.get(txid) is pending_txn:
+                    del self._pending[txid]
+
+    def _resolve(self, txid: TxnId, txn_info: dict[str, Any]):
+        if (pending_txn := self._pending.pop(txid, None)) is None:
+            return
+        if not pending_txn.future.done():
+            pending_txn.future.set_result(txn_info)
+
+    def _fail(self, txid: TxnId, err: Exception):
+        if (pending_txn := self._pending.pop(txid, None)) is None:
+            return
+        if not pending_txn.future.done():
+            pending_txn.future.set_exception(err)
+
+    async def _run(self):
+        try:
+            status = cast(
+                dict[str, Any], await self._request(self._algod_client.status)
+            )
+            last_round: int = status["last-round"]
+            # next block whose txids are checked
+            next_block = last_round + 1
+            rounds_since_pending_check = 0
+            while self._remove_cancelled():
+                new_txids = [
+                    txid
+                    for txid, pending_txn in self._pending.items()
+                    if pending_txn.deadline is None
+                ]
+                for txid in new_txids:
+                    pending_txn = self._pending[txid]
+                    pending_txn.deadline = last_round + pending_txn.wait_rounds
+                await self._check_pending_txns(new_txids)
+                if not self._pending:
+                    break
+
+                status = cast(
+                    dict[str, Any],
+                    await self._request(
+                        self._algod_client.status_after_block, last_round
+                    ),
+                )
+                current_round: int = status["last-round"]
+                rounds_since_pending_check += current_round - last_round
+                last_round = current_round
+
+                if self._block_txids_supported:
+                    while next_block <= last_round and await self._check_block(
+                        next_block
+                    ):
+                        next_block += 1
+                tracked_txids = [
+                    txid
+                    for txid, pending_txn in self._pending.items()
+                    if pending_txn.deadline is not None
+                ]
+                if not self._block_txids_supported:
+                    await self._check_pending_txns(tracked_txids)
+                    next_block = last_round + 1
+                elif rounds_since_pending_check >= self._pending_check_rounds:
+                    rounds_since_pending_check = 0
+                    await self._check_pending_txns(tracked_txids)
+
+                # transactions may be confirmed in blocks that have not been checked yet
+                checked_round = next_block - 1
+                for txid, pending_txn in list(self._pending.items()):
+                    if pending_txn.deadline is not None and (
+                        checked_round >= pending_txn.deadline
+                    ):
+                        self._fail(
+                            txid,
+                            ConfirmationTimeoutError(
+                                f"Wait for transaction id {txid} timed out"
+                            ),
+                        )
+        except Exception as err:
+            _logger.exception("confirmation tracker failed")
+            for txid in list(self._pending):
+                self._fail(txid, err)
+
+    async def _request(self, func: Callable[..., _T], *args: Any) -> _T:
+        """
+        Transient node errors are retried using exponential backoff, while there are pending transactions.
+        """
+        retry_delay = _initial_retry_delay
+        while True:
+            try:
+                return await schedule_blocking_io_task(func, *args)
+            except Exception as err:
+                if not _is_transient_error(err) or not self._remove_cancelled():
+                    raise
+                _logger.warning(
+                    "algod request failed - retrying in %ss: %s", retry_delay, err
+                )
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, _max_retry_delay)
+
+    def _remove_cancelled(self) -> bool:
+        """
+        :return: True if there are pending transactions
+        """
+        for txid, pending_txn in list(self._pending.items()):
+            if pending_txn.future.done():
+                del self._pending[txid]
+        return bool(self._pending)
+
+    async def _check_block(self, round_num: int) -> bool:
+        """
+        :return: False if the block was not checked, i.e., the block was not found, or the algod node does not support
+                 the block txids endpoint
+        """
+        try:
+            result = cast(
+                dict[str, Any],
+                await self._request(
+                    self._algod_client.algod_request,
+                    "GET",
+                    f"/blocks/{round_num}/txids",
+                ),
+            )
+        except AlgodHTTPError as err:
+            if err.code == 404:
+                # the block may not be available yet on the node that served the request, e.g., a lagging node
+                self._blocks_not_found += 1
+                if self._blocks_not_found < _max_blocks_not_found:
+                    return False
+            elif err.code != 501:
+                raise
+            _logger.info(
+                "block txids are not supported by the algod node - falling back to pending transaction info"
+            )
+            self._block_txids_supported = False
+            return False
+        self._blocks_not_found = 0
+
+        confirmed_txids = [
+            TxnId(txid)
+            for txid in result.get("blockTxids") or []
+            if txid in self._pending
+        ]
+
+        async def get_txn_info(txid: TxnId) -> dict[str, Any]:
+            try:
+                return cast(
+                    dict[str, Any],
+                    await schedule_blocking_io_task(
+                        self._algod_client.pending_transaction_info, txid
+                    ),
+                )
+            except _txn_info_errors:
+                # the transaction may have been purged from the node's pending transaction cache
+                return {"confirmed-round": round_num}
+
+        async with aclosing(
+            map_concurrently(get_txn_info, confirmed_txids, self._max_concurrency)
+        ) as results:
+            async for txid, txn_info in results:
+                self._resolve(txid, txn_info)
+        return True
+
+    async def _check_pending_txns(self, txids: list[TxnId]):
+        async def get_txn_info(txid: TxnId) -> dict[str, Any] | None:
+            try:
+                return cast(
+                    dict[str, Any],
+                    await schedule_blocking_io_task(
+                        self._algod_client.pending_transaction_info, txid
+                    ),
+                )
+            except _txn_info_errors:
+                # the request may have been routed to a node that has not seen the transaction, or the node failed,
+                # i.e., the transaction is checked again on a later round
+                return None
+
+        async with aclosing(
+            map_concurrently(get_txn_info, txids, self._max_concurrency)
+        ) as results:
+            async for txid, txn_info in results:
+                if txn_info is None:
+                    continue
+                if txn_info.get("pool-error"):
+                    self._fail(
+                        txid,
+                        TransactionRejectedError(
+                            f"Transaction rejected: {txn_info['pool-error']}"
+                        ),
+                    )
+                elif txn_info.get("confirmed-round"):
+                    self._resolve(txid, txn_info)
+
+
+__trackers: weakref.WeakKeyDictionary[
+    AlgodClient, ConfirmationTracker
+] = weakref.WeakKeyDictionary()
+
+
+def get_confirmation_tracker(algod_client: AlgodClient) -> ConfirmationTracker:
+    """
+    :return: the ConfirmationTracker that is shared by all users of the algod client
+    """
+    if (tracker := __trackers.get(algod_client)) is None:
+        tracker = ConfirmationTracker(algod_client)
+        __trackers[algod_client] = tracker
+    return tracker
@@ -0,0 +1,3 @@
+"""
+In-process emulators for Algorand services, which are used for offline tests and benchmarks
+"""
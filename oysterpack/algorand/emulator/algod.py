@@ -0,0 +1,708 @@
+"""
+In-process algod emulators, which speak the subset of the algod REST API that is used by this package
+
+The emulators are designed for offline tests and benchmarks, i.e., they enable algod clients (`AsyncAlgodClient`,
+`accounts`, `transactions`) to be tested, and performance features to be benchmarked repeatably, without an Algorand
+node.
+
+- AlgodEmulator emulates a ledger that supports ALGO payments and rekeys. Rounds only advance when blocks are produced,
+  i.e., the emulated chain is deterministic.
+- AlgodRecorder proxies requests to a real algod node, and records the responses to a file.
+- AlgodReplayer serves the recorded responses.
+
+Latency and faults can be injected per request.
+
+Supported endpoints:
+- GET /health
+- GET /versions
+- GET /v2/status
+- GET /v2/status/wait-for-block-after/{round}
+- GET /v2/transactions/params
+- GET /v2/accounts/{address}
+- POST /v2/transactions
+- GET /v2/transactions/pending/{txid}
+- GET /v2/blocks/{round}
+- GET /v2/blocks/{round}/txids
+"""
+import base64
+import json
+import logging
+import re
+import threading
+import time
+import urllib.error
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+from urllib.request import Request, urlopen
+
+import msgpack  # type: ignore
+from algosdk import constants, encoding
+from nacl.exceptions import BadSignatureError
+from nacl.signing import VerifyKey
+
+from oysterpack.algorand.emulator.server import (
+    EmulatorServer,
+    Response,
+    _json_content_type,
+)
+
+_logger = logging.getLogger(__name__)
+
+_msgpack_content_type = "application/msgpack"
+
+# min account balance in microalgos
+_min_balance = 100_000
+_consensus_version = "https://github.com/algorandfoundation/specs/tree/abd3d4823c6f77349fc04c3af7b1e99fe4df699f"
+# emulated block timestamps start at the genesis timestamp, and advance by the round time
+_genesis_timestamp = 1_700_000_000
+_round_secs = 3
+
+# msgpack transaction fields that hold addresses - all other bytes fields are base64 encoded in JSON responses
+_address_fields = frozenset(
+    ("snd", "rcv", "close", "rekey", "sgnr", "arcv", "asnd", "aclose", "fadd")
+)
+
+
+class _AlgodError(Exception):
+    def __init__(self, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+def _to_json(value: object, key: str | None = None) -> object:
+    """
+    Converts msgpack decoded values into JSON values: addresses are base32 encoded, and other bytes are base64 encoded.
+    """
+    if isinstance(value, dict):
+        return {k: _to_json(v, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_json(v) for v in value]
+    if isinstance(value, bytes):
+        if key in _address_fields and len(value) == constants.key_len_bytes:
+            return encoding.encode_address(value)
+        return base64.b64encode(value).decode()
+    return value
+
+
+class _AlgodService(EmulatorServer):
+    """
+    Base class for the in-process algod servers
+    """
+
+    auth_header = constants.algod_auth_header
+
+
+@dataclass(slots=True)
+class _Account:
+    amount: int = 0
+    # None if the account is not rekeyed
+    auth_address: str | None = None
+
+
+@dataclass(slots=True)
+class _TxnInfo:
+    stxn: dict[str, Any]
+    confirmed_round: int = 0
+    pool_error: str = ""
+
+
+class AlgodEmulator(_AlgodService):
+    """
+    In-process algod server, which emulates a ledger that supports ALGO payments and rekeys
+
+    >>> with AlgodEmulator() as emulator:
+    ...     emulator.fund(address, 1_000_000)
+    ...     algod_client = AsyncAlgodClient(AlgodClient(emulator.token, emulator.url))
+
+    Rounds only advance when blocks are produced:
+    - In dev mode, which is the default, each transaction submission is confirmed in its own block.
+    - Otherwise, submitted transactions are pending until `advance()` is called, which confirms them in the next block.
+
+    Notes
+    -----
+    - Payments, close-outs, rekeys, fees, and the min balance are applied. Other transaction types are accepted, but
+      only their fees are applied.
+    - Transaction signatures are verified against the sender's auth address. Multisig and logic sig transactions are
+      accepted without verification.
+    - Injected latency and faults can be changed while the server is running.
+    """
+
+    def __init__(
+        self,
+        token: str | None = None,
+        latency: float = 0.0,
+        fault_rate: float = 0.0,
+        seed: int | None = None,
+        *,
+        dev_mode: bool = True,
+        genesis_id: str = "emulator-v1",
+        min_fee: int = constants.MIN_TXN_FEE,
+        wait_timeout: float = 60.0,
+    ):
+        """
+        :param dev_mode: if True, then each transaction submission is confirmed in its own block
+        :param genesis_id: the genesis hash is derived from the genesis ID
+        :param wait_timeout: max number of seconds that `status/wait-for-block-after` waits for the next block
+        """
+        super().__init__(token, latency, fault_rate, seed)
+        self.dev_mode = dev_mode
+        self.genesis_id = genesis_id
+        self.genesis_hash = encoding.checksum(genesis_id.encode())
+        self.min_fee = min_fee
+        self.wait_timeout = wait_timeout
+
+        # guards the ledger state, and is notified when a block is produced
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._round = 0
+        self._accounts: dict[str, _Account] = {}
+        self._txns: dict[str, _TxnInfo] = {}
+        # submitted transaction groups that are waiting for the next block
+        self._pool: list[list[tuple[str, dict[str, Any]]]] = []
+        self._blocks: dict[int, dict[str, Any]] = {0: self._block_header(0)}
+        self._block_txids: dict[int, list[str]] = {0: []}
+
+        self._routes: list[tuple[str, re.Pattern, Callable[[re.Match, bytes], Any]]] = [
+            (method, re.compile(f"^{pattern}$"), route)
+            for method, pattern, route in (
+                ("GET", "/health", self._health),
+                ("GET", "/versions", self._versions),
+                ("GET", "/v2/status", self._status),
+                (
+                    "GET",
+                    r"/v2/status/wait-for-block-after/(\d+)",
+                    self._wait_for_block_after,
+                ),
+                ("GET", "/v2/transactions/params", self._suggested_params),
+                ("GET", "/v2/accounts/([A-Z2-7]{58})", self._account_info),
+                ("POST", "/v2/transactions", self._send_transactions),
+                (
+                    "GET",
+                    "/v2/transactions/pending/([A-Z2-7]{52})",
+                    self._pending_transaction_info,
+                ),
+                ("GET", r"/v2/blocks/(\d+)", self._block),
+                ("GET", r"/v2/blocks/(\d+)/txids", self._block_txids_info),
+            )
+        ]
+
+    @property
+    def round(self) -> int:
+        """
+        :return: last round
+        """
+        return self._round
+
+    def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._stopping = False
+        super().start(host, port)
+
+    def stop(self):
+        # wakes up requests that are waiting for the next block
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        super().stop()
+
+    def fund(self, address: str, amount: int):
+        """
+        Credits the account, which is created if it does not exist. The account is funded outside of a block,
+        i.e., as if it was allocated at genesis.
+        """
+        if amount < 0:
+            raise ValueError("amount must be >= 0")
+        with self._condition:
+            self._accounts.setdefault(address, _Account()).amount += amount
+
+    def advance(self, rounds: int = 1):
+        """
+        Produces blocks. Pending transactions are confirmed in the first block.
+        """
+        if rounds < 1:
+            raise ValueError("rounds must be >= 1")
+        with self._condition:
+            for _ in range(rounds):
+                self._produce_block()
+
+    def _respond(self, method: str, path: str, body: bytes) -> Response:
+        url = urlsplit(path)
+        query = parse_qs(url.query)
+        if (matched := self._match_route(method, url.path)) is None:
+            return self._error_response(HTTPStatus.NOT_FOUND, "not found")
+        route, match = matched
+
+        try:
+            with self._condition:
+                response = route(match, body)
+        except _AlgodError as err:
+            return self._error_response(err.status, str(err))
+        except (KeyError, ValueError, TypeError) as err:
+            return self._error_response(HTTPStatus.BAD_REQUEST, repr(err))
+
+        if query.get("format") == ["msgpack"]:
+            return (
+                HTTPStatus.OK,
+                _msgpack_content_type,
+                msgpack.packb(response, use_bin_type=True),
+            )
+        return (
+            HTTPStatus.OK,
+            _json_content_type,
+            json.dumps(_to_json(response)).encode(),
+        )
+
+    def _match_route(
+        self, method: str, path: str
+    ) -> tuple[Callable[[re.Match, bytes], Any], re.Match] | None:
+        for route_method, pattern, route in self._routes:
+            if route_method == method and (match := pattern.match(path)):
+                return route, match
+        return None
+
+    # ---- node ----
+
+    def _health(self, _match: re.Match, _body: bytes) -> None:
+        return None
+
+    def _versions(self, _match: re.Match, _body: bytes) -> dict[str, Any]:
+        return {
+            "genesis_id": self.genesis_id,
+            "genesis_hash_b64": base64.b64encode(self.genesis_hash).decode(),
+            "versions": ["v2"],
+            "build": {
+                "major": 0,
+                "minor": 0,
+                "build_number": 0,
+                "branch": "emulator",
+                "channel": "dev",
+                "commit_hash": "",
+            },
+        }
+
+    def _status_dict(self) -> dict[str, Any]:
+        return {
+            "last-round": self._round,
+            "last-version": _consensus_version,
+            "next-version": _consensus_version,
+            "next-version-round": self._round + 1,
+            "next-version-supported": True,
+            "catchup-time": 0,
+            "time-since-last-round": 0,
+            "stopped-at-unsupported-round": False,
+        }
+
+    def _status(self, _match: re.Match, _body: bytes) -> dict[str, Any]:
+        return self._status_dict()
+
+    def _wait_for_block_after(self, match: re.Match, _body: bytes) -> dict[str, Any]:
+        round_num = int(match.group(1))
+        self._condition.wait_for(
+            lambda: self._round > round_num or self._stopping, self.wait_timeout
+        )
+        return self._status_dict()
+
+    def _suggested_params(self, _match: re.Match, _body: bytes) -> dict[str, Any]:
+        return {
+            "consensus-version": _consensus_version,
+            "fee": 0,
+            "genesis-hash": base64.b64encode(self.genesis_hash).decode(),
+            "genesis-id": self.genesis_id,
+            "last-round": self._round,
+            "min-fee": self.min_fee,
+        }
+
+    # ---- accounts ----
+
+    def _account_info(self, match: re.Match, _body: bytes) -> dict[str, Any]:
+        address = match.group(1)
+        if not encoding.is_valid_address(address):
+            raise _AlgodError(f"failed to parse the address: {address}")
+        account = self._accounts.get(address, _Account())
+        account_info: dict[str, Any] = {
+            "address": address,
+            "amount": account.amount,
+            "amount-without-pending-rewards": account.amount,
+            "min-balance": _min_balance,
+            "pending-rewards": 0,
+            "rewards": 0,
+            "round": self._round,
+            "status": "Offline",
+            "total-apps-opted-in": 0,
+            "total-assets-opted-in": 0,
+            "total-created-apps": 0,
+            "total-created-assets": 0,
+        }
+        if account.auth_address is not None:
+            account_info["auth-addr"] = account.auth_address
+        return account_info
+
+    # ---- transactions ----
+
+    def _send_transactions(self, _match: re.Match, body: bytes) -> dict[str, Any]:
+        unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+        unpacker.feed(body)
+        group = []
+        for stxn in unpacker:
+            txn_bytes = msgpack.packb(stxn["txn"], use_bin_type=True)
+            txid = (
+                base64.b32encode(encoding.checksum(b"TX" + txn_bytes))
+                .decode()
+                .strip("=")
+            )
+            group.append((txid, stxn))
+            self._verify_signature(txid, stxn, txn_bytes)
+        if not group:
+            raise _AlgodError("empty transaction group")
+        if len(group) > 1:
+            group_ids = {stxn["txn"].get("grp") for _txid, stxn in group}
+            if len(group_ids) != 1 or None in group_ids:
+                raise _AlgodError("transactions must belong to the same group")
+
+        next_round = self._round + 1
+        for txid, stxn in group:
+            self._check_txn(txid, stxn["txn"], next_round)
+        fees = sum(stxn["txn"].get("fee", 0) for _txid, stxn in group)
+        if fees < self.min_fee * len(group):
+            raise _AlgodError(
+                f"txgroup had {fees} in fees, which is less than the minimum {len(group)} * {self.min_fee}"
+            )
+        # fails fast if the group can not be applied to the current ledger state
+        self._apply_group(group, next_round, commit=False)
+
+        for txid, stxn in group:
+            self._txns[txid] = _TxnInfo(stxn)
+        self._pool.append(group)
+        if self.dev_mode:
+            self._produce_block()
+        return {"txId": group[0][0]}
+
+    def _verify_signature(self, txid: str, stxn: dict[str, Any], txn_bytes: bytes):
+        if "sig" not in stxn:
+            return
+        sender = encoding.encode_address(stxn["txn"]["snd"])
+        account = self._accounts.get(sender)
+        auth_address = (
+            account.auth_address
+            if account is not None and account.auth_address is not None
+            else sender
+        )
+        signer = encoding.encode_address(stxn["sgnr"]) if "sgnr" in stxn else sender
+        if signer != auth_address:
+            raise _AlgodError(
+                f"transaction {txid}: should have been authorized by {auth_address} "
+                f"but was actually authorized by {signer}"
+            )
+        try:
+            VerifyKey(encoding.decode_address(signer)).verify(
+                b"TX" + txn_bytes, stxn["sig"]
+            )
+        except BadSignatureError as err:
+            raise _AlgodError(
+                f"transaction {txid}: At least one signature didn't pass verification"
+            ) from err
+
+    def _check_txn(self, txid: str, txn: dict[str, Any], round_num: int):
+        if txid in self._txns:
+            raise _AlgodError(f"transaction already in ledger: {txid}")
+        if txn.get("gh") != self.genesis_hash:
+            raise _AlgodError(f"transaction {txid}: genesis hash mismatch")
+        first_valid, last_valid = txn.get("fv", 0), txn.get("lv", 0)
+        if not first_valid <= round_num <= last_valid:
+            raise _AlgodError(
+                f"transaction {txid}: txn dead: round {round_num} outside of {first_valid}--{last_valid}"
+            )
+
+    def _apply_group(
+        self,
+        group: list[tuple[str, dict[str, Any]]],
+        round_num: int,
+        *,
+        commit: bool = True,
+    ) -> list[dict[str, Any]]:
+        """
+        Applies the group atomically, i.e., either all of the transactions are applied or none are.
+
+        :param commit: if False, then the ledger is not updated
+        :return: transactions with apply data, as they are recorded in the block
+        :raises _AlgodError: if the group can not be applied
+        """
+        accounts: dict[str, _Account] = {}
+
+        def account(address: str) -> _Account:
+            if address not in accounts:
+                accounts[address] = replace(self._accounts.get(address, _Account()))
+            return accounts[address]
+
+        block_txns = []
+        for txid, stxn in group:
+            txn = stxn["txn"]
+            apply_data: dict[str, Any] = {}
+            sender_address = encoding.encode_address(txn["snd"])
+            sender = account(sender_address)
+            sender.amount -= txn.get("fee", 0)
+            if txn.get("type") == "pay":
+                amount = txn.get("amt", 0)
+                sender.amount -= amount
+                account(encoding.encode_address(txn["rcv"])).amount += amount
+                if "close" in txn:
+                    close_amount = max(sender.amount, 0)
+                    account(
+                        encoding.encode_address(txn["close"])
+                    ).amount += close_amount
+                    apply_data["ca"] = close_amount
+                    sender.amount -= close_amount
+                    sender.auth_address = None
+            if sender.amount < 0:
+                raise _AlgodError(
+                    f"transaction {txid}: overspend (account {sender_address}, "
+                    f"tried to spend {-sender.amount} more than its balance)"
+                )
+            if "rekey" in txn:
+                rekey_to = encoding.encode_address(txn["rekey"])
+                sender.auth_address = None if rekey_to == sender_address else rekey_to
+
+            block_txn = dict(stxn)
+            block_txn["txn"] = {
+                key: value for key, value in txn.items() if key not in ("gen", "gh")
+            }
+            if "gen" in txn:
+                block_txn["hgi"] = True
+            block_txns.append({**block_txn, **apply_data})
+
+        for address, account_state in accounts.items():
+            if 0 < account_state.amount < _min_balance:
+                raise _AlgodError(
+                    f"account {address} balance {account_state.amount} below min {_min_balance}"
+                )
+
+        if commit:
+            for address, account_state in accounts.items():
+                if account_state.amount == 0 and account_state.auth_address is None:
+                    # closed accounts are removed from the ledger
+                    self._accounts.pop(address, None)
+                else:
+                    self._accounts[address] = account_state
+        return block_txns
+
+    def _pending_transaction_info(
+        self, match: re.Match, _body: bytes
+    ) -> dict[str, Any]:
+        txid = match.group(1)
+        txn_info = self._txns.get(txid)
+        if txn_info is None:
+            raise _AlgodError("txn does not exist", HTTPStatus.NOT_FOUND)
+        pending_info: dict[str, Any] = {
+            "pool-error": txn_info.pool_error,
+            "txn": txn_info.stxn,
+        }
+        if txn_info.confirmed_round:
+            pending_info["confirmed-round"] = txn_info.confirmed_round
+        return pending_info
+
+    # ---- blocks ----
+
+    def _block_header(self, round_num: int) -> dict[str, Any]:
+        return {
+            "rnd": round_num,
+            "ts": _genesis_timestamp + round_num * _round_secs,
+            "gen": self.genesis_id,
+            "gh": self.genesis_hash,
+        }
+
+    def _produce_block(self):
+        round_num = self._round + 1
+        block = self._block_header(round_num)
+        block_txns: list[dict[str, Any]] = []
+        txids: list[str] = []
+        for group in self._pool:
+            try:
+                block_txns += self._apply_group(group, round_num)
+            except _AlgodError as err:
+                for txid, _stxn in group:
+                    self._txns[txid].pool_error = str(err)
+                continue
+            for txid, _stxn in group:
+                self._txns[txid].confirmed_round = round_num
+                txids.append(txid)
+        self._pool.clear()
+        if block_txns:
+            block["txns"] = block_txns
+        self._blocks[round_num] = block
+        self._block_txids[round_num] = txids
+        self._round = round_num
+        self._condition.notify_all()
+
+    def _check_round(self, round_num: int):
+        if round_num > self._round:
+            raise _AlgodError(
+                f"ledger does not have entry {round_num} (latest {self._round})",
+                HTTPStatus.NOT_FOUND,
+            )
+
+    def _block(self, match: re.Match, _body: bytes) -> dict[str, Any]:
+        round_num = int(match.group(1))
+        self._check_round(round_num)
+        return {"block": self._blocks[round_num]}
+
+    def _block_txids_info(self, match: re.Match, _body: bytes) -> dict[str, Any]:
+        round_num = int(match.group(1))
+        self._check_round(round_num)
+        return {"blockTxids": self._block_txids[round_num]}
+
+
+class AlgodRecorder(_AlgodService):
+    """
+    Proxies requests to an algod node, and appends each response to a recording file, which can be served by
+    AlgodReplayer.
+
+    The recording file is JSON lines, i.e., one JSON object per response:
+    `{"method": ..., "path": ..., "status": ..., "content_type": ..., "body": <base64>, "latency": <secs>}`
+
+    Notes
+    -----
+    - Requests that fail to reach the algod node are not recorded, and fail with an HTTP 502 error.
+    - The algod node is accessed using its own API token, i.e., the recorder's token is never forwarded.
+    """
+
+    def __init__(
+        self,
+        algod_url: str,
+        algod_token: str,
+        path: Path,
+        token: str | None = None,
+        timeout: float = 120.0,
+    ):
+        """
+        :param algod_url: algod node that requests are proxied to
+        :param algod_token: algod node API token
+        :param path: recording file - responses are appended
+        :param timeout: algod request timeout in seconds
+        """
+        super().__init__(token)
+        self.algod_url = algod_url.rstrip("/")
+        self.path = path
+        self._algod_token = algod_token
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._file = path.open("a")
+
+    def close(self):
+        """
+        Stops the server and closes the recording file.
+        """
+        self.stop()
+        with self._lock:
+            self._file.close()
+
+    def _respond(self, method: str, path: str, body: bytes) -> Response:
+        request = Request(
+            self.algod_url + path,
+            headers={
+                constants.algod_auth_header: self._algod_token,
+                "Content-Type": "application/x-binary",
+            },
+            method=method,
+            data=body or None,
+        )
+        start = time.perf_counter()
+        try:
+            with urlopen(request, timeout=self._timeout) as response:
+                status, content_type, payload = (
+                    response.status,
+                    response.headers.get("Content-Type", _json_content_type),
+                    response.read(),
+                )
+        except urllib.error.HTTPError as err:
+            status, content_type, payload = (
+                err.code,
+                err.headers.get("Content-Type", _json_content_type),
+                err.read(),
+            )
+        except OSError as err:
+            return self._error_response(
+                HTTPStatus.BAD_GATEWAY, f"algod request failed: {err}"
+            )
+        latency = time.perf_counter() - start
+
+        entry = {
+            "method": method,
+            "path": path,
+            "status": status,
+            "content_type": content_type,
+            "body": base64.b64encode(payload).decode(),
+            "latency": latency,
+        }
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+        return status, content_type, payload
+
+
+class AlgodReplayer(_AlgodService):
+    """
+    Serves the responses that were recorded by AlgodRecorder.
+
+    Responses are matched by request method and path, including the query string. Request bodies are not matched.
+    If the same request was recorded multiple times, then the responses are served in recorded order, and the last
+    response is served once the recorded responses are exhausted. Thus, replays are deterministic.
+
+    Requests that were not recorded fail with an HTTP 404 error.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        token: str | None = None,
+        latency: float = 0.0,
+        *,
+        replay_latency: bool = False,
+    ):
+        """
+        :param path: recording file
+        :param replay_latency: if True, then each response is delayed by its recorded latency, in addition to the
+                               injected latency
+        """
+        super().__init__(token, latency)
+        self.replay_latency = replay_latency
+        self._lock = threading.Lock()
+        # (method, path) -> recorded responses
+        self._responses: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        # (method, path) -> index of the next response
+        self._next: Counter[tuple[str, str]] = Counter()
+        with path.open() as file:
+            for line in file:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._responses.setdefault(
+                        (entry["method"], entry["path"]), []
+                    ).append(entry)
+
+    def rewind(self):
+        """
+        Restarts the replay from the first recorded responses.
+        """
+        with self._lock:
+            self._next.clear()
+
+    def _respond(self, method: str, path: str, body: bytes) -> Response:
+        key = (method, path)
+        responses = self._responses.get(key)
+        if not responses:
+            return self._error_response(
+                HTTPStatus.NOT_FOUND, f"no recorded response: {method} {path}"
+            )
+        with self._lock:
+            entry = responses[min(self._next[key], len(responses) - 1)]
+            self._next[key] += 1
+        if self.replay_latency:
+            time.sleep(entry["latency"])
+        return (
+            entry["status"],
+            entry["content_type"],
+            base64.b64decode(entry["body"]),
+        )
@@ -0,0 +1,520 @@
+"""
+In-process KMD emulator, which speaks the KMD REST API
+
+The emulator is designed for offline tests and benchmarks, i.e., it enables KMD clients (`KmdService`, `WalletSession`)
+to be tested without an Algorand node.
+
+- Wallets, wallet handles, keys, multisigs, and transaction signing are supported.
+- Data is stored in SQLite, either in memory or in a file.
+- Latency and faults can be injected per request.
+
+Notes
+-----
+- Keys are derived from the wallet master derivation key using `derive_private_key()`, i.e., recovering a wallet
+  using its master derivation key regenerates the same keys in the same order.
+- Wallet data is not encrypted. The emulator must not be used to store real keys.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+import msgpack  # type: ignore
+from algosdk import constants, encoding
+from algosdk.transaction import Multisig, MultisigTransaction, Transaction
+
+from oysterpack.algorand.emulator.server import (
+    EmulatorServer,
+    Response,
+    _json_content_type,
+)
+from oysterpack.algorand.keys import AlgoPrivateKey
+from oysterpack.algorand.kmd import derive_private_key
+
+_schema = """
+CREATE TABLE IF NOT EXISTS wallets (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    password_hash BLOB NOT NULL,
+    master_derivation_key BLOB NOT NULL,
+    next_key_index INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keys (
+    wallet_id TEXT NOT NULL,
+    address TEXT NOT NULL,
+    private_key BLOB NOT NULL,
+    PRIMARY KEY (wallet_id, address)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS multisigs (
+    wallet_id TEXT NOT NULL,
+    address TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    threshold INTEGER NOT NULL,
+    public_keys BLOB NOT NULL,
+    PRIMARY KEY (wallet_id, address)
+) WITHOUT ROWID;
+"""
+
+_supported_txs = ["pay", "keyreg"]
+
+
+class _KmdError(Exception):
+    def __init__(self, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+def _password_hash(wallet_id: str, password: str) -> bytes:
+    return hashlib.sha256(f"{wallet_id}:{password}".encode()).digest()
+
+
+def _encode_private_key(private_key: AlgoPrivateKey) -> str:
+    """
+    :return: private key in the algosdk format, i.e., base64 encoded seed and public key
+    """
+    return base64.b64encode(
+        bytes(private_key) + bytes(private_key.signing_key.verify_key)
+    ).decode()
+
+
+def _decode_public_key(public_key: str) -> str:
+    """
+    Public keys are accepted as:
+    - base64 encoded public key bytes, which is what KMD expects
+    - base64 encoded address bytes, i.e., public key + checksum, which is what `WalletSession` sends
+    - base32 Algorand addresses, which is what the algosdk client sends
+
+    :return: Algorand address
+    """
+    if encoding.is_valid_address(public_key):
+        return public_key
+    try:
+        address = encoding.encode_address(
+            base64.b64decode(public_key, validate=True)[: constants.key_len_bytes]
+        )
+    except Exception as err:
+        raise _KmdError(f"invalid public key: {public_key}") from err
+    if not encoding.is_valid_address(address):
+        raise _KmdError(f"invalid public key: {public_key}")
+    return address
+
+
+class KmdEmulator(EmulatorServer):
+    """
+    In-process KMD server
+
+    The server runs on a background thread, and is started and stopped via `start()` and `stop()`.
+    KmdEmulator is a context manager, which starts the server on enter and closes the emulator on exit.
+
+    >>> with KmdEmulator() as emulator:
+    ...     kmd_service = KmdService(url=emulator.url, token=emulator.token)
+
+    Injected latency and faults can be changed while the server is running.
+    """
+
+    auth_header = constants.kmd_auth_header
+
+    def __init__(
+        self,
+        database: str | Path = ":memory:",
+        token: str | None = None,
+        session_lifetime: float = 60.0,
+        latency: float = 0.0,
+        fault_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        """
+        :param database: SQLite database file path - ":memory:" stores data in memory
+        :param token: KMD API token - if None, then a random token is generated
+        :param session_lifetime: wallet handle lifetime in seconds
+        :param latency: seconds added to each request
+        :param fault_rate: probability [0.0 - 1.0] that a request fails with an HTTP 500 error
+        :param seed: random seed used to inject faults
+        """
+        super().__init__(token, latency, fault_rate, seed)
+        self.session_lifetime = session_lifetime
+        self._connection = sqlite3.connect(database, check_same_thread=False)
+        self._connection.executescript(_schema)
+        self._lock = threading.Lock()
+        # handle token -> (wallet ID, expires at)
+        self._handles: dict[str, tuple[str, float]] = {}
+
+        self._routes: dict[tuple[str, str], Callable[[dict[str, Any]], Any]] = {
+            ("GET", "/versions"): self._versions,
+            ("GET", "/v1/wallets"): self._list_wallets,
+            ("POST", "/v1/wallet"): self._create_wallet,
+            ("POST", "/v1/wallet/init"): self._init_wallet_handle,
+            ("POST", "/v1/wallet/release"): self._release_wallet_handle,
+            ("POST", "/v1/wallet/renew"): self._renew_wallet_handle,
+            ("POST", "/v1/wallet/rename"): self._rename_wallet,
+            ("POST", "/v1/wallet/info"): self._wallet_info,
+            ("POST", "/v1/master-key/export"): self._export_master_derivation_key,
+            ("POST", "/v1/key"): self._generate_key,
+            ("DELETE", "/v1/key"): self._delete_key,
+            ("POST", "/v1/key/import"): self._import_key,
+            ("POST", "/v1/key/export"): self._export_key,
+            ("POST", "/v1/key/list"): self._list_keys,
+            ("POST", "/v1/transaction/sign"): self._sign_transaction,
+            ("POST", "/v1/multisig/list"): self._list_multisigs,
+            ("POST", "/v1/multisig/import"): self._import_multisig,
+            ("POST", "/v1/multisig/export"): self._export_multisig,
+            ("POST", "/v1/multisig/sign"): self._sign_multisig_transaction,
+            ("DELETE", "/v1/multisig"): self._delete_multisig,
+        }
+
+    def stop(self):
+        """
+        Stops the server. Data is retained, i.e., the server can be restarted. Wallet handles are invalidated.
+        """
+        super().stop()
+        with self._lock:
+            self._handles.clear()
+
+    def close(self):
+        """
+        Stops the server and closes the database.
+        """
+        super().close()
+        self._connection.close()
+
+    def expire_handles(self):
+        """
+        Expires all wallet handles, e.g., to simulate wallet handle expiration.
+        """
+        with self._lock:
+            self._handles.clear()
+
+    def _respond(self, method: str, path: str, body: bytes) -> Response:
+        route = self._routes.get((method, urlsplit(path).path))
+        if route is None:
+            return self._error_response(HTTPStatus.NOT_FOUND, "not found")
+        try:
+            data = json.loads(body) if body else {}
+            with self._lock, self._connection:
+                response = route(data)
+        except _KmdError as err:
+            return self._error_response(err.status, str(err))
+        except (KeyError, ValueError, TypeError) as err:
+            return self._error_response(HTTPStatus.BAD_REQUEST, repr(err))
+        return HTTPStatus.OK, _json_content_type, json.dumps(response).encode()
+
+    def _error_response(self, status: int, message: str) -> Response:
+        return (
+            status,
+            _json_content_type,
+            json.dumps({"error": True, "message": message}).encode(),
+        )
+
+    # ---- wallets ----
+
+    def _wallet_dict(self, wallet_id: str) -> dict[str, Any]:
+        (name,) = self._connection.execute(
+            "SELECT name FROM wallets WHERE id = ?", (wallet_id,)
+        ).fetchone()
+        return {
+            "driver_name": "sqlite",
+            "driver_version": 1,
+            "id": wallet_id,
+            "mnemonic_ux": False,
+            "name": name,
+            "supported_txs": _supported_txs,
+        }
+
+    def _check_wallet_password(self, wallet_id: str, password: str):
+        row = self._connection.execute(
+            "SELECT password_hash FROM wallets WHERE id = ?", (wallet_id,)
+        ).fetchone()
+        if row is None:
+            raise _KmdError("wallet not found", HTTPStatus.NOT_FOUND)
+        if not hmac.compare_digest(row[0], _password_hash(wallet_id, password)):
+            raise _KmdError("wrong password", HTTPStatus.UNAUTHORIZED)
+
+    def _wallet_id(self, data: dict[str, Any], *, check_password: bool = False) -> str:
+        """
+        :return: wallet ID for the wallet handle in the request
+        """
+        handle = self._handles.get(data["wallet_handle_token"])
+        if handle is None or handle[1] <= time.monotonic():
+            raise _KmdError("handle does not exist", HTTPStatus.UNAUTHORIZED)
+        wallet_id = handle[0]
+        if check_password:
+            self._check_wallet_password(wallet_id, data["wallet_password"])
+        return wallet_id
+
+    def _versions(self, _data: dict[str, Any]) -> dict[str, Any]:
+        return {"versions": ["v1"]}
+
+    def _list_wallets(self, _data: dict[str, Any]) -> dict[str, Any]:
+        rows = self._connection.execute("SELECT id FROM wallets").fetchall()
+        return {"wallets": [self._wallet_dict(wallet_id) for (wallet_id,) in rows]}
+
+    def _create_wallet(self, data: dict[str, Any]) -> dict[str, Any]:
+        name = data["wallet_name"]
+        if (
+            self._connection.execute(
+                "SELECT 1 FROM wallets WHERE name = ?", (name,)
+            ).fetchone()
+            is not None
+        ):
+            raise _KmdError("wallet with same name already exists")
+        if data.get("master_derivation_key"):
+            master_derivation_key = base64.b64decode(data["master_derivation_key"])
+            if len(master_derivation_key) != 32:
+                raise _KmdError("invalid master derivation key")
+        else:
+            master_derivation_key = secrets.token_bytes(32)
+
+        wallet_id = secrets.token_hex(16)
+        self._connection.execute(
+            "INSERT INTO wallets VALUES (?, ?, ?, ?, 0)",
+            (
+                wallet_id,
+                name,
+                _password_hash(wallet_id, data["wallet_password"]),
+                master_derivation_key,
+            ),
+        )
+        return {"wallet": self._wallet_dict(wallet_id)}
+
+    def _init_wallet_handle(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = data["wallet_id"]
+        self._check_wallet_password(wallet_id, data["wallet_password"])
+        handle = secrets.token_hex(32)
+        self._handles[handle] = (wallet_id, time.monotonic() + self.session_lifetime)
+        return {"wallet_handle_token": handle}
+
+    def _release_wallet_handle(self, data: dict[str, Any]) -> dict[str, Any]:
+        self._wallet_id(data)
+        del self._handles[data["wallet_handle_token"]]
+        return {}
+
+    def _wallet_handle_dict(self, handle: str) -> dict[str, Any]:
+        wallet_id, expires_at = self._handles[handle]
+        return {
+            "wallet_handle": {
+                "expires_seconds": max(int(expires_at - time.monotonic()), 0),
+                "wallet": self._wallet_dict(wallet_id),
+            }
+        }
+
+    def _renew_wallet_handle(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = self._wallet_id(data)
+        handle = data["wallet_handle_token"]
+        self._handles[handle] = (wallet_id, time.monotonic() + self.session_lifetime)
+        return self._wallet_handle_dict(handle)
+
+    def _wallet_info(self, data: dict[str, Any]) -> dict[str, Any]:
+        self._wallet_id(data)
+        return self._wallet_handle_dict(data["wallet_handle_token"])
+
+    def _rename_wallet(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = data["wallet_id"]
+        self._check_wallet_password(wallet_id, data["wallet_password"])
+        try:
+            self._connection.execute(
+                "UPDATE wallets SET name = ? WHERE id = ?",
+                (data["wallet_name"], wallet_id),
+            )
+        except sqlite3.IntegrityError as err:
+            raise _KmdError("wallet with same name already exists") from err
+        return {"wallet": self._wallet_dict(wallet_id)}
+
+    def _export_master_derivation_key(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = self._wallet_id(data, check_password=True)
+        (master_derivation_key,) = self._connection.execute(
+            "SELECT master_derivation_key FROM wallets WHERE id = ?", (wallet_id,)
+        ).fetchone()
+        return {
+            "master_derivation_key": base64.b64encode(master_derivation_key).decode()
+        }
+
+    # ---- keys ----
+
+    def _insert_key(self, wallet_id: str, private_key: AlgoPrivateKey) -> str:
+        address = private_key.signing_address
+        try:
+            self._connection.execute(
+                "INSERT INTO keys VALUES (?, ?, ?)",
+                (wallet_id, address, bytes(private_key)),
+            )
+        except sqlite3.IntegrityError as err:
+            raise _KmdError("key already exists in wallet") from err
+        return address
+
+    def _private_key(self, wallet_id: str, address: str) -> AlgoPrivateKey:
+        row = self._connection.execute(
+            "SELECT private_key FROM keys WHERE wallet_id = ? AND address = ?",
+            (wallet_id, address),
+        ).fetchone()
+        if row is None:
+            raise _KmdError("key does not exist in this wallet", HTTPStatus.NOT_FOUND)
+        return AlgoPrivateKey(row[0])
+
+    def _generate_key(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = self._wallet_id(data)
+        master_derivation_key, index = self._connection.execute(
+            "SELECT master_derivation_key, next_key_index FROM wallets WHERE id = ?",
+            (wallet_id,),
+        ).fetchone()
+        # like KMD, indexes whose derived key already exists in the wallet, e.g., because it was imported, are skipped
+        while True:
+            private_key = derive_private_key(master_derivation_key, index)
+            index += 1
+            if (
+                self._connection.execute(
+                    "SELECT 1 FROM keys WHERE wallet_id = ? AND address = ?",
+                    (wallet_id, private_key.signing_address),
+                ).fetchone()
+                is None
+            ):
+                break
+        self._connection.execute(
+            "UPDATE wallets SET next_key_index = ? WHERE id = ?",
+            (index, wallet_id),
+        )
+        return {"address": self._insert_key(wallet_id, private_key)}
+
+    def _import_key(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = self._wallet_id(data)
+        private_key = AlgoPrivateKey(base64.b64decode(data["private_key"]))
+        return {"address": self._insert_key(wallet_id, private_key)}
+
+    def _export_key(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = self._wallet_id(data, check_password=True)
+        private_key = self._private_key(wallet_id, data["address"])
+        return {"private_key": _encode_private_key(private_key)}
+
+    def _delete_key(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = self._wallet_id(data, check_password=True)
+        self._connection.execute(
+            "DELETE FROM keys WHERE wallet_id = ? AND address = ?",
+            (wallet_id, data["address"]),
+        )
+        return {}
+
+    def _list_keys(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = self._wallet_id(data)
+        rows = self._connection.execute(
+            "SELECT address FROM keys WHERE wallet_id = ?", (wallet_id,)
+        ).fetchall()
+        return {"addresses": [address for (address,) in rows]}
+
+    def _sign_transaction(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = self._wallet_id(data, check_password=True)
+        txn = encoding.msgpack_decode(data["transaction"])
+        if not isinstance(txn, Transaction):
+            raise _KmdError("invalid transaction")
+        signing_address = (
+            _decode_public_key(data["public_key"])
+            if data.get("public_key")
+            else txn.sender
+        )
+        private_key = self._private_key(wallet_id, signing_address)
+        signed_txn = txn.sign(_encode_private_key(private_key))
+        return {"signed_transaction": encoding.msgpack_encode(signed_txn)}
+
+    # ---- multisig ----
+
+    def _list_multisigs(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = self._wallet_id(data)
+        rows = self._connection.execute(
+            "SELECT address FROM multisigs WHERE wallet_id = ?", (wallet_id,)
+        ).fetchall()
+        return {"addresses": [address for (address,) in rows]}
+
+    def _import_multisig(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = self._wallet_id(data)
+        public_keys = [base64.b64decode(pk) for pk in data["pks"]]
+        multisig = Multisig(
+            data["multisig_version"],
+            data["threshold"],
+            [encoding.encode_address(pk) for pk in public_keys],
+        )
+        multisig.validate()
+        address = multisig.address()
+        self._connection.execute(
+            "INSERT OR IGNORE INTO multisigs VALUES (?, ?, ?, ?, ?)",
+            (
+                wallet_id,
+                address,
+                multisig.version,
+                multisig.threshold,
+                msgpack.packb(public_keys),
+            ),
+        )
+        return {"address": address}
+
+    def _multisig(self, wallet_id: str, address: str) -> Multisig:
+        row = self._connection.execute(
+            "SELECT version, threshold, public_keys FROM multisigs WHERE wallet_id = ? AND address = ?",
+            (wallet_id, address),
+        ).fetchone()
+        if row is None:
+            raise _KmdError(
+                "multisig does not exist in this wallet", HTTPStatus.NOT_FOUND
+            )
+        version, threshold, public_keys = row
+        return Multisig(
+            version,
+            threshold,
+            [encoding.encode_address(pk) for pk in msgpack.unpackb(public_keys)],
+        )
+
+    def _export_multisig(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = self._wallet_id(data)
+        multisig = self._multisig(wallet_id, data["address"])
+        return {
+            "multisig_version": multisig.version,
+            "threshold": multisig.threshold,
+            "pks": [
+                base64.b64encode(subsig.public_key).decode()
+                for subsig in multisig.subsigs
+            ],
+        }
+
+    def _delete_multisig(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = self._wallet_id(data, check_password=True)
+        self._connection.execute(
+            "DELETE FROM multisigs WHERE wallet_id = ? AND address = ?",
+            (wallet_id, data["address"]),
+        )
+        return {}
+
+    def _sign_multisig_transaction(self, data: dict[str, Any]) -> dict[str, Any]:
+        wallet_id = self._wallet_id(data, check_password=True)
+        txn = encoding.msgpack_decode(data["transaction"])
+        if not isinstance(txn, Transaction):
+            raise _KmdError("invalid transaction")
+
+        partial_multisig = data["partial_multisig"]
+        multisig = Multisig(
+            partial_multisig["v"],
+            partial_multisig["thr"],
+            [
+                encoding.encode_address(base64.b64decode(subsig["pk"]))
+                for subsig in partial_multisig["subsig"]
+            ],
+        )
+        for subsig, partial_subsig in zip(
+            multisig.subsigs, partial_multisig["subsig"], strict=True
+        ):
+            if "s" in partial_subsig:
+                subsig.signature = base64.b64decode(partial_subsig["s"])
+        # the multisig must be held by the wallet
+        self._multisig(wallet_id, multisig.address())
+
+        private_key = self._private_key(
+            wallet_id, _decode_public_key(data["public_key"])
+        )
+        multisig_txn = MultisigTransaction(txn, multisig)
+        multisig_txn.sign(_encode_private_key(private_key))
+        return {"multisig": encoding.msgpack_encode(multisig_txn.multisig)}
@@ -0,0 +1,199 @@
+"""
+HTTP server support that is shared by the in-process emulators
+
+Each emulator is an `EmulatorServer`, which runs a threaded HTTP server on a background thread. Requests are counted
+per endpoint, delayed by the injected latency, fail with the injected fault rate, and are authenticated, before they are
+passed to the emulator's `_respond()` method.
+"""
+import hmac
+import json
+import logging
+import random
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any, ClassVar, Self
+from urllib.parse import urlsplit
+
+from algosdk import constants
+
+from oysterpack.algorand.algod_metrics import endpoint_name
+
+_logger = logging.getLogger(__name__)
+
+_json_content_type = "application/json"
+
+# (HTTP status, content type, response body)
+Response = tuple[int, str, bytes]
+
+
+class EmulatorServer(ABC):
+    """
+    Base class for the in-process emulator servers
+
+    The server runs on a background thread, and is started and stopped via `start()` and `stop()`.
+    The emulator is a context manager, which starts the server on enter and closes the emulator on exit.
+
+    Injected latency and faults can be changed while the server is running.
+    """
+
+    # HTTP request header that holds the API token
+    auth_header: ClassVar[str]
+
+    def __init__(
+        self,
+        token: str | None = None,
+        latency: float = 0.0,
+        fault_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        """
+        :param token: API token - if None, then a random token is generated
+        :param latency: seconds added to each request
+        :param fault_rate: probability [0.0 - 1.0] that a request fails with an HTTP 500 error
+        :param seed: random seed used to inject faults
+        """
+        if not 0.0 <= fault_rate <= 1.0:
+            raise ValueError("fault_rate must be between 0.0 and 1.0")
+        if latency < 0:
+            raise ValueError("latency must be >= 0")
+
+        self.token = token if token is not None else secrets.token_hex(32)
+        self.latency = latency
+        self.fault_rate = fault_rate
+        # endpoint name, e.g., `GET /v2/accounts/{address}` -> count
+        self.request_counts: Counter[str] = Counter()
+
+        self._random = random.Random(seed)
+        self._server: ThreadingHTTPServer | None = None
+        self._server_thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """
+        :raises AssertionError: if the server is not running
+        """
+        if self._server is None:
+            raise AssertionError("server is not running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Starts the server on a background thread. If the server is already running, then this is a no-op.
+
+        :param port: 0 means an available port is selected
+        """
+        if self._server is not None:
+            return
+        self._server = _EmulatorHTTPServer((host, port), self)
+        self._server_thread = threading.Thread(
+            target=self._server.serve_forever,
+            name=self.__class__.__name__,
+            daemon=True,
+        )
+        self._server_thread.start()
+
+    def stop(self):
+        """
+        Stops the server. State is retained, i.e., the server can be restarted.
+        """
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._server_thread = None
+
+    def close(self):
+        self.stop()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ):
+        self.close()
+
+    def _handle_request(
+        self,
+        method: str,
+        path: str,
+        token: str | None,
+        body: bytes,
+    ) -> Response:
+        url_path = urlsplit(path).path
+        self.request_counts[endpoint_name(method, url_path)] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fault_rate and self._random.random() < self.fault_rate:
+            return self._error_response(
+                HTTPStatus.INTERNAL_SERVER_ERROR, "injected fault"
+            )
+        if url_path not in constants.unversioned_paths and not hmac.compare_digest(
+            token or "", self.token
+        ):
+            return self._error_response(HTTPStatus.UNAUTHORIZED, "Invalid API Token")
+        return self._respond(method, path, body)
+
+    def _error_response(self, status: int, message: str) -> Response:
+        return status, _json_content_type, json.dumps({"message": message}).encode()
+
+    @abstractmethod
+    def _respond(self, method: str, path: str, body: bytes) -> Response:
+        """
+        Handles an authenticated request.
+
+        :param path: request path, including the query string
+        """
+
+
+class _EmulatorHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, server_address: tuple[str, int], emulator: EmulatorServer):
+        super().__init__(server_address, _EmulatorRequestHandler)
+        self.emulator = emulator
+
+
+class _EmulatorRequestHandler(BaseHTTPRequestHandler):
+    server: _EmulatorHTTPServer
+    protocol_version = "HTTP/1.1"
+
+    def _handle(self, method: str):
+        emulator = self.server.emulator
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        status, content_type, payload = emulator._handle_request(
+            method,
+            self.path,
+            self.headers.get(emulator.auth_header),
+            body,
+        )
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def log_message(self, fmt: str, *args: Any):
+        _logger.debug(fmt, *args)
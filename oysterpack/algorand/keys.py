@@ -7,19 +7,51 @@ Specifically, :type:``AlgoPrivateKey`` supports authenticated encryption, i.e.,
 https://doc.libsodium.org/public-key_cryptography/authenticated_encryption
 """
 
+import asyncio
 import base64
+import os
+import string
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Sequence
+from contextlib import aclosing
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain, repeat
+from typing import Any, BinaryIO, Self
 
-from algosdk import constants, mnemonic, transaction
+import msgpack
+from algosdk import constants, error, transaction
 from algosdk.account import generate_account
 from algosdk.atomic_transaction_composer import TransactionSigner
 from algosdk.encoding import decode_address, encode_address
 from algosdk.transaction import GenericSignedTransaction, Transaction
+from nacl.bindings import (
+    crypto_secretstream_xchacha20poly1305_HEADERBYTES,
+    crypto_secretstream_xchacha20poly1305_init_pull,
+    crypto_secretstream_xchacha20poly1305_init_push,
+    crypto_secretstream_xchacha20poly1305_state,
+    crypto_sign_keypair,
+)
 from nacl.exceptions import BadSignatureError
 from nacl.public import Box, PrivateKey, PublicKey
+from nacl.secret import SecretBox
 from nacl.signing import SignedMessage, SigningKey, VerifyKey
+from nacl.utils import random
 
 from oysterpack.algorand import Address, Mnemonic
+from oysterpack.algorand.secretstream import (
+    MAX_STREAM_CHUNK_SIZE,
+    STREAM_CHUNK_SIZE,
+    STREAM_FRAME_LEN,
+    TruncatedStreamError,
+    check_stream_frame_len,
+    pull_stream_frame,
+    push_stream_frame,
+    read_exactly,
+)
+from oysterpack.core.asyncio.task_manager import (
+    schedule_blocking_io_task,
+    schedule_cpu_bound_task,
+)
 
 
 class EncryptionAddress(Address):
@@ -42,8 +74,12 @@ class SigningAddress(Address):
     def to_verify_key(self) -> VerifyKey:
         """
         SigningAddress -> VerifyKey
+
+        Notes
+        -----
+        - VerifyKey(s) are cached per address
         """
-        return VerifyKey(decode_address(self))
+        return _to_verify_key(self)
 
     def verify_message(self, message: bytes, signature: bytes) -> bool:
         """
@@ -58,6 +94,111 @@ class SigningAddress(Address):
             return False
 
 
+@lru_cache(maxsize=10_000)
+def _to_verify_key(address: str) -> VerifyKey:
+    return VerifyKey(decode_address(address))
+
+
+@dataclass(slots=True)
+class SignedMessageItem:
+    """
+    Message signature to verify
+    """
+
+    signing_address: SigningAddress
+    message: bytes
+    signature: bytes
+
+
+def _verify_signed_messages(items: Sequence[SignedMessageItem]) -> list[bool]:
+    def verify(item: SignedMessageItem) -> bool:
+        try:
+            return item.signing_address.verify_message(item.message, item.signature)
+        except (ValueError, error.WrongChecksumError, error.WrongKeyLengthError):
+            return False
+
+    return [verify(item) for item in items]
+
+
+async def verify_signed_messages(
+    items: Sequence[SignedMessageItem],
+    chunk_size: int = 256,
+) -> list[bool]:
+    """
+    Verifies a batch of message signatures.
+
+    The batch is split into chunks, which are verified concurrently on the thread pool.
+    PyNaCl releases the GIL while verifying signatures, which enables chunks to be verified in parallel.
+
+    :param items: signed messages to verify
+    :param chunk_size: max number of signatures verified per task
+    :return: per item result, in the same order as the items - True if the signature is valid.
+             Signatures with an invalid format fail verification.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    results = await asyncio.gather(
+        *(
+            schedule_blocking_io_task(
+                _verify_signed_messages, items[i : i + chunk_size]
+            )
+            for i in range(0, len(items), chunk_size)
+        )
+    )
+    return list(chain.from_iterable(results))
+
+
+@dataclass(slots=True)
+class MultiRecipientMessage:
+    """
+    Message that is encrypted once for multiple recipients.
+
+    The message is encrypted using a random symmetric key. The symmetric key is then box encrypted for each recipient,
+    i.e., the payload encryption cost is paid once regardless of the number of recipients.
+    Each recipient's encrypted key is indexed by its EncryptionAddress.
+    """
+
+    sender: EncryptionAddress
+    encrypted_keys: dict[EncryptionAddress, bytes]
+    ciphertext: bytes
+
+    @classmethod
+    def unpack(cls, packed: bytes) -> Self:
+        """
+        deserializes the message
+        """
+        (sender, encrypted_keys, ciphertext) = msgpack.unpackb(packed, use_list=False)
+        return cls(
+            sender=EncryptionAddress(encode_address(sender)),
+            encrypted_keys={
+                EncryptionAddress(encode_address(public_key)): encrypted_key
+                for public_key, encrypted_key in encrypted_keys.items()
+            },
+            ciphertext=ciphertext,
+        )
+
+    def pack(self) -> bytes:
+        """
+        Serialize the message using MessagePack
+
+        Notes
+        -----
+        - serialized message format: (sender, {recipient: encrypted key}, ciphertext)
+        - addresses are serialized as raw public key bytes
+        """
+        return msgpack.packb(
+            (
+                decode_address(self.sender),
+                {
+                    decode_address(recipient): encrypted_key
+                    for recipient, encrypted_key in self.encrypted_keys.items()
+                },
+                self.ciphertext,
+            )
+        )
+
+
 @dataclass(slots=True)
 class AlgoPublicKeys:
     signing_address: SigningAddress
@@ -68,6 +209,90 @@ class AlgoPublicKeys:
 _algorand_base64_encoded_private_key_len = 88
 
 
+def _check_stream_chunk_size(chunk_size: int):
+    if not 1 <= chunk_size <= MAX_STREAM_CHUNK_SIZE:
+        raise ValueError(f"chunk_size must be between 1 and {MAX_STREAM_CHUNK_SIZE}")
+
+
+def _encrypt_stream(
+    key: bytes,
+    src: BinaryIO,
+    dst: BinaryIO,
+    chunk_size: int,
+):
+    _check_stream_chunk_size(chunk_size)
+    state = crypto_secretstream_xchacha20poly1305_state()
+    dst.write(crypto_secretstream_xchacha20poly1305_init_push(state, key))
+    chunk = src.read(chunk_size)
+    while True:
+        next_chunk = src.read(chunk_size)
+        dst.write(push_stream_frame(state, chunk, final=not next_chunk))
+        if not next_chunk:
+            return
+        chunk = next_chunk
+
+
+def _decrypt_stream(key: bytes, src: BinaryIO, dst: BinaryIO):
+    state = crypto_secretstream_xchacha20poly1305_state()
+    crypto_secretstream_xchacha20poly1305_init_pull(
+        state,
+        read_exactly(src, crypto_secretstream_xchacha20poly1305_HEADERBYTES),
+        key,
+    )
+    while True:
+        frame_len = check_stream_frame_len(read_exactly(src, STREAM_FRAME_LEN.size))
+        chunk, final = pull_stream_frame(state, read_exactly(src, frame_len))
+        dst.write(chunk)
+        if final:
+            break
+
+    if src.read(1):
+        raise ValueError("encrypted stream contains data after the final chunk")
+
+
+async def _encrypt_async_stream(
+    key: bytes,
+    src: asyncio.StreamReader,
+    chunk_size: int,
+) -> AsyncIterator[bytes]:
+    _check_stream_chunk_size(chunk_size)
+    state = crypto_secretstream_xchacha20poly1305_state()
+    yield crypto_secretstream_xchacha20poly1305_init_push(state, key)
+    chunk = await src.read(chunk_size)
+    while True:
+        next_chunk = await src.read(chunk_size)
+        yield push_stream_frame(state, chunk, final=not next_chunk)
+        if not next_chunk:
+            return
+        chunk = next_chunk
+
+
+async def _decrypt_async_stream(
+    key: bytes,
+    src: asyncio.StreamReader,
+) -> AsyncIterator[bytes]:
+    try:
+        state = crypto_secretstream_xchacha20poly1305_state()
+        crypto_secretstream_xchacha20poly1305_init_pull(
+            state,
+            await src.readexactly(crypto_secretstream_xchacha20poly1305_HEADERBYTES),
+            key,
+        )
+        while True:
+            frame_len = check_stream_frame_len(
+                await src.readexactly(STREAM_FRAME_LEN.size)
+            )
+            chunk, final = pull_stream_frame(state, await src.readexactly(frame_len))
+            yield chunk
+            if final:
+                break
+    except asyncio.IncompleteReadError as err:
+        raise TruncatedStreamError("encrypted stream is truncated") from err
+
+    if await src.read(1):
+        raise ValueError("encrypted stream contains data after the final chunk")
+
+
 class AlgoPrivateKey(PrivateKey, TransactionSigner):
     """
     Algorand private keys can be used to sign and encrypt messages.
@@ -107,9 +332,7 @@ class AlgoPrivateKey(PrivateKey, TransactionSigner):
             else:
                 super().__init__(algo_private_key[: constants.key_len_bytes])
         elif isinstance(algo_private_key, Mnemonic):
-            private_key = algo_private_key.to_private_key()
-            private_key_bytes = base64.b64decode(private_key)
-            super().__init__(private_key_bytes[: constants.key_len_bytes])
+            super().__init__(algo_private_key.to_private_key_bytes())
         else:
             raise ValueError(
                 "invalid private_key type - must be str | bytes | Mnemonic"
@@ -120,9 +343,7 @@ class AlgoPrivateKey(PrivateKey, TransactionSigner):
         """
         :return: Algorand private key encoded as a 25-word mnemonic
         """
-        return Mnemonic.from_word_list(
-            mnemonic.from_private_key(base64.b64encode(bytes(self)).decode())
-        )
+        return Mnemonic.from_private_key(bytes(self))
 
     @property
     def public_keys(self) -> AlgoPublicKeys:
@@ -196,6 +417,109 @@ class AlgoPrivateKey(PrivateKey, TransactionSigner):
             nonce=msg[: Box.NONCE_SIZE],
         )
 
+    def encrypt_for_recipients(
+        self,
+        msg: bytes,
+        recipients: Iterable[EncryptionAddress],
+    ) -> MultiRecipientMessage:
+        """
+        Encrypts the message once using a random symmetric key, and then encrypts the symmetric key for each recipient.
+
+        :param msg: message to encrypt
+        :param recipients: duplicate recipients are ignored
+        """
+        key = random(SecretBox.KEY_SIZE)
+        return MultiRecipientMessage(
+            sender=self.encryption_address,
+            encrypted_keys={
+                recipient: self.encrypt(key, recipient) for recipient in recipients
+            },
+            ciphertext=SecretBox(key).encrypt(msg),
+        )
+
+    def decrypt_multi_recipient_message(self, msg: MultiRecipientMessage) -> bytes:
+        """
+        Decrypts a message that was encrypted for multiple recipients.
+
+        :raises ValueError: if this key is not one of the message recipients
+        """
+        encrypted_key = msg.encrypted_keys.get(self.encryption_address)
+        if encrypted_key is None:
+            raise ValueError("message was not encrypted for this recipient")
+        key = self.decrypt(encrypted_key, msg.sender)
+        return SecretBox(key).decrypt(msg.ciphertext)
+
+    def _stream_key(self, peer: EncryptionAddress | None) -> bytes:
+        """
+        Stream encryption key, which is derived from this private key and the peer's public key.
+        """
+        encryption_address = peer if peer else self.encryption_address
+        return Box(self, encryption_address.to_public_key()).shared_key()
+
+    def encrypt_stream(
+        self,
+        src: BinaryIO,
+        dst: BinaryIO,
+        recipient: EncryptionAddress | None = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ):
+        """
+        Encrypts the src stream chunk by chunk, and writes the encrypted stream to dst.
+        Only a single chunk is held in memory at a time, regardless of the stream size.
+
+        Each chunk is authenticated. The last chunk is tagged as final, which enables truncation to be detected.
+
+        :param src: binary file-like object to read plaintext from
+        :param dst: binary file-like object to write the encrypted stream to
+        :param recipient: if None, then recipient is set to self
+        :param chunk_size: max plaintext chunk size
+        """
+        _encrypt_stream(self._stream_key(recipient), src, dst, chunk_size)
+
+    def decrypt_stream(
+        self,
+        src: BinaryIO,
+        dst: BinaryIO,
+        sender: EncryptionAddress | None = None,
+    ):
+        """
+        Decrypts a stream that was encrypted via `encrypt_stream()` chunk by chunk, and writes the decrypted chunks
+        to dst.
+
+        NOTE: chunks are written to dst as they are authenticated. If decryption fails, then the data written to dst
+        must be discarded.
+
+        :param sender: if None, then sender is set to self
+        :raises TruncatedStreamError: if the stream ends before the final chunk
+        :raises nacl.exceptions.CryptoError: if a chunk fails authentication
+        """
+        _decrypt_stream(self._stream_key(sender), src, dst)
+
+    def encrypt_async_stream(
+        self,
+        src: asyncio.StreamReader,
+        recipient: EncryptionAddress | None = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        """
+        Async version of `encrypt_stream()`
+
+        :return: encrypted stream data
+        """
+        return _encrypt_async_stream(self._stream_key(recipient), src, chunk_size)
+
+    def decrypt_async_stream(
+        self,
+        src: asyncio.StreamReader,
+        sender: EncryptionAddress | None = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Async version of `decrypt_stream()`
+
+        :return: decrypted chunks
+        """
+        return _decrypt_async_stream(self._stream_key(sender), src)
+
     def sign(self, msg: bytes) -> SignedMessage:
         """
         Signs the message.
@@ -213,3 +537,132 @@ class AlgoPrivateKey(PrivateKey, TransactionSigner):
         return txn.sign(
             base64.b64encode(bytes(self) + bytes(self.signing_key.verify_key)).decode()
         )
+
+
+# The first 51 base32 chars of an Algorand address are determined by the public key alone.
+# The remaining chars include the checksum.
+_max_address_prefix_len = 51
+_base32_chars = frozenset(string.ascii_uppercase + "234567")
+
+
+def _generate_private_keys(count: int, prefix: str | None = None) -> list[bytes]:
+    """
+    Generates `count` private keys.
+
+    NOTE: runs in a worker process
+
+    :param prefix: if specified, then only keys whose address starts with the prefix are returned
+    :return: raw private keys
+    """
+    if prefix is None:
+        return [
+            crypto_sign_keypair()[1][: constants.key_len_bytes] for _ in range(count)
+        ]
+
+    prefix_bytes_len = (len(prefix) * 5 + 7) // 8
+    private_keys = []
+    for _ in range(count):
+        public_key, secret_key = crypto_sign_keypair()
+        if base64.b32encode(public_key[:prefix_bytes_len]).decode().startswith(prefix):
+            private_keys.append(secret_key[: constants.key_len_bytes])
+    return private_keys
+
+
+async def _run_cpu_bound_batches(
+    func: Callable[..., list[bytes]],
+    batch_args: Iterator[tuple[Any, ...]],
+) -> AsyncIterator[list[bytes]]:
+    """
+    Runs batches on the process pool, keeping one batch in flight per CPU core.
+    Batch results are yielded as soon as they complete.
+
+    Batches that have not yet started are cancelled when the generator is closed.
+    """
+    max_pending = os.cpu_count() or 1
+    pending: set[asyncio.Task[list[bytes]]] = set()
+    try:
+        while True:
+            while (
+                len(pending) < max_pending
+                and (args := next(batch_args, None)) is not None
+            ):
+                pending.add(asyncio.create_task(schedule_cpu_bound_task(func, *args)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def generate_private_keys(
+    count: int,
+    batch_size: int = 1000,
+) -> AsyncIterator[AlgoPrivateKey]:
+    """
+    Generates new private keys in batches, which are spread across all CPU cores using the process pool.
+    Keys are yielded as batches complete.
+
+    Notes
+    -----
+    - Use `contextlib.aclosing()` to stop early - pending batches are cancelled when the generator is closed.
+
+    :param count: number of keys to generate
+    :param batch_size: number of keys generated per process pool task
+    """
+    if count < 0:
+        raise ValueError("count must be >= 0")
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+
+    batches = ((min(batch_size, count - i),) for i in range(0, count, batch_size))
+    async with aclosing(
+        _run_cpu_bound_batches(_generate_private_keys, batches)
+    ) as results:
+        async for private_keys in results:
+            for private_key in private_keys:
+                yield AlgoPrivateKey(private_key)
+
+
+async def search_private_keys(
+    prefix: str,
+    count: int = 1,
+    batch_size: int = 10_000,
+) -> AsyncIterator[AlgoPrivateKey]:
+    """
+    Searches for private keys whose address starts with the specified prefix, i.e., vanity addresses.
+    The search is spread across all CPU cores using the process pool. Matching keys are yielded as they are found.
+
+    Notes
+    -----
+    - Each additional prefix char increases the expected search time 32x.
+    - Use `contextlib.aclosing()` to stop early - pending batches are cancelled when the generator is closed.
+
+    :param prefix: base32 address prefix - max length is 51
+    :param count: number of matching keys to find
+    :param batch_size: number of keys generated per process pool task
+    """
+    if not prefix or len(prefix) > _max_address_prefix_len:
+        raise ValueError(
+            f"prefix length must be between 1 and {_max_address_prefix_len}"
+        )
+    if not set(prefix) <= _base32_chars:
+        raise ValueError("prefix must only contain base32 chars: A-Z, 2-7")
+    if count < 1:
+        raise ValueError("count must be >= 1")
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+
+    async with aclosing(
+        _run_cpu_bound_batches(_generate_private_keys, repeat((batch_size, prefix)))
+    ) as results:
+        async for private_keys in results:
+            for private_key in private_keys:
+                yield AlgoPrivateKey(private_key)
+                count -= 1
+                if count == 0:
+                    return
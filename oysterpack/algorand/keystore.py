@@ -0,0 +1,282 @@
+"""
+Local encrypted keystore for :type:`AlgoPrivateKey` records.
+
+The keystore is a SQLite database file:
+- Each private key is individually encrypted using a secret key derived from the keystore password (Argon2id).
+  This enables a single key to be loaded without decrypting the whole keystore.
+- Private keys are indexed by their Algorand address.
+- The encrypted private key is bound to its address, i.e., encrypted records cannot be swapped between addresses.
+
+The keystore is designed for offline and hot-wallet signing, where keys are loaded into memory once and then used to
+sign locally, i.e., without a KMD round trip per signature.
+"""
+import sqlite3
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+
+import nacl.pwhash.argon2id
+from algosdk.encoding import decode_address
+from nacl.bindings import (
+    crypto_aead_xchacha20poly1305_ietf_decrypt,
+    crypto_aead_xchacha20poly1305_ietf_encrypt,
+    crypto_aead_xchacha20poly1305_ietf_KEYBYTES,
+    crypto_aead_xchacha20poly1305_ietf_NPUBBYTES,
+)
+from nacl.exceptions import CryptoError
+from nacl.utils import random
+
+from oysterpack.algorand import Address
+from oysterpack.algorand.keys import AlgoPrivateKey
+
+_keystore_version = 1
+
+# used to verify the password when the keystore is opened
+_password_check = b"oysterpack.algorand.keystore"
+
+_schema = """
+CREATE TABLE metadata (
+    version INTEGER NOT NULL,
+    salt BLOB NOT NULL,
+    ops_limit INTEGER NOT NULL,
+    mem_limit INTEGER NOT NULL,
+    password_check BLOB NOT NULL
+);
+CREATE TABLE private_keys (
+    address TEXT PRIMARY KEY,
+    encrypted_key BLOB NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def derive_secret_key(
+    password: str,
+    salt: bytes,
+    ops_limit: int = nacl.pwhash.argon2id.OPSLIMIT_INTERACTIVE,
+    mem_limit: int = nacl.pwhash.argon2id.MEMLIMIT_INTERACTIVE,
+) -> bytes:
+    """
+    Derives a 32 byte secret key from the password using Argon2id.
+
+    :param salt: must be `nacl.pwhash.argon2id.SALTBYTES` long
+    """
+    return nacl.pwhash.argon2id.kdf(
+        crypto_aead_xchacha20poly1305_ietf_KEYBYTES,
+        password.encode(),
+        salt,
+        opslimit=ops_limit,
+        memlimit=mem_limit,
+    )
+
+
+def _encrypt(secret_key: bytes, data: bytes, aad: bytes) -> bytes:
+    nonce = random(crypto_aead_xchacha20poly1305_ietf_NPUBBYTES)
+    return nonce + crypto_aead_xchacha20poly1305_ietf_encrypt(
+        data, aad, nonce, secret_key
+    )
+
+
+def _decrypt(secret_key: bytes, data: bytes, aad: bytes) -> bytes:
+    return crypto_aead_xchacha20poly1305_ietf_decrypt(
+        data[crypto_aead_xchacha20poly1305_ietf_NPUBBYTES:],
+        aad,
+        data[:crypto_aead_xchacha20poly1305_ietf_NPUBBYTES],
+        secret_key,
+    )
+
+
+class KeyStore:
+    """
+    Local encrypted keystore
+
+    Use `KeyStore.create()` to create a new keystore file, and `KeyStore.open()` to open an existing keystore file.
+
+    Notes
+    -----
+    - KeyStore is a context manager, which closes the keystore on exit.
+    - KeyStore is thread safe, i.e., it can be used via `schedule_blocking_io_task()`.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, secret_key: bytes):
+        self._connection = connection
+        self._secret_key = secret_key
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(
+        cls,
+        path: Path,
+        password: str,
+        ops_limit: int = nacl.pwhash.argon2id.OPSLIMIT_INTERACTIVE,
+        mem_limit: int = nacl.pwhash.argon2id.MEMLIMIT_INTERACTIVE,
+    ) -> Self:
+        """
+        Creates a new keystore file.
+
+        :param ops_limit: Argon2id password hashing ops limit
+        :param mem_limit: Argon2id password hashing memory limit
+        :raises FileExistsError: if the file already exists
+        :raises ValueError: if the password is blank
+        """
+        if not password.strip():
+            raise ValueError("password cannot be blank")
+        if path.exists():
+            raise FileExistsError(path)
+
+        salt = random(nacl.pwhash.argon2id.SALTBYTES)
+        secret_key = derive_secret_key(password, salt, ops_limit, mem_limit)
+        connection = sqlite3.connect(path, check_same_thread=False)
+        with connection:
+            connection.executescript(_schema)
+            connection.execute(
+                "INSERT INTO metadata VALUES (?, ?, ?, ?, ?)",
+                (
+                    _keystore_version,
+                    salt,
+                    ops_limit,
+                    mem_limit,
+                    _encrypt(secret_key, _password_check, b""),
+                ),
+            )
+        return cls(connection, secret_key)
+
+    @classmethod
+    def open(cls, path: Path, password: str) -> Self:
+        """
+        Opens an existing keystore file.
+
+        :raises FileNotFoundError: if the file does not exist
+        :raises ValueError: if the password is invalid
+        """
+        if not path.exists():
+            raise FileNotFoundError(path)
+
+        connection = sqlite3.connect(path, check_same_thread=False)
+        try:
+            (version, salt, ops_limit, mem_limit, password_check) = connection.execute(
+                "SELECT version, salt, ops_limit, mem_limit, password_check FROM metadata"
+            ).fetchone()
+            if version != _keystore_version:
+                raise ValueError(f"unsupported keystore version: {version}")
+            secret_key = derive_secret_key(password, salt, ops_limit, mem_limit)
+            try:
+                _decrypt(secret_key, password_check, b"")
+            except CryptoError as err:
+                raise ValueError("invalid password") from err
+        except Exception:
+            connection.close()
+            raise
+        return cls(connection, secret_key)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ):
+        self.close()
+
+    def _encrypt_private_key(self, private_key: AlgoPrivateKey) -> tuple[str, bytes]:
+        address = private_key.signing_address
+        return (
+            address,
+            _encrypt(self._secret_key, bytes(private_key), decode_address(address)),
+        )
+
+    def _decrypt_private_key(
+        self, address: str, encrypted_key: bytes
+    ) -> AlgoPrivateKey:
+        return AlgoPrivateKey(
+            _decrypt(self._secret_key, encrypted_key, decode_address(address))
+        )
+
+    def add(self, private_key: AlgoPrivateKey) -> Address:
+        """
+        Adds the private key to the keystore. If the keystore already contains the key, then this is a no-op.
+
+        :return: private key address
+        """
+        self.add_all([private_key])
+        return private_key.signing_address
+
+    def add_all(self, private_keys: Iterable[AlgoPrivateKey]):
+        """
+        Adds the private keys to the keystore using a single transaction.
+        """
+        records = [self._encrypt_private_key(key) for key in private_keys]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO private_keys VALUES (?, ?)", records
+            )
+
+    def delete(self, address: Address) -> bool:
+        """
+        :return: True if the private key was deleted
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM private_keys WHERE address = ?", (address,)
+            )
+        return cursor.rowcount > 0
+
+    def __contains__(self, address: Address) -> bool:
+        with self._lock:
+            return (
+                self._connection.execute(
+                    "SELECT 1 FROM private_keys WHERE address = ?", (address,)
+                ).fetchone()
+                is not None
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM private_keys"
+            ).fetchone()[0]
+
+    def addresses(self) -> list[Address]:
+        """
+        :return: addresses for all private keys in the keystore
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT address FROM private_keys"
+            ).fetchall()
+        return [Address(address) for (address,) in rows]
+
+    def get(self, address: Address) -> AlgoPrivateKey | None:
+        """
+        Loads and decrypts a single private key.
+
+        :return: None if the keystore does not contain the address
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT address, encrypted_key FROM private_keys WHERE address = ?",
+                (address,),
+            ).fetchone()
+        return None if row is None else self._decrypt_private_key(*row)
+
+    def load_all(self) -> dict[Address, AlgoPrivateKey]:
+        """
+        Loads and decrypts all private keys into memory.
+
+        :return: private keys indexed by address
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT address, encrypted_key FROM private_keys"
+            ).fetchall()
+        return {
+            Address(address): self._decrypt_private_key(address, encrypted_key)
+            for address, encrypted_key in rows
+        }
@@ -4,8 +4,15 @@ Provides support for KMD wallet-derived Algorand accounts
 https://developer.algorand.org/docs/get-details/accounts/create/#wallet-derived-kmd
 """
 import asyncio
-from asyncio import get_running_loop
+import base64
+import hmac
+import logging
+import time
+from asyncio import Queue, QueueEmpty, get_running_loop
+from collections.abc import AsyncIterator, Callable, Iterable
+from contextlib import aclosing, asynccontextmanager
 from dataclasses import dataclass
+from types import TracebackType
 from typing import Any, Self, cast
 
 from algosdk import kmd, mnemonic
@@ -24,24 +31,158 @@ from password_validator import PasswordValidator
 
 from oysterpack.algorand import Address, Mnemonic, TxnId
 from oysterpack.algorand.algod import AsyncAlgodClient
+from oysterpack.algorand.keys import AlgoPrivateKey
 from oysterpack.algorand.transactions import (
     create_rekey_txn,
 )
-from oysterpack.core.asyncio.task_manager import schedule, schedule_blocking_io_task
+from oysterpack.core.asyncio.concurrency import map_concurrently
+from oysterpack.core.asyncio.task_manager import (
+    run_coroutine,
+    schedule,
+    schedule_blocking_io_task,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+def derive_private_key(master_derivation_key: bytes, index: int) -> AlgoPrivateKey:
+    """
+    Derives the wallet key at the specified index, the same way that the KMD SQLite wallet driver generates keys.
+
+    The key seed is HKDF-Expand(SHA512/256, master derivation key, info=uint64(index)), i.e., because the
+    SHA512/256 digest is 32 bytes, the seed is the first HKDF output block: HMAC-SHA512/256(mdk, uint64(index) || 0x01)
+
+    :param master_derivation_key: raw 32 byte master derivation key
+    :param index: key derivation index - KMD generates keys in index order, starting at 0
+    """
+    return AlgoPrivateKey(
+        hmac.digest(
+            master_derivation_key, index.to_bytes(8, "big") + b"\x01", "sha512_256"
+        )
+    )
+
+
+class _WalletAddressCache:
+    """
+    Caches a set of wallet addresses, which is loaded from the KMD server on demand.
+
+    Notes
+    -----
+    - Concurrent cache misses share a single in flight load.
+    - Addresses that are added or discarded while the load is in flight are applied to the loaded addresses.
+    - If the cache is replaced or invalidated while the load is in flight, then the loaded addresses are stale,
+      i.e., they are returned to the callers that were already waiting, but are not cached. Later callers wait for a
+      new load.
+    """
+
+    def __init__(self, list_addresses: Callable[[], list[str]], ttl: float | None):
+        """
+        :param list_addresses: used to load the addresses from the wallet
+        :param ttl: time to live in seconds - if None, then the cache does not expire
+        """
+        self._list_addresses = list_addresses
+        self._ttl = ttl
+        self._addresses: set[Address] | None = None
+        self._loaded_at = 0.0
+        self._load: asyncio.Task[set[Address]] | None = None
+        # (address, added) changes that are made while the load is in flight
+        self._changes: list[tuple[Address, bool]] = []
+        # incremented when the cached addresses are replaced or invalidated
+        self._version = 0
+        # cache version when the in flight load started
+        self._load_version = 0
+
+    def _expired(self) -> bool:
+        return self._ttl is not None and time.monotonic() - self._loaded_at >= self._ttl
+
+    async def get(self) -> set[Address]:
+        while True:
+            if self._addresses is not None and not self._expired():
+                return self._addresses
+            if (load := self._load) is None:
+                self._load_version = self._version
+                self._changes = []
+                load = self._load = asyncio.create_task(self._load_addresses())
+                break
+            if self._load_version == self._version:
+                break
+            # the in flight load started before the cache was replaced or invalidated
+            await asyncio.wait([load])
+        # shielded because the load is shared by concurrent callers
+        return await asyncio.shield(load)
+
+    async def _load_addresses(self) -> set[Address]:
+        version = self._load_version
+        try:
+            addresses = {
+                Address(address)
+                for address in await schedule_blocking_io_task(self._list_addresses)
+            }
+            for address, added in self._changes:
+                if added:
+                    addresses.add(address)
+                else:
+                    addresses.discard(address)
+        finally:
+            self._load = None
+            self._changes = []
+        if version != self._version:
+            return addresses if self._addresses is None else self._addresses
+        self._addresses = addresses
+        self._loaded_at = time.monotonic()
+        return addresses
+
+    def set(self, addresses: list[str]):
+        self._addresses = {Address(address) for address in addresses}
+        self._loaded_at = time.monotonic()
+        self._version += 1
+
+    def add(self, address: Address):
+        if self._load is not None:
+            self._changes.append((address, True))
+        if self._addresses is not None:
+            self._addresses.add(address)
+
+    def discard(self, address: Address):
+        if self._load is not None:
+            self._changes.append((address, False))
+        if self._addresses is not None:
+            self._addresses.discard(address)
+
+    def invalidate(self):
+        self._addresses = None
+        self._version += 1
 
 
 class WalletSession(TransactionSigner):
     """
     Represents an open wallet connection
+
+    Wallet account and multisig addresses are cached by the session to avoid a KMD round trip per membership check.
+    The cache is kept up to date with the changes made through this session. Changes made to the wallet outside
+    this session are picked up when the cache expires, or when the cache is invalidated via `invalidate_cache()`.
     """
 
-    def __init__(self, wallet: KMDWallet, algod_client: AlgodClient | AsyncAlgodClient):
+    def __init__(
+        self,
+        wallet: KMDWallet,
+        algod_client: AlgodClient | AsyncAlgodClient,
+        cache_ttl: float | None = None,
+        on_rename: Callable[[str, str], None] | None = None,
+    ):
+        """
+        :param cache_ttl: wallet address cache time to live in seconds - if None, then the cache does not expire
+        :param on_rename: called with (old name, new name) when the wallet is renamed
+        """
         super().__init__()
         self._wallet = wallet
+        self._on_rename = on_rename
         if isinstance(algod_client, AlgodClient):
             self._algod_client = AsyncAlgodClient(algod_client)
         else:
             self._algod_client = algod_client
+        self._accounts = _WalletAddressCache(wallet.list_keys, cache_ttl)
+        self._multisigs = _WalletAddressCache(wallet.list_multisig, cache_ttl)
 
     def __del__(self):
         """
@@ -68,22 +209,43 @@ class WalletSession(TransactionSigner):
         indexes: list[int],
     ) -> list[SignedTransaction | LogicSigTransaction | MultisigTransaction]:
         """
+        Sync adapter for `sign_transaction_group()`, which is required by the :type:`TransactionSigner` interface.
+
+        The transactions are signed concurrently on the shared background event loop, i.e., an event loop is not
+        created per transaction.
 
         :param txn_group:
         :param indexes: array of indexes in the atomic transaction group that should be signed
         :return:
         """
-
-        def sign(txn: Transaction) -> SignedTransaction | MultisigTransaction:
-            with asyncio.Runner() as runner:
-                return runner.run(self.sign_transaction(txn))
-
-        return [sign(txn_group[i]) for i in indexes]
+        return cast(
+            list[SignedTransaction | LogicSigTransaction | MultisigTransaction],
+            run_coroutine(self.sign_transaction_group(txn_group, indexes)),
+        )
 
     @property
     def wallet_name(self) -> str:
         return self._wallet.name
 
+    async def release(self):
+        """
+        Releases the wallet handle, i.e., disconnects the wallet.
+        If the session is used after it is released, then a new wallet handle will be initialized.
+        """
+        if self._wallet.handle:
+            try:
+                await schedule_blocking_io_task(self._wallet.release_handle)
+            except KMDHTTPError:
+                # the handle has already expired
+                self._wallet.handle = None
+
+    def invalidate_cache(self):
+        """
+        Invalidates the cached wallet account and multisig addresses, which forces them to be reloaded on next use.
+        """
+        self._accounts.invalidate()
+        self._multisigs.invalidate()
+
     async def export_master_derivation_key(self) -> Mnemonic:
         """
         Exports the wallets master derivation key in mnemonic form.
@@ -105,7 +267,10 @@ class WalletSession(TransactionSigner):
                 "new wallet name cannot be the same as the current wallet name"
             )
 
+        old_name = self._wallet.name
         await schedule_blocking_io_task(self._wallet.rename, new_name)
+        if self._on_rename:
+            self._on_rename(old_name, new_name)
 
     async def generate_account(self) -> Address:
         """
@@ -115,26 +280,74 @@ class WalletSession(TransactionSigner):
         -----
         keys generated by the wallet can be recovered when the wallet is recovered.
         """
-        return Address(await schedule_blocking_io_task(self._wallet.generate_key))
+        address = Address(await schedule_blocking_io_task(self._wallet.generate_key))
+        self._accounts.add(address)
+        return address
+
+    async def generate_accounts(
+        self,
+        count: int,
+        max_concurrency: int = 10,
+    ) -> AsyncIterator[Address]:
+        """
+        Bulk version of `generate_account()`, which generates the keys concurrently.
+
+        Addresses are streamed back as they are generated.
+
+        :param count: number of keys to generate
+        :param max_concurrency: max number of concurrent KMD requests
+        """
+        if count < 0:
+            raise ValueError("count must be >= 0")
+
+        async def generate_account(_: int) -> Address:
+            return await self.generate_account()
+
+        async with aclosing(
+            map_concurrently(generate_account, range(count), max_concurrency)
+        ) as results:
+            async for _, address in results:
+                yield address
+
+    async def import_private_key(self, private_key: AlgoPrivateKey) -> Address:
+        """
+        Imports the private key into this wallet.
+
+        Notes
+        -----
+        Imported keys cannot be recovered when the wallet is recovered using its master derivation key.
+        """
+        address = Address(
+            await schedule_blocking_io_task(
+                self._wallet.import_key,
+                base64.b64encode(
+                    bytes(private_key) + bytes(private_key.signing_key.verify_key)
+                ).decode(),
+            )
+        )
+        self._accounts.add(address)
+        return address
 
     async def list_accounts(self) -> list[Address]:
         """
         :return: list of addresses that are registered in this wallet
         """
         accounts = await schedule_blocking_io_task(self._wallet.list_keys)
+        self._accounts.set(accounts)
         return [Address(address) for address in accounts]
 
     async def contains_account(self, address: Address) -> bool:
         """
         :return: True if the wallet contains the specified address
         """
-        return address in await self.list_accounts()
+        return address in await self._accounts.get()
 
     async def delete_account(self, address: Address):
         """
         Delete the account from the wallet for the specified address.
         """
         await schedule_blocking_io_task(self._wallet.delete_key, address)
+        self._accounts.discard(address)
 
     async def export_private_key(self, address: Address) -> Mnemonic:
         """
@@ -143,6 +356,25 @@ class WalletSession(TransactionSigner):
         private_key = await schedule_blocking_io_task(self._wallet.export_key, address)
         return Mnemonic.from_word_list(mnemonic.from_private_key(private_key))
 
+    async def export_private_keys(
+        self,
+        addresses: Iterable[Address],
+        max_concurrency: int = 10,
+    ) -> AsyncIterator[tuple[Address, Mnemonic]]:
+        """
+        Bulk version of `export_private_key()`, which exports the private keys concurrently.
+
+        Results are streamed back as they complete, i.e., not in `addresses` order.
+
+        :param max_concurrency: max number of concurrent KMD requests
+        :return: (address, mnemonic) pairs
+        """
+        async with aclosing(
+            map_concurrently(self.export_private_key, addresses, max_concurrency)
+        ) as results:
+            async for result in results:
+                yield result
+
     async def sign_transaction(
         self, txn: Transaction
     ) -> SignedTransaction | MultisigTransaction:
@@ -154,11 +386,75 @@ class WalletSession(TransactionSigner):
         """
 
         signing_address = await self._algod_client.get_auth_address(Address(txn.sender))
+        multisig = (
+            await self.export_multisig(signing_address)
+            if await self.contains_multisig(signing_address)
+            else None
+        )
+        return await self._sign_transaction(txn, signing_address, multisig)
+
+    async def sign_transaction_group(
+        self,
+        txn_group: list[Transaction],
+        indexes: list[int],
+        max_concurrency: int = 10,
+    ) -> list[SignedTransaction | MultisigTransaction]:
+        """
+        Signs the transactions at the specified indexes in the transaction group concurrently.
+
+        Signers are resolved once for the whole group, before any transactions are signed:
+        - sender auth addresses are looked up in a single batch via the algod client auth address cache
+        - each multisig signing account is exported from the wallet once
+
+        :param indexes: indexes in the transaction group that should be signed
+        :param max_concurrency: max number of concurrent KMD requests
+        :return: signed transactions in `indexes` order
+        :exception KeyNotFoundError: if the wallet does not contain a transaction signing account
+        """
+        txns = [txn_group[i] for i in indexes]
+        auth_addresses, _accounts, wallet_multisigs = await asyncio.gather(
+            self._algod_client.get_auth_addresses(
+                {Address(txn.sender) for txn in txns}, max_concurrency
+            ),
+            self._accounts.get(),
+            self._multisigs.get(),
+        )
+        multisigs = {
+            address: cast(Multisig, multisig)
+            async for address, multisig in map_concurrently(
+                self.export_multisig,
+                set(auth_addresses.values()) & wallet_multisigs,
+                max_concurrency,
+            )
+        }
 
-        if await self.contains_multisig(signing_address):
-            multisig = await self.export_multisig(signing_address)
+        async def sign(i: int) -> SignedTransaction | MultisigTransaction:
+            signing_address = auth_addresses[Address(txns[i].sender)]
+            return await self._sign_transaction(
+                txns[i], signing_address, multisigs.get(signing_address)
+            )
+
+        signed_txns = {
+            i: signed_txn
+            async for i, signed_txn in map_concurrently(
+                sign, range(len(txns)), max_concurrency
+            )
+        }
+        return [signed_txns[i] for i in range(len(txns))]
+
+    async def _sign_transaction(
+        self,
+        txn: Transaction,
+        signing_address: Address,
+        multisig: Multisig | None,
+    ) -> SignedTransaction | MultisigTransaction:
+        """
+        :param signing_address: transaction sender auth address
+        :param multisig: must be specified if the signing address is a wallet multisig
+        """
+        if multisig is not None:
             return await self.sign_multisig_transaction(
-                MultisigTransaction(txn, cast(Multisig, multisig))
+                MultisigTransaction(txn, multisig)
             )
 
         if signing_address == txn.sender:
@@ -175,22 +471,22 @@ class WalletSession(TransactionSigner):
         # see - https://github.com/algorand/py-algorand-sdk/issues/436
         try:
             # TODO: remove this hacky work around when the issue is fixed
-            import base64
-
             signing_address_bytes = base64.b32decode(
                 signing_address.encode("utf-8") + b"=" * 6
             )
-            signing_address = Address(base64.b64encode(signing_address_bytes).decode())
+            public_key = base64.b64encode(signing_address_bytes).decode()
             #
 
-            self._wallet.automate_handle()
-            return await schedule_blocking_io_task(
-                self._wallet.kcl.sign_transaction,
-                self._wallet.handle,
-                self._wallet.pswd,
-                txn,
-                signing_address,
-            )
+            def sign() -> SignedTransaction:
+                self._wallet.automate_handle()
+                return self._wallet.kcl.sign_transaction(
+                    self._wallet.handle,
+                    self._wallet.pswd,
+                    txn,
+                    public_key,
+                )
+
+            return await schedule_blocking_io_task(sign)
         except KMDHTTPError:
             # fallback to exporting the key and signing the transaction on the client side
             return txn.sign(
@@ -216,7 +512,10 @@ class WalletSession(TransactionSigner):
         )
         signed_txn = await self.sign_transaction(txn)
         txid = await self._algod_client.send_transaction(signed_txn)
-        await self._algod_client.wait_for_confirmation(txid)
+        txn_info = await self._algod_client.wait_for_confirmation(txid)
+        self._algod_client.auth_address_cache.put(
+            account, to, txn_info["confirmed-round"]
+        )
         return txid
 
     async def rekey_back(self, account: Address) -> TxnId:
@@ -249,13 +548,13 @@ class WalletSession(TransactionSigner):
         if await self.contains_multisig(multisig.address()):
             return multisig.address()
 
-        for address in multisig.get_public_keys():
-            if await self.contains_account(address):
-                return Address(
-                    await schedule_blocking_io_task(
-                        self._wallet.import_multisig, multisig
-                    )
-                )
+        accounts = await self._accounts.get()
+        if any(address in accounts for address in multisig.get_public_keys()):
+            address = Address(
+                await schedule_blocking_io_task(self._wallet.import_multisig, multisig)
+            )
+            self._multisigs.add(address)
+            return address
 
         raise AssertionError("at least one of the accounts must exist in this wallet")
 
@@ -264,26 +563,53 @@ class WalletSession(TransactionSigner):
         :param address: multisig address
         :return: True if the wallet contains the multisig
         """
-        return address in await schedule_blocking_io_task(self._wallet.list_multisig)
+        return address in await self._multisigs.get()
 
     async def delete_multisig(self, address: Address) -> bool:
         """
         :param address: multisig address
         :return: True if the multisig was deleted
         """
-        return await schedule_blocking_io_task(self._wallet.delete_multisig, address)
+        deleted = await schedule_blocking_io_task(self._wallet.delete_multisig, address)
+        self._multisigs.discard(address)
+        return deleted
 
-    async def list_multisigs(self) -> dict[Address, Multisig]:
+    async def list_multisigs(
+        self, max_concurrency: int = 10
+    ) -> dict[Address, Multisig]:
         """
         Returns list of multisig accounts that have been imported into this wallet.
+
+        :param max_concurrency: max number of concurrent KMD requests
         """
+        addresses = await schedule_blocking_io_task(self._wallet.list_multisig)
+        self._multisigs.set(addresses)
         return {
-            address: await schedule_blocking_io_task(
-                self._wallet.export_multisig, address
+            address: cast(Multisig, multisig)
+            async for address, multisig in self.export_multisigs(
+                addresses, max_concurrency
             )
-            for address in await schedule_blocking_io_task(self._wallet.list_multisig)
         }
 
+    async def export_multisigs(
+        self,
+        addresses: Iterable[Address],
+        max_concurrency: int = 10,
+    ) -> AsyncIterator[tuple[Address, Multisig | None]]:
+        """
+        Bulk version of `export_multisig()`, which exports the multisigs concurrently.
+
+        Results are streamed back as they complete, i.e., not in `addresses` order.
+
+        :param max_concurrency: max number of concurrent KMD requests
+        :return: (address, multisig) pairs - multisig is None if this wallet does not contain the multisig
+        """
+        async with aclosing(
+            map_concurrently(self.export_multisig, addresses, max_concurrency)
+        ) as results:
+            async for result in results:
+                yield result
+
     async def export_multisig(self, address: Address) -> Multisig | None:
         """
         :param address: multisig address
@@ -306,28 +632,41 @@ class WalletSession(TransactionSigner):
         - Rekeyed accounts are not taken into consideration when signing multisig transaction. For example,
           if a multisig contains an account that has been rekeyed, the account is still required to sign the
           multisig txn, i.e., not the account that it has been rekeyed to.
-
+        - Cosigner membership is checked against the cached wallet accounts, i.e., a single wallet key listing.
+        - Cosigners sign concurrently, and their signatures are merged.
 
         :return: multisig txn with added signatures
         """
-        multisig = await self.export_multisig(txn.multisig.address())
-        if multisig is None:
+        if not await self.contains_multisig(txn.multisig.address()):
             raise AssertionError("multsig does not exist in this wallet")
 
+        public_keys = txn.multisig.get_public_keys()
+        wallet_accounts = await self._accounts.get()
         if account is not None:
-            if account not in multisig.get_public_keys():
+            if account not in public_keys:
                 raise AssertionError("multisig does not contain the specified account")
-            if not await self.contains_account(account):
+            if account not in wallet_accounts:
                 raise AssertionError("signing account does not exist in this wallet")
-            return await schedule_blocking_io_task(
-                self._wallet.sign_multisig_transaction, account, txn
+            signers = [account]
+        else:
+            signers = [
+                Address(public_key)
+                for public_key in dict.fromkeys(public_keys)
+                if public_key in wallet_accounts
+            ]
+        if not signers:
+            return txn
+
+        def sign(signer: Address) -> MultisigTransaction:
+            # KMD replaces the multisig on the txn that it signs, i.e., each signer signs its own copy
+            return self._wallet.sign_multisig_transaction(
+                signer, MultisigTransaction(txn.transaction, txn.multisig)
             )
 
-        for account in multisig.get_public_keys():
-            if await self.contains_account(account):
-                txn = self._wallet.sign_multisig_transaction(account, txn)
-
-        return txn
+        signed_txns = await asyncio.gather(
+            *(schedule_blocking_io_task(sign, signer) for signer in signers)
+        )
+        return cast(MultisigTransaction, MultisigTransaction.merge(signed_txns))
 
 
 @dataclass(slots=True)
@@ -347,6 +686,11 @@ class Wallet:
 class KmdService:
     """
     KMD service
+
+    Wallets are indexed by name to avoid a KMD round trip per wallet lookup. The index is loaded on demand, and is
+    kept up to date with the wallets that are created, recovered, and renamed through this service. Wallet changes
+    made outside this service are picked up when the index expires, when `list_wallets()` is called, or when the
+    index is invalidated via `invalidate_wallet_index()`.
     """
 
     def __init__(
@@ -354,22 +698,62 @@ class KmdService:
         url: str,
         token: str,
         password_validator: PasswordValidator | None = None,
+        wallet_index_ttl: float | None = None,
     ):
         """
         :param url: KMD connection URL
         :param token: KMD API token
         :param password_validator: used when creating new wallets to apply password constraints
+        :param wallet_index_ttl: wallet name index time to live in seconds - if None, then the index does not expire
         """
         self._kmd_client = kmd.KMDClient(kmd_address=url, kmd_token=token)
         self._password_validator = password_validator
+        self._wallet_index_ttl = wallet_index_ttl
+        self._wallet_index: dict[str, Wallet] | None = None
+        self._wallet_index_loaded_at = 0.0
+
+    def _wallet_index_expired(self) -> bool:
+        return (
+            self._wallet_index_ttl is not None
+            and time.monotonic() - self._wallet_index_loaded_at
+            >= self._wallet_index_ttl
+        )
+
+    async def _get_wallet_index(self) -> dict[str, Wallet]:
+        if self._wallet_index is None or self._wallet_index_expired():
+            await self.list_wallets()
+        return cast(dict[str, Wallet], self._wallet_index)
+
+    def _index_wallet(self, wallet: Wallet):
+        if self._wallet_index is not None:
+            self._wallet_index[wallet.name] = wallet
+
+    def _on_wallet_renamed(self, old_name: str, new_name: str):
+        if self._wallet_index is not None and (
+            wallet := self._wallet_index.pop(old_name, None)
+        ):
+            self._wallet_index[new_name] = Wallet(wallet.wallet_id, new_name)
+
+    def invalidate_wallet_index(self):
+        """
+        Invalidates the wallet name index, which forces it to be reloaded on next use.
+        """
+        self._wallet_index = None
 
     async def list_wallets(self) -> list[Wallet]:
         """
-        Returns list of KMD wallets
+        Returns list of KMD wallets. The wallet name index is refreshed.
         """
 
-        wallets = await schedule_blocking_io_task(self._kmd_client.list_wallets)
-        return list(map(Wallet._to_wallet, wallets))
+        wallets = list(
+            map(
+                Wallet._to_wallet,
+                await schedule_blocking_io_task(self._kmd_client.list_wallets),
+            )
+        )
+        self._wallet_index = {wallet.name: wallet for wallet in wallets}
+        self._wallet_index_loaded_at = time.monotonic()
+        return wallets
 
     async def get_wallet(self, name: str) -> Wallet | None:
         """
@@ -377,11 +761,16 @@ class KmdService:
 
         :return : None if the wallet does not exist
         """
-        for wallet in await self.list_wallets():
-            if wallet.name == name:
-                return wallet
+        return (await self._get_wallet_index()).get(name)
+
+    async def get_wallets(self, names: Iterable[str]) -> dict[str, Wallet | None]:
+        """
+        Bulk version of `get_wallet()`
 
-        return None
+        :return: wallets indexed by name - None if the wallet does not exist
+        """
+        wallet_index = await self._get_wallet_index()
+        return {name: wallet_index.get(name) for name in names}
 
     def __validate_wallet_name_password(
         self, name: str, password: str
@@ -408,11 +797,13 @@ class KmdService:
         :raises KMDHTTPError:
         """
         name, password = self.__validate_wallet_name_password(name, password)
-        new_wallet = await schedule_blocking_io_task(
-            self._kmd_client.create_wallet, name, password
+        new_wallet = Wallet._to_wallet(
+            await schedule_blocking_io_task(
+                self._kmd_client.create_wallet, name, password
+            )
         )
-
-        return Wallet._to_wallet(new_wallet)
+        self._index_wallet(new_wallet)
+        return new_wallet
 
     async def recover_wallet(
         self,
@@ -436,30 +827,304 @@ class KmdService:
         """
 
         name, password = self.__validate_wallet_name_password(name, password)
-        recovered_wallet = await schedule_blocking_io_task(
-            self._kmd_client.create_wallet,
-            name,
-            password,
-            "sqlite",  # driver_name
-            master_derivation_key.to_kmd_master_derivation_key(),
+        recovered_wallet = Wallet._to_wallet(
+            await schedule_blocking_io_task(
+                self._kmd_client.create_wallet,
+                name,
+                password,
+                "sqlite",  # driver_name
+                master_derivation_key.to_kmd_master_derivation_key(),
+            )
         )
-        return Wallet._to_wallet(recovered_wallet)
+        self._index_wallet(recovered_wallet)
+        return recovered_wallet
 
     async def connect(
-        self, name: str, password: str, algod_client: AlgodClient | AsyncAlgodClient
+        self,
+        name: str,
+        password: str,
+        algod_client: AlgodClient | AsyncAlgodClient,
+        cache_ttl: float | None = None,
     ) -> WalletSession:
         """
         Connect to a wallet
 
         :param name: wallet name
         :param password: wallet password
+        :param cache_ttl: wallet address cache time to live in seconds - if None, then the cache does not expire
         :return: WalletSession
         """
 
-        kmd_wallet = await schedule_blocking_io_task(
-            KMDWallet,
+        kmd_wallet = await self._open_wallet(name, password)
+        return WalletSession(
+            kmd_wallet, algod_client, cache_ttl, on_rename=self._on_wallet_renamed
+        )
+
+    async def _open_wallet(
+        self,
+        name: str,
+        password: str,
+        wallet_cls: type[KMDWallet] = KMDWallet,
+    ) -> KMDWallet:
+        return await schedule_blocking_io_task(
+            wallet_cls,
             name,
             password,
             self._kmd_client,
         )
-        return WalletSession(kmd_wallet, algod_client)
+
+
+# wallet handles are renewed when they are about to expire within this many seconds
+_handle_expiry_margin = 5.0
+
+
+class _PooledKMDWallet(KMDWallet):
+    """
+    The algosdk wallet renews its handle before every operation, i.e., each operation costs an extra KMD round trip.
+    Pooled wallet handles are renewed in the background by :type:`WalletSessionPool`. Thus, the handle is only
+    renewed on demand, if it is about to expire.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        self.handle_expires_at = 0.0
+        super().__init__(*args, **kwargs)
+
+    def init_handle(self) -> bool:
+        super().init_handle()
+        self.renew_handle()
+        return True
+
+    def renew_handle(self) -> dict[str, Any]:
+        resp = super().renew_handle()
+        self.handle_expires_at = time.monotonic() + resp["expires_seconds"]
+        return resp
+
+    def automate_handle(self) -> bool:
+        if (
+            self.handle is None
+            or self.handle_expires_at - time.monotonic() < _handle_expiry_margin
+        ):
+            return super().automate_handle()
+        return True
+
+
+@dataclass(slots=True)
+class CheckoutStats:
+    """
+    Wallet session checkout stats
+    """
+
+    checkouts: int = 0
+    total_wait_time: float = 0.0
+    max_wait_time: float = 0.0
+
+    @property
+    def avg_wait_time(self) -> float:
+        return self.total_wait_time / self.checkouts if self.checkouts else 0.0
+
+    def record(self, wait_time: float):
+        self.checkouts += 1
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+
+
+class WalletSessionPool:
+    """
+    Pool of pre-opened wallet sessions keyed by wallet name.
+
+    - Wallets are registered with the pool, which opens the wallet sessions up front.
+    - Wallet sessions are checked out via `session()`, which is an async context manager.
+    - Idle wallet handles are renewed in the background before they expire.
+    - Wallet handles are released when the pool is closed. The pool is an async context manager, which closes the pool
+      on exit.
+
+    Notes
+    -----
+    - Wallet sessions for the same wallet share the wallet address cache.
+    """
+
+    def __init__(
+        self,
+        kmd_service: "KmdService",
+        algod_client: AlgodClient | AsyncAlgodClient,
+        sessions_per_wallet: int = 1,
+        renew_interval: float = 30.0,
+        cache_ttl: float | None = None,
+    ):
+        """
+        :param sessions_per_wallet: number of sessions opened per wallet, i.e., max concurrent checkouts per wallet
+        :param renew_interval: wallet handle renewal interval in seconds - must be less than the KMD session lifetime,
+                               which defaults to 60 secs
+        :param cache_ttl: wallet address cache time to live in seconds - if None, then the cache does not expire
+        """
+        if sessions_per_wallet < 1:
+            raise ValueError("sessions_per_wallet must be >= 1")
+        if renew_interval <= 0:
+            raise ValueError("renew_interval must be > 0")
+
+        self._kmd_service = kmd_service
+        if isinstance(algod_client, AlgodClient):
+            self._algod_client = AsyncAlgodClient(algod_client)
+        else:
+            self._algod_client = algod_client
+        self._sessions_per_wallet = sessions_per_wallet
+        self._renew_interval = renew_interval
+        self._cache_ttl = cache_ttl
+
+        self._sessions: dict[str, list[WalletSession]] = {}
+        self._available: dict[str, Queue[WalletSession]] = {}
+        self._stats: dict[str, CheckoutStats] = {}
+        self._renew_task: asyncio.Task | None = None
+        self._closed = False
+
+    @property
+    def wallet_names(self) -> list[str]:
+        return list(self._sessions)
+
+    async def register(self, name: str, password: str):
+        """
+        Opens the wallet sessions for the specified wallet.
+        If the wallet is already registered, then this is a no-op.
+
+        :raises ValueError: if the pool is closed
+        :raises KMDHTTPError: if the password is invalid
+        """
+        if self._closed:
+            raise ValueError("pool is closed")
+        if name in self._sessions:
+            return
+
+        # the first wallet is opened on its own because the algosdk wallet creates the wallet if it does not exist
+        wallets = [
+            await self._kmd_service._open_wallet(name, password, _PooledKMDWallet)
+        ]
+        wallets += await asyncio.gather(
+            *(
+                self._kmd_service._open_wallet(name, password, _PooledKMDWallet)
+                for _ in range(self._sessions_per_wallet - 1)
+            )
+        )
+        sessions = [
+            WalletSession(
+                wallet,
+                self._algod_client,
+                self._cache_ttl,
+                on_rename=self._kmd_service._on_wallet_renamed,
+            )
+            for wallet in wallets
+        ]
+        for session in sessions[1:]:
+            session._accounts = sessions[0]._accounts
+            session._multisigs = sessions[0]._multisigs
+
+        available: Queue[WalletSession] = Queue()
+        for session in sessions:
+            available.put_nowait(session)
+        self._sessions[name] = sessions
+        self._available[name] = available
+        self._stats[name] = CheckoutStats()
+
+        if self._renew_task is None:
+            self._renew_task = schedule(
+                "WalletSessionPool/renew_handles", self._renew_handles()
+            )
+
+    @asynccontextmanager
+    async def session(self, name: str) -> AsyncIterator[WalletSession]:
+        """
+        Checks out a wallet session, waiting for one to become available if all the wallet sessions are in use.
+        The wallet session is returned to the pool on exit.
+
+        :raises ValueError: if the pool is closed or the wallet is not registered
+        """
+        if self._closed:
+            raise ValueError("pool is closed")
+        if name not in self._available:
+            raise ValueError(f"wallet is not registered: {name}")
+
+        start = time.monotonic()
+        session = await self._available[name].get()
+        self._stats[name].record(time.monotonic() - start)
+        try:
+            yield session
+        finally:
+            # if the pool was closed while the session was checked out, then the session has already been released
+            if not self._closed:
+                self._available[name].put_nowait(session)
+
+    def stats(self, name: str) -> CheckoutStats:
+        """
+        :return: checkout stats for the specified wallet
+        :raises ValueError: if the wallet is not registered
+        """
+        if name not in self._stats:
+            raise ValueError(f"wallet is not registered: {name}")
+        return self._stats[name]
+
+    async def _renew_handles(self):
+        """
+        Only idle sessions are renewed. Each idle session is checked out while its handle is renewed, i.e., handle
+        renewal never runs concurrently with the session's own handle management.
+        Checked out sessions renew their handle on demand.
+        """
+        while True:
+            await asyncio.sleep(self._renew_interval)
+            for available in list(self._available.values()):
+                for _ in range(available.qsize()):
+                    try:
+                        session = available.get_nowait()
+                    except QueueEmpty:
+                        break
+                    try:
+                        await self._renew_handle(
+                            cast(_PooledKMDWallet, session._wallet)
+                        )
+                    finally:
+                        if not self._closed:
+                            available.put_nowait(session)
+
+    async def _renew_handle(self, wallet: _PooledKMDWallet):
+        try:
+            if wallet.handle is None:
+                await schedule_blocking_io_task(wallet.init_handle)
+            else:
+                await schedule_blocking_io_task(wallet.renew_handle)
+        except KMDHTTPError as err:
+            # the handle has expired, e.g., the KMD server was restarted
+            _logger.warning("failed to renew wallet handle [%s]: %s", wallet.name, err)
+            try:
+                await schedule_blocking_io_task(wallet.init_handle)
+            except KMDHTTPError as err:
+                _logger.error("failed to init wallet handle [%s]: %s", wallet.name, err)
+
+    async def close(self):
+        """
+        Stops handle renewal and releases all wallet handles.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._renew_task is not None:
+            self._renew_task.cancel()
+            self._renew_task = None
+
+        sessions = [
+            session for sessions in self._sessions.values() for session in sessions
+        ]
+        await asyncio.gather(
+            *(session.release() for session in sessions), return_exceptions=True
+        )
+        self._sessions.clear()
+        self._available.clear()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ):
+        await self.close()
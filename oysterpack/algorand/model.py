@@ -2,11 +2,14 @@
 Algorand typesafe domain model
 """
 
+import base64
+from collections.abc import Iterable
 from dataclasses import dataclass
 from typing import Self, cast
 
-from algosdk import constants, mnemonic
+from algosdk import constants, encoding, error, mnemonic, wordlist
 from algosdk.logic import get_application_address
+from nacl.signing import SigningKey
 
 
 class Address(str):
@@ -93,6 +96,58 @@ _25WordList = tuple[
 ]
 
 
+# mnemonic words encode 11 bits each
+_mnemonic_word_bits = 11
+_mnemonic_word_mask = (1 << _mnemonic_word_bits) - 1
+# 32 byte key is encoded into 24 words - the 25th word is the checksum
+_mnemonic_key_words = constants.mnemonic_len - 1
+_mnemonic_words: tuple[str, ...] = tuple(wordlist.word_list_raw().split())
+# maps words to their index - also includes 4+ letter word prefixes, which uniquely identify words
+_mnemonic_word_index: dict[str, int] = mnemonic.word_to_index
+
+
+def _mnemonic_checksum_word(key: bytes) -> str:
+    checksum = encoding.checksum(key)
+    return _mnemonic_words[(checksum[0] | checksum[1] << 8) & _mnemonic_word_mask]
+
+
+def _key_to_mnemonic_words(key: bytes) -> _25WordList:
+    """
+    Encodes the key as 11-bit words using little-endian bit order, followed by the checksum word.
+    """
+    if len(key) != constants.key_len_bytes:
+        raise error.WrongKeyBytesLengthError
+    n = int.from_bytes(key, "little")
+    words = [
+        _mnemonic_words[(n >> (i * _mnemonic_word_bits)) & _mnemonic_word_mask]
+        for i in range(_mnemonic_key_words)
+    ]
+    words.append(_mnemonic_checksum_word(key))
+    return cast(_25WordList, tuple(words))
+
+
+def _mnemonic_words_to_key(word_list: _25WordList) -> bytes:
+    """
+    :raises ValueError: if a word is not a mnemonic word
+    :raises WrongChecksumError: if the checksum word does not match the key
+    """
+    n = 0
+    try:
+        for i, word in enumerate(word_list[:_mnemonic_key_words]):
+            n |= _mnemonic_word_index[word.lower()] << (i * _mnemonic_word_bits)
+        checksum_word = _mnemonic_words[_mnemonic_word_index[word_list[-1].lower()]]
+    except KeyError as err:
+        raise ValueError(f"invalid mnemonic word: {err}") from err
+
+    # 24 words encode 264 bits - the bits beyond the 32 byte key must be zero
+    if n >> (constants.key_len_bytes * 8):
+        raise error.WrongChecksumError
+    key = n.to_bytes(constants.key_len_bytes, "little")
+    if _mnemonic_checksum_word(key) != checksum_word:
+        raise error.WrongChecksumError
+    return key
+
+
 @dataclass(slots=True)
 class Mnemonic:
     """Mnemonics are 25 word lists that represent private keys.
@@ -117,8 +172,25 @@ class Mnemonic:
         """
         :param key: first 32 bytes are used as the private key
         """
-        word_list = mnemonic._from_key(key[: constants.key_len_bytes])
-        return cls.from_word_list(word_list)
+        return cls(_key_to_mnemonic_words(key[: constants.key_len_bytes]))
+
+    @classmethod
+    def from_private_keys(cls, keys: Iterable[bytes]) -> list[Self]:
+        """
+        Bulk version of `from_private_key()`
+
+        :param keys: first 32 bytes of each key are used as the private key
+        """
+        return [
+            cls(_key_to_mnemonic_words(key[: constants.key_len_bytes])) for key in keys
+        ]
+
+    @classmethod
+    def to_private_keys_bytes(cls, mnemonics: Iterable[Self]) -> list[bytes]:
+        """
+        Bulk version of `to_private_key_bytes()`
+        """
+        return [_mnemonic_words_to_key(m.word_list) for m in mnemonics]
 
     def __post_init__(self):
         """
@@ -131,7 +203,7 @@ class Mnemonic:
 
     def to_kmd_master_derivation_key(self) -> str:
         """Converts the word list to the base64 encoded KMD wallet master derivation key"""
-        return mnemonic.to_master_derivation_key(str(self))
+        return base64.b64encode(_mnemonic_words_to_key(self.word_list)).decode()
 
     def to_private_key(self) -> str:
         """
@@ -139,7 +211,14 @@ class Mnemonic:
 
         https://developer.algorand.org/docs/get-details/accounts/#transformation-private-key-to-base64-private-key
         """
-        return mnemonic.to_private_key(str(self))
+        key = self.to_private_key_bytes()
+        return base64.b64encode(key + bytes(SigningKey(key).verify_key)).decode()
+
+    def to_private_key_bytes(self) -> bytes:
+        """
+        Converts the word list to the raw 32 byte private key
+        """
+        return _mnemonic_words_to_key(self.word_list)
 
     def __str__(self) -> str:
         return " ".join(self.word_list)
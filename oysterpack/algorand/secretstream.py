@@ -0,0 +1,90 @@
+"""
+Framing for XChaCha20-Poly1305 secretstream encrypted streams
+
+https://doc.libsodium.org/secret-key_cryptography/secretstream
+
+Encrypted streams consist of the secretstream header, followed by length prefixed frames. Each frame is an encrypted
+chunk. The final chunk is tagged, i.e., truncated streams are detected.
+"""
+import struct
+from typing import BinaryIO
+
+from nacl.bindings import (
+    crypto_secretstream_xchacha20poly1305_ABYTES,
+    crypto_secretstream_xchacha20poly1305_pull,
+    crypto_secretstream_xchacha20poly1305_push,
+    crypto_secretstream_xchacha20poly1305_state,
+    crypto_secretstream_xchacha20poly1305_TAG_FINAL,
+    crypto_secretstream_xchacha20poly1305_TAG_MESSAGE,
+)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_STREAM_CHUNK_SIZE = 16 * 1024 * 1024
+
+# encrypted stream frames are prefixed with the frame length
+STREAM_FRAME_LEN = struct.Struct(">I")
+
+
+class TruncatedStreamError(ValueError):
+    """
+    Raised if an encrypted stream ends before its final chunk
+    """
+
+
+def push_stream_frame(
+    state: crypto_secretstream_xchacha20poly1305_state,
+    chunk: bytes,
+    *,
+    final: bool,
+) -> bytes:
+    """
+    :return: length prefixed encrypted frame
+    """
+    frame = crypto_secretstream_xchacha20poly1305_push(
+        state,
+        chunk,
+        tag=crypto_secretstream_xchacha20poly1305_TAG_FINAL
+        if final
+        else crypto_secretstream_xchacha20poly1305_TAG_MESSAGE,
+    )
+    return STREAM_FRAME_LEN.pack(len(frame)) + frame
+
+
+def check_stream_frame_len(frame_len: bytes) -> int:
+    """
+    :param frame_len: encoded frame length prefix
+    :return: frame length
+    :raises ValueError: if the frame length is out of bounds
+    """
+    (length,) = STREAM_FRAME_LEN.unpack(frame_len)
+    if (
+        not crypto_secretstream_xchacha20poly1305_ABYTES
+        <= length
+        <= MAX_STREAM_CHUNK_SIZE + crypto_secretstream_xchacha20poly1305_ABYTES
+    ):
+        raise ValueError(f"invalid encrypted stream frame length: {length}")
+    return length
+
+
+def pull_stream_frame(
+    state: crypto_secretstream_xchacha20poly1305_state,
+    frame: bytes,
+) -> tuple[bytes, bool]:
+    """
+    :return: (decrypted chunk, True if the chunk is the final chunk)
+    """
+    chunk, tag = crypto_secretstream_xchacha20poly1305_pull(state, frame)
+    return chunk, tag == crypto_secretstream_xchacha20poly1305_TAG_FINAL
+
+
+def read_exactly(src: BinaryIO, size: int) -> bytes:
+    """
+    :raises TruncatedStreamError: if EOF is reached before `size` bytes are read
+    """
+    data = src.read(size)
+    while len(data) < size:
+        more = src.read(size - len(data))
+        if not more:
+            raise TruncatedStreamError("encrypted stream is truncated")
+        data += more
+    return data
@@ -0,0 +1,332 @@
+"""
+Pipelined transaction submission
+
+Transactions are queued, submitted to algod by concurrent workers at an adaptive rate, and their confirmations are
+tracked separately, i.e., submission never waits on confirmation.
+"""
+import asyncio
+import logging
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any
+
+from algosdk.error import AlgodHTTPError
+from algosdk.transaction import GenericSignedTransaction
+
+from oysterpack.algorand import TxnId
+from oysterpack.algorand.algod import AsyncAlgodClient
+from oysterpack.core.asyncio.concurrency import AdaptiveRateLimiter
+from oysterpack.core.asyncio.task_manager import schedule
+
+_logger = logging.getLogger(__name__)
+
+# max number of transactions in an atomic transaction group
+_max_group_size = 16
+
+# algod rejection messages that indicate that the node is overloaded, i.e., the submission can be retried
+_overload_messages = ("pool is full", "below threshold", "too many requests")
+
+
+def _is_overloaded(err: Exception) -> bool:
+    if isinstance(err, AlgodHTTPError):
+        if err.code in (429, 503):
+            return True
+        return any(message in str(err).lower() for message in _overload_messages)
+    # connection errors are retried
+    return isinstance(err, OSError)
+
+
+# algod rejection messages that indicate that the transactions were already accepted
+_duplicate_messages = ("already in ledger", "already in pool", "already in txn pool")
+
+
+def _is_duplicate(err: Exception) -> bool:
+    return isinstance(err, AlgodHTTPError) and any(
+        message in str(err).lower() for message in _duplicate_messages
+    )
+
+
+def _fail(future: asyncio.Future, err: Exception):
+    if not future.done():
+        future.set_exception(err)
+        # marks the exception as retrieved, because submission futures are not required to be awaited
+        future.exception()
+
+
+@dataclass(slots=True)
+class Submission:
+    """
+    A transaction, or atomic transaction group, that was queued for submission
+    """
+
+    txns: list[GenericSignedTransaction]
+    txids: list[TxnId]
+    # resolved when the algod node accepts the transactions
+    sent: asyncio.Future[None]
+    # resolved with the pending transaction info of the last transaction when it is confirmed
+    confirmed: asyncio.Future[dict[str, Any]]
+    queued_at: float = field(default_factory=time.monotonic)
+    sent_at: float | None = None
+    attempts: int = 0
+
+
+@dataclass(slots=True)
+class _StageStats:
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    def record(self, secs: float):
+        self.count += 1
+        self.total_time += secs
+        self.max_time = max(self.max_time, secs)
+
+    @property
+    def avg_time(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+
+@dataclass(slots=True)
+class SubmitterMetrics:
+    """
+    Submission pipeline stage metrics snapshot
+
+    Stage times are in seconds:
+    - queue: from queued to picked up by a worker
+    - send: algod submission round trip, including retries
+    - confirm: from sent to confirmed
+    """
+
+    queued: int
+    in_flight: int
+    awaiting_confirmation: int
+    submitted: int
+    confirmed: int
+    failed: int
+    retries: int
+    overloads: int
+    rate: float
+    avg_queue_time: float
+    max_queue_time: float
+    avg_send_time: float
+    max_send_time: float
+    avg_confirm_time: float
+    max_confirm_time: float
+
+
+class TransactionSubmitter:
+    """
+    Submits transactions to algod using a pipeline:
+
+    1. `submit()` enqueues the transaction or atomic group into a bounded queue, which applies backpressure.
+    2. Workers submit queued transactions concurrently, rate limited by a token bucket. Each transaction costs a token.
+       The rate is adapted using AIMD: it increases on success, and is cut when algod rejects submissions because it
+       is overloaded, e.g., the transaction pool is full. Overloaded submissions are retried.
+    3. Confirmations are tracked by the algod client's ConfirmationTracker.
+
+    Notes
+    -----
+    - Atomic groups are submitted as a single raw multi-transaction submission. Independent transactions cannot be
+      batched together, because algod treats each submission as a transaction group.
+    - Non retryable rejections, e.g., invalid transactions, fail the submission.
+    - Connection errors are retried, but algod may have accepted the transactions before the connection failed, e.g.,
+      the request timed out. If the retry is then rejected because the transactions are already in the transaction
+      pool or ledger, then the submission is treated as sent.
+    - Submitted, confirmed, and failed metrics count transactions, i.e., not submissions.
+    """
+
+    def __init__(
+        self,
+        algod_client: AsyncAlgodClient,
+        *,
+        max_queue_size: int = 10_000,
+        workers: int = 8,
+        rate: float = 100.0,
+        max_rate: float = 1000.0,
+        min_rate: float = 1.0,
+        max_retries: int = 5,
+    ):
+        """
+        :param max_queue_size: max number of queued submissions
+        :param workers: number of concurrent algod submissions
+        :param rate: initial number of transactions per second
+        :param max_retries: max number of times an overloaded submission is retried
+        """
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be >= 1")
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        if max_retries < 0:
+            raise ValueError("max_retries must be >= 0")
+
+        self._algod_client = algod_client
+        self._queue: asyncio.Queue[Submission] = asyncio.Queue(max_queue_size)
+        self._workers = workers
+        self._rate_limiter = AdaptiveRateLimiter(
+            rate, min_rate=min_rate, max_rate=max_rate, increase=rate / 10
+        )
+        self._max_retries = max_retries
+        self._worker_tasks: list[asyncio.Task] = []
+        self._in_flight = 0
+        self._awaiting_confirmation = 0
+        self._submitted = 0
+        self._confirmed = 0
+        self._failed = 0
+        self._retries = 0
+        self._overloads = 0
+        self._queue_stats = _StageStats()
+        self._send_stats = _StageStats()
+        self._confirm_stats = _StageStats()
+
+    def start(self):
+        if self._worker_tasks:
+            return
+        self._worker_tasks = [
+            schedule(f"{self.__class__.__name__}.worker", self._run_worker())
+            for _ in range(self._workers)
+        ]
+
+    async def close(self):
+        """
+        Waits for queued submissions to be sent, and then stops the workers.
+
+        Confirmations continue to be tracked.
+        """
+        if self._worker_tasks:
+            await self._queue.join()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def __aenter__(self) -> "TransactionSubmitter":
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ):
+        await self.close()
+
+    def metrics(self) -> SubmitterMetrics:
+        return SubmitterMetrics(
+            queued=self._queue.qsize(),
+            in_flight=self._in_flight,
+            awaiting_confirmation=self._awaiting_confirmation,
+            submitted=self._submitted,
+            confirmed=self._confirmed,
+            failed=self._failed,
+            retries=self._retries,
+            overloads=self._overloads,
+            rate=self._rate_limiter.rate,
+            avg_queue_time=self._queue_stats.avg_time,
+            max_queue_time=self._queue_stats.max_time,
+            avg_send_time=self._send_stats.avg_time,
+            max_send_time=self._send_stats.max_time,
+            avg_confirm_time=self._confirm_stats.avg_time,
+            max_confirm_time=self._confirm_stats.max_time,
+        )
+
+    async def submit(
+        self, txns: GenericSignedTransaction | Sequence[GenericSignedTransaction]
+    ) -> Submission:
+        """
+        Queues the transaction, or atomic transaction group, for submission.
+        If the queue is full, then waits until there is room.
+
+        :param txns: transactions in a group must all have the same group ID
+        :raises ValueError: if the transactions are not a valid atomic group
+        :raises AssertionError: if the submitter is not started
+        """
+        txns = [txns] if isinstance(txns, GenericSignedTransaction) else list(txns)
+        if not txns:
+            raise ValueError("at least 1 transaction is required")
+        if len(txns) > 1:
+            if len(txns) > _max_group_size:
+                raise ValueError(f"max transaction group size is {_max_group_size}")
+            group_ids = {txn.transaction.group for txn in txns}
+            if len(group_ids) != 1 or None in group_ids:
+                raise ValueError("transactions must belong to the same group")
+        if not self._worker_tasks:
+            raise AssertionError("TransactionSubmitter is not started")
+
+        loop = asyncio.get_running_loop()
+        submission = Submission(
+            txns=txns,
+            txids=[TxnId(txn.get_txid()) for txn in txns],
+            sent=loop.create_future(),
+            confirmed=loop.create_future(),
+        )
+        await self._queue.put(submission)
+        return submission
+
+    async def _run_worker(self):
+        while True:
+            submission = await self._queue.get()
+            self._in_flight += 1
+            try:
+                self._queue_stats.record(time.monotonic() - submission.queued_at)
+                await self._send(submission)
+            except Exception as err:
+                self._failed += len(submission.txns)
+                _fail(submission.sent, err)
+                _fail(submission.confirmed, err)
+            finally:
+                self._in_flight -= 1
+                self._queue.task_done()
+
+    async def _send(self, submission: Submission):
+        start = time.monotonic()
+        # set when an attempt fails with a connection error, i.e., algod may have accepted the transactions
+        maybe_sent = False
+        while True:
+            await self._rate_limiter.acquire(len(submission.txns))
+            submission.attempts += 1
+            try:
+                await self._algod_client.send_transactions(submission.txns)
+                break
+            except Exception as err:
+                if maybe_sent and _is_duplicate(err):
+                    # a previous attempt was accepted, e.g., the request timed out after algod received it
+                    break
+                if not _is_overloaded(err) or submission.attempts > self._max_retries:
+                    raise
+                maybe_sent = maybe_sent or isinstance(err, OSError)
+                self._overloads += 1
+                self._retries += 1
+                self._rate_limiter.on_overload()
+                _logger.info(
+                    "algod submission was rejected because it is overloaded - retrying at %.1f txns/sec: %s",
+                    self._rate_limiter.rate,
+                    err,
+                )
+
+        self._rate_limiter.on_success()
+        submission.sent_at = time.monotonic()
+        self._send_stats.record(submission.sent_at - start)
+        self._submitted += len(submission.txns)
+        submission.sent.set_result(None)
+        self._awaiting_confirmation += 1
+        schedule(f"{self.__class__.__name__}.confirm", self._confirm(submission))
+
+    async def _confirm(self, submission: Submission):
+        try:
+            txn_info = await self._algod_client.wait_for_confirmation(
+                submission.txids[-1]
+            )
+            self._confirmed += len(submission.txns)
+            self._confirm_stats.record(
+                time.monotonic() - (submission.sent_at or submission.queued_at)
+            )
+            if not submission.confirmed.done():
+                submission.confirmed.set_result(txn_info)
+        except Exception as err:
+            self._failed += len(submission.txns)
+            _fail(submission.confirmed, err)
+        finally:
+            self._awaiting_confirmation -= 1
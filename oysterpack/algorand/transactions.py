@@ -7,11 +7,11 @@ from algosdk.transaction import (
     PaymentTxn,
     SignedTransaction,
     SuggestedParams,
-    wait_for_confirmation,
 )
 from algosdk.v2client.algod import AlgodClient
 
 from oysterpack.algorand import Address, TxnId
+from oysterpack.algorand.confirmations import get_confirmation_tracker
 from oysterpack.core.asyncio.task_manager import schedule_blocking_io_task
 
 
@@ -36,9 +36,12 @@ async def send_transaction(
     algod_client: AlgodClient,
     txn: SignedTransaction | MultisigTransaction | LogicSigTransaction,
 ) -> TxnId:
-    txid = await schedule_blocking_io_task(algod_client.send_transaction, txn)
-    await schedule_blocking_io_task(wait_for_confirmation, algod_client, txid)
-    return TxnId(txid)
+    """
+    Sends the transaction and waits for it to be confirmed.
+    """
+    txid = TxnId(await schedule_blocking_io_task(algod_client.send_transaction, txn))
+    await get_confirmation_tracker(algod_client).wait_for_confirmation(txid)
+    return txid
 
 
 def create_rekey_txn(
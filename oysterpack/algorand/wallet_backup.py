@@ -0,0 +1,426 @@
+"""
+Streaming encrypted KMD wallet backup and restore
+
+The backup archive contains the wallet master derivation key, keys, and multisigs.
+
+Archive file format:
+- plaintext header: magic bytes, followed by a length prefixed msgpack map, which contains the archive version and the
+  Argon2id parameters that are used to derive the encryption key from the backup password
+- encrypted records, which are streamed using XChaCha20-Poly1305 secretstream framing. Each frame contains a batch of
+  msgpack encoded records. The final frame is tagged, i.e., truncated archives are detected.
+
+Notes
+-----
+- Keys are exported and imported concurrently in batches, which keeps memory bounded, i.e., the wallet's private keys
+  are never all held in memory.
+- Keys that were generated by the wallet are stored as their key derivation index and public key. On restore, they
+  are regenerated by the wallet, which restores the wallet's key derivation index, i.e., accounts that are generated
+  after the restore do not collide with restored accounts.
+- Imported private keys are stored as 32 byte seeds.
+"""
+import struct
+from collections.abc import AsyncIterator, Callable
+from contextlib import aclosing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import msgpack  # type: ignore
+import nacl.pwhash.argon2id
+from algosdk.encoding import decode_address, encode_address
+from algosdk.transaction import Multisig
+from algosdk.v2client.algod import AlgodClient
+from nacl.bindings import (
+    crypto_secretstream_xchacha20poly1305_HEADERBYTES,
+    crypto_secretstream_xchacha20poly1305_init_pull,
+    crypto_secretstream_xchacha20poly1305_init_push,
+    crypto_secretstream_xchacha20poly1305_state,
+)
+from nacl.exceptions import CryptoError
+from nacl.utils import random
+
+from oysterpack.algorand import Address, Mnemonic
+from oysterpack.algorand.algod import AsyncAlgodClient
+from oysterpack.algorand.keys import AlgoPrivateKey
+from oysterpack.algorand.keystore import derive_secret_key
+from oysterpack.algorand.kmd import KmdService, WalletSession, derive_private_key
+from oysterpack.algorand.secretstream import (
+    STREAM_FRAME_LEN,
+    check_stream_frame_len,
+    pull_stream_frame,
+    push_stream_frame,
+    read_exactly,
+)
+from oysterpack.core.asyncio.concurrency import map_concurrently
+from oysterpack.core.asyncio.task_manager import schedule_blocking_io_task
+
+_magic = b"OPWALLET"
+_backup_version = 2
+_header_len = struct.Struct(">I")
+_max_header_len = 1024
+
+_KEY = 0
+_MULTISIG = 1
+_DERIVED_KEY = 2
+
+# derived key scanning stops after this many consecutive derivation indexes that do not match a wallet account
+_derivation_gap_limit = 100
+
+# (completed, total)
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass(slots=True)
+class WalletBackupSummary:
+    """
+    Number of records that were backed up or restored
+    """
+
+    keys: int
+    multisigs: int
+
+
+class _BackupWriter:
+    """
+    Writes encrypted record batches to the archive file.
+    """
+
+    def __init__(self, file: BinaryIO, secret_key: bytes):
+        self._file = file
+        self._state = crypto_secretstream_xchacha20poly1305_state()
+        self._header = crypto_secretstream_xchacha20poly1305_init_push(
+            self._state, secret_key
+        )
+
+    async def write_header(self, header: dict[str, Any]):
+        header_bytes = msgpack.packb(header)
+        await schedule_blocking_io_task(
+            self._file.write,
+            _magic + _header_len.pack(len(header_bytes)) + header_bytes + self._header,
+        )
+
+    async def write(self, records: list[Any], *, final: bool = False):
+        frame = push_stream_frame(self._state, msgpack.packb(records), final=final)
+        await schedule_blocking_io_task(self._file.write, frame)
+
+
+async def _read_header(file: BinaryIO) -> dict[str, Any]:
+    def read() -> dict[str, Any]:
+        if read_exactly(file, len(_magic)) != _magic:
+            raise ValueError("file is not a wallet backup")
+        (header_len,) = _header_len.unpack(read_exactly(file, _header_len.size))
+        if header_len > _max_header_len:
+            raise ValueError(f"invalid wallet backup header length: {header_len}")
+        header = msgpack.unpackb(read_exactly(file, header_len))
+        if header.get("version") != _backup_version:
+            raise ValueError(
+                f"unsupported wallet backup version: {header.get('version')}"
+            )
+        return header
+
+    return await schedule_blocking_io_task(read)
+
+
+async def _read_records(file: BinaryIO, secret_key: bytes) -> AsyncIterator[list[Any]]:
+    """
+    :return: record batches
+    :raises ValueError: if the password is invalid, or the archive is corrupted
+    :raises TruncatedStreamError: if the archive is truncated
+    """
+    state = crypto_secretstream_xchacha20poly1305_state()
+    crypto_secretstream_xchacha20poly1305_init_pull(
+        state,
+        await schedule_blocking_io_task(
+            read_exactly, file, crypto_secretstream_xchacha20poly1305_HEADERBYTES
+        ),
+        secret_key,
+    )
+
+    def read_frame() -> bytes:
+        frame_len = check_stream_frame_len(read_exactly(file, STREAM_FRAME_LEN.size))
+        return read_exactly(file, frame_len)
+
+    while True:
+        try:
+            records, final = pull_stream_frame(
+                state, await schedule_blocking_io_task(read_frame)
+            )
+        except CryptoError as err:
+            raise ValueError("invalid password or corrupted wallet backup") from err
+        yield msgpack.unpackb(records)
+        if final:
+            break
+
+    if await schedule_blocking_io_task(file.read, 1):
+        raise ValueError("wallet backup contains data after the final record")
+
+
+def _derived_key_indexes(
+    master_derivation_key: bytes, accounts: list[Address]
+) -> dict[Address, int]:
+    """
+    :return: wallet accounts that were generated by the wallet, mapped to their key derivation index
+    """
+    remaining = set(accounts)
+    indexes: dict[Address, int] = {}
+    index = 0
+    misses = 0
+    while remaining and misses < _derivation_gap_limit:
+        address = Address(
+            derive_private_key(master_derivation_key, index).signing_address
+        )
+        if address in remaining:
+            remaining.remove(address)
+            indexes[address] = index
+            misses = 0
+        else:
+            misses += 1
+        index += 1
+    return indexes
+
+
+async def backup_wallet(
+    wallet_session: WalletSession,
+    path: Path,
+    password: str,
+    *,
+    ops_limit: int = nacl.pwhash.argon2id.OPSLIMIT_INTERACTIVE,
+    mem_limit: int = nacl.pwhash.argon2id.MEMLIMIT_INTERACTIVE,
+    max_concurrency: int = 10,
+    batch_size: int = 1000,
+    progress: ProgressCallback | None = None,
+) -> WalletBackupSummary:
+    """
+    Backs up the wallet to an encrypted archive file.
+
+    :param password: used to encrypt the backup
+    :param ops_limit: Argon2id password hashing ops limit
+    :param mem_limit: Argon2id password hashing memory limit
+    :param max_concurrency: max number of concurrent KMD requests
+    :param batch_size: max number of records per encrypted frame
+    :param progress: called with (completed, total) records after each batch is written
+    :raises FileExistsError: if the file already exists
+    :raises ValueError: if the password is blank
+
+    If the backup fails, then the partially written file is deleted.
+    """
+    if not password.strip():
+        raise ValueError("password cannot be blank")
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    if path.exists():
+        raise FileExistsError(path)
+
+    salt = random(nacl.pwhash.argon2id.SALTBYTES)
+    secret_key = await schedule_blocking_io_task(
+        derive_secret_key, password, salt, ops_limit, mem_limit
+    )
+    master_derivation_key = await wallet_session.export_master_derivation_key()
+    accounts = await wallet_session.list_accounts()
+    derived_key_indexes = await schedule_blocking_io_task(
+        _derived_key_indexes, master_derivation_key.to_private_key_bytes(), accounts
+    )
+    imported_accounts = [
+        account for account in accounts if account not in derived_key_indexes
+    ]
+    # multisigs are small, i.e., they are not streamed
+    multisigs = list((await wallet_session.list_multisigs(max_concurrency)).values())
+    total = len(accounts) + len(multisigs)
+    completed = 0
+
+    file = path.open("xb")
+    try:
+        with file:
+            writer = _BackupWriter(file, secret_key)
+            await writer.write_header(
+                {
+                    "version": _backup_version,
+                    "salt": salt,
+                    "ops_limit": ops_limit,
+                    "mem_limit": mem_limit,
+                }
+            )
+            await writer.write(
+                [
+                    {
+                        "master_derivation_key": master_derivation_key.to_private_key_bytes(),
+                        "keys": len(accounts),
+                        "multisigs": len(multisigs),
+                    }
+                ]
+            )
+
+            batch: list[Any] = []
+
+            async def flush():
+                nonlocal batch, completed
+                await writer.write(batch)
+                completed += len(batch)
+                batch = []
+                if progress:
+                    progress(completed, total)
+
+            # derived keys are restored in index order
+            for address, index in sorted(
+                derived_key_indexes.items(), key=lambda item: item[1]
+            ):
+                batch.append((_DERIVED_KEY, index, decode_address(address)))
+                if len(batch) >= batch_size:
+                    await flush()
+
+            async with aclosing(
+                wallet_session.export_private_keys(imported_accounts, max_concurrency)
+            ) as private_keys:
+                async for _address, mnemonic in private_keys:
+                    batch.append((_KEY, mnemonic.to_private_key_bytes()))
+                    if len(batch) >= batch_size:
+                        await flush()
+
+            for multisig in multisigs:
+                batch.append(
+                    (
+                        _MULTISIG,
+                        multisig.version,
+                        multisig.threshold,
+                        [subsig.public_key for subsig in multisig.subsigs],
+                    )
+                )
+                if len(batch) >= batch_size:
+                    await flush()
+
+            # the final frame marks the end of the backup, which is used to detect truncation
+            await writer.write(batch, final=True)
+            completed += len(batch)
+            if progress:
+                progress(completed, total)
+    except BaseException:
+        # a partially written archive can not be restored
+        path.unlink(missing_ok=True)
+        raise
+
+    return WalletBackupSummary(keys=len(accounts), multisigs=len(multisigs))
+
+
+async def restore_wallet(
+    kmd_service: KmdService,
+    path: Path,
+    password: str,
+    name: str,
+    wallet_password: str,
+    algod_client: AlgodClient | AsyncAlgodClient,
+    *,
+    max_concurrency: int = 10,
+    progress: ProgressCallback | None = None,
+) -> tuple[WalletSession, WalletBackupSummary]:
+    """
+    Restores the wallet from the encrypted archive file into a new wallet, which is recovered using the backed up
+    master derivation key.
+
+    Keys that were generated by the backed up wallet are regenerated, i.e., not imported, which preserves the wallet's
+    key derivation index. Gaps left by deleted generated keys are reproduced by generating and then deleting the key.
+    Generated keys are regenerated concurrently per batch.
+
+    If the restore fails part way through, e.g., because the archive is truncated, then the partially restored wallet
+    is left in place.
+
+    :param password: backup password
+    :param name: new wallet name
+    :param wallet_password: new wallet password
+    :param max_concurrency: max number of concurrent KMD requests
+    :param progress: called with (completed, total) records after each batch is imported
+    :raises ValueError: if the password is invalid, the archive is corrupted, or a regenerated key does not match the
+                        backed up key
+    :raises TruncatedStreamError: if the archive is truncated
+    """
+    with path.open("rb") as file:
+        header = await _read_header(file)
+        secret_key = await schedule_blocking_io_task(
+            derive_secret_key,
+            password,
+            header["salt"],
+            header["ops_limit"],
+            header["mem_limit"],
+        )
+
+        async with aclosing(_read_records(file, secret_key)) as batches:
+            [wallet_record] = await anext(batches)
+            await kmd_service.recover_wallet(
+                name,
+                wallet_password,
+                Mnemonic.from_private_key(wallet_record["master_derivation_key"]),
+            )
+            wallet_session = await kmd_service.connect(
+                name, wallet_password, algod_client
+            )
+            total = wallet_record["keys"] + wallet_record["multisigs"]
+            summary = WalletBackupSummary(keys=0, multisigs=0)
+            next_index = 0
+
+            async def regenerate(records: list[Any]):
+                """
+                Generates the keys up to the highest derivation index in the batch concurrently. KMD assigns
+                derivation indexes in request order, i.e., the generated keys are the keys for the derivation index
+                range, independent of the order that the requests complete in. Generated keys that are not in the
+                backup, i.e., gaps left by deleted keys, are then deleted.
+                """
+                nonlocal next_index
+                backed_up_addresses = {
+                    encode_address(public_key) for _, _, public_key in records
+                }
+                last_index = max(index for _, index, _ in records)
+                async with aclosing(
+                    wallet_session.generate_accounts(
+                        last_index - next_index + 1, max_concurrency
+                    )
+                ) as addresses:
+                    generated_addresses = {address async for address in addresses}
+                if not backed_up_addresses <= generated_addresses:
+                    raise ValueError(
+                        "regenerated keys do not match the backed up keys for derivation indexes "
+                        f"{next_index}-{last_index}"
+                    )
+                async with aclosing(
+                    map_concurrently(
+                        wallet_session.delete_account,
+                        generated_addresses - backed_up_addresses,
+                        max_concurrency,
+                    )
+                ) as results:
+                    async for _ in results:
+                        pass
+                next_index = last_index + 1
+                summary.keys += len(records)
+
+            async def restore(record: list[Any]):
+                if record[0] == _KEY:
+                    await wallet_session.import_private_key(AlgoPrivateKey(record[1]))
+                    summary.keys += 1
+                else:
+                    _, version, threshold, public_keys = record
+                    await wallet_session.import_multisig(
+                        Multisig(
+                            version,
+                            threshold,
+                            [encode_address(public_key) for public_key in public_keys],
+                        )
+                    )
+                    summary.multisigs += 1
+
+            async for batch in batches:
+                if derived_keys := [
+                    record for record in batch if record[0] == _DERIVED_KEY
+                ]:
+                    await regenerate(derived_keys)
+                async with aclosing(
+                    map_concurrently(
+                        restore,
+                        [record for record in batch if record[0] != _DERIVED_KEY],
+                        max_concurrency,
+                    )
+                ) as results:
+                    async for _ in results:
+                        pass
+                if progress:
+                    progress(summary.keys + summary.multisigs, total)
+
+    return wallet_session, summary
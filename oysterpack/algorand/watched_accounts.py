@@ -0,0 +1,243 @@
+"""
+In-memory view of the ALGO balances and auth addresses for a watched set of accounts
+
+Account state is loaded once, and then kept up to date by applying the changes in each new block. Thus, chain I/O
+scales with the block size, instead of with the number of watched accounts.
+"""
+from array import array
+from collections.abc import AsyncIterator, Iterable
+from contextlib import aclosing
+from typing import Any
+
+from algosdk.encoding import decode_address, encode_address
+
+from oysterpack.algorand import Address, MicroAlgos
+from oysterpack.algorand.accounts import get_account_summaries
+from oysterpack.algorand.algod import AsyncAlgodClient
+from oysterpack.algorand.blocks import Block, BlockCheckpoint
+
+_public_key_len = 32
+_zero_public_key = bytes(_public_key_len)
+
+
+class WatchedAccounts:
+    """
+    Watched account state is stored in parallel arrays, which are indexed by the account's slot:
+    - public keys and auth address public keys are packed into byte arrays, i.e., 32 bytes per account. If the account
+      is not rekeyed, then the auth address public key is zeroed.
+    - balances and the round that each account was loaded at are stored in uint64 arrays
+
+    Balance and auth address lookups are O(1) in-memory lookups.
+
+    Block changes that are applied:
+    - transaction fees
+    - payments, including inner payments issued by apps, and close-outs
+    - rekeys
+    - rewards
+
+    Notes
+    -----
+    - Changes in blocks at or before the round that an account was loaded at are skipped, because they are already
+      reflected in the loaded state.
+    - Rekeys are also recorded in the algod client's auth address cache.
+    """
+
+    def __init__(self, algod_client: AsyncAlgodClient):
+        self._algod_client = algod_client
+        # public key -> slot
+        self._slots: dict[bytes, int] = {}
+        self._public_keys = bytearray()
+        self._auth_public_keys = bytearray()
+        self._balances = array("Q")
+        self._loaded_rounds = array("Q")
+        # last applied block round
+        self._round = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, address: Address) -> bool:
+        return decode_address(address) in self._slots
+
+    @property
+    def round(self) -> int:
+        """
+        :return: last block round that was applied - 0 if no blocks have been applied
+        """
+        return self._round
+
+    @property
+    def addresses(self) -> list[Address]:
+        return [
+            Address(
+                encode_address(
+                    bytes(self._public_keys[offset : offset + _public_key_len])
+                )
+            )
+            for offset in range(0, len(self._public_keys), _public_key_len)
+        ]
+
+    async def watch(self, addresses: Iterable[Address], max_concurrency: int = 10):
+        """
+        Loads the state for accounts that are not already watched.
+
+        :param max_concurrency: max number of concurrent algod requests
+        """
+        new_addresses = [address for address in set(addresses) if address not in self]
+        accounts = await get_account_summaries(
+            new_addresses, self._algod_client.algod_client, max_concurrency
+        )
+        for account in accounts.values():
+            self._slots[decode_address(account.address)] = len(self._balances)
+            self._public_keys += decode_address(account.address)
+            self._auth_public_keys += (
+                _zero_public_key
+                if account.auth_address == account.address
+                else decode_address(account.auth_address)
+            )
+            self._balances.append(account.amount)
+            self._loaded_rounds.append(account.round)
+            self._algod_client.auth_address_cache.put(
+                account.address, account.auth_address, account.round
+            )
+
+    def unwatch(self, address: Address):
+        """
+        Stops watching the account. The last slot is moved into the removed account's slot.
+        """
+        public_key = decode_address(address)
+        if (slot := self._slots.pop(public_key, None)) is None:
+            return
+        last_slot = len(self._balances) - 1
+        if slot != last_slot:
+            last_public_key = bytes(self._public_key(self._public_keys, last_slot))
+            self._slots[last_public_key] = slot
+            for keys in (self._public_keys, self._auth_public_keys):
+                keys[
+                    slot * _public_key_len : (slot + 1) * _public_key_len
+                ] = self._public_key(keys, last_slot)
+            self._balances[slot] = self._balances[last_slot]
+            self._loaded_rounds[slot] = self._loaded_rounds[last_slot]
+        for keys in (self._public_keys, self._auth_public_keys):
+            del keys[last_slot * _public_key_len :]
+        self._balances.pop()
+        self._loaded_rounds.pop()
+
+    @staticmethod
+    def _public_key(keys: bytearray, slot: int) -> bytearray:
+        return keys[slot * _public_key_len : (slot + 1) * _public_key_len]
+
+    def _slot(self, address: Address) -> int:
+        try:
+            return self._slots[decode_address(address)]
+        except KeyError as err:
+            raise ValueError(f"account is not watched: {address}") from err
+
+    def get_algo_balance(self, address: Address) -> MicroAlgos:
+        """
+        :raises ValueError: if the account is not watched
+        """
+        return MicroAlgos(self._balances[self._slot(address)])
+
+    def get_auth_address(self, address: Address) -> Address:
+        """
+        :raises ValueError: if the account is not watched
+        """
+        auth_public_key = self._public_key(self._auth_public_keys, self._slot(address))
+        if auth_public_key == _zero_public_key:
+            return address
+        return Address(encode_address(bytes(auth_public_key)))
+
+    def _watched_slot(self, public_key: bytes | None, round_num: int) -> int | None:
+        """
+        :return: None if the account is not watched, or the account was loaded at or after the round
+        """
+        if public_key is None:
+            return None
+        slot = self._slots.get(public_key)
+        if slot is None or self._loaded_rounds[slot] >= round_num:
+            return None
+        return slot
+
+    def _credit(self, public_key: bytes | None, amount: int, round_num: int):
+        if amount and (slot := self._watched_slot(public_key, round_num)) is not None:
+            self._balances[slot] += amount
+
+    def _debit(self, public_key: bytes | None, amount: int, round_num: int):
+        if amount and (slot := self._watched_slot(public_key, round_num)) is not None:
+            self._balances[slot] = max(0, self._balances[slot] - amount)
+
+    def _apply_txn(self, stxn: dict[str, Any], round_num: int):
+        txn = stxn.get("txn", {})
+        sender = txn.get("snd")
+        self._debit(sender, txn.get("fee", 0), round_num)
+        self._credit(sender, stxn.get("rs", 0), round_num)
+
+        if txn.get("type") == "pay":
+            amount = txn.get("amt", 0)
+            self._debit(sender, amount, round_num)
+            self._credit(txn.get("rcv"), amount, round_num)
+            self._credit(txn.get("rcv"), stxn.get("rr", 0), round_num)
+            if (close_to := txn.get("close")) is not None:
+                self._credit(close_to, stxn.get("ca", 0) + stxn.get("rc", 0), round_num)
+                # the closed account is removed from the ledger, i.e., its balance is zeroed and its rekey is cleared
+                if (slot := self._watched_slot(sender, round_num)) is not None:
+                    self._balances[slot] = 0
+                    self._set_auth_public_key(slot, sender, sender, round_num)
+
+        if (rekey_to := txn.get("rekey")) is not None:
+            if (slot := self._watched_slot(sender, round_num)) is not None:
+                self._set_auth_public_key(slot, sender, rekey_to, round_num)
+
+        for inner_stxn in stxn.get("dt", {}).get("itx", None) or []:
+            self._apply_txn(inner_stxn, round_num)
+
+    def _set_auth_public_key(
+        self, slot: int, public_key: bytes, auth_public_key: bytes, round_num: int
+    ):
+        self._auth_public_keys[
+            slot * _public_key_len : (slot + 1) * _public_key_len
+        ] = (_zero_public_key if auth_public_key == public_key else auth_public_key)
+        self._algod_client.auth_address_cache.put(
+            Address(encode_address(public_key)),
+            Address(encode_address(auth_public_key)),
+            round_num,
+        )
+
+    def apply_block(self, block: Block):
+        """
+        Applies the block's changes to the watched accounts.
+        Blocks must be applied in round order.
+        """
+        for stxn in block.txns:
+            self._apply_txn(stxn, block.round)
+        self._round = max(self._round, block.round)
+
+    async def follow(
+        self,
+        *,
+        prefetch: int = 4,
+        checkpoint: BlockCheckpoint | None = None,
+    ) -> AsyncIterator[Block]:
+        """
+        Follows the chain, and applies each block.
+
+        If blocks have been applied, then the chain is followed from the next round. Otherwise, it is followed from
+        the round after the earliest round that the accounts were loaded at. If no accounts are watched, then the
+        chain is followed from the current round.
+
+        :return: blocks after they have been applied
+        """
+        start_round: int | None = None
+        if self._round:
+            start_round = self._round + 1
+        elif self._loaded_rounds:
+            start_round = min(self._loaded_rounds) + 1
+        async with aclosing(
+            self._algod_client.follow_blocks(
+                start_round, prefetch=prefetch, checkpoint=checkpoint
+            )
+        ) as blocks:
+            async for block in blocks:
+                self.apply_block(block)
+                yield block
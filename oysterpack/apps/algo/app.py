@@ -9,20 +9,35 @@ import tomllib
 from algosdk.v2client.algod import AlgodClient
 
 from oysterpack.algorand.algod import AsyncAlgodClient
+from oysterpack.algorand.algod_metrics import AlgodRequestMetrics
+from oysterpack.algorand.algod_pool import AlgodClientPool
 from oysterpack.algorand.kmd import KmdService
 
 
 @dataclass(slots=True)
 class AlgodConfig:
-    url: str
+    # if multiple URLs are specified, then requests are spread over the algod nodes using an AlgodClientPool
+    url: str | list[str]
     token: str
+    # if True, then algod requests are recorded, i.e., see AsyncAlgodClient.metrics
+    metrics: bool = False
 
     def create_client(self) -> AsyncAlgodClient:
-        return AsyncAlgodClient(
-            AlgodClient(
-                algod_token=self.token,
-                algod_address=self.url,
+        metrics = AlgodRequestMetrics() if self.metrics else None
+        if isinstance(self.url, str):
+            return AsyncAlgodClient(
+                AlgodClient(
+                    algod_token=self.token,
+                    algod_address=self.url,
+                ),
+                metrics=metrics,
             )
+        if len(self.url) == 1:
+            return AlgodConfig(
+                url=self.url[0], token=self.token, metrics=self.metrics
+            ).create_client()
+        return AsyncAlgodClient(
+            AlgodClientPool.from_urls(self.url, self.token), metrics=metrics
         )
 
 
@@ -48,6 +63,7 @@ class AppConfig:
         algod_config = AlgodConfig(
             token=config["algod"]["token"],
             url=config["algod"]["url"],
+            metrics=config["algod"].get("metrics", False),
         )
 
         kmd_config = KmdConfig(
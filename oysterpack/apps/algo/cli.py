@@ -8,7 +8,8 @@ from typing import cast
 
 import click
 
-from oysterpack.algorand import Mnemonic
+from oysterpack.algorand import Address, Mnemonic
+from oysterpack.algorand.kmd import WalletSession
 from oysterpack.apps.algo.app import App, AppConfig
 
 
@@ -208,20 +209,37 @@ def list_accounts(ctx: click.Context):
 
 @accounts.command(name="generate")
 @click.option("--count", prompt="Count", default=1)
+@click.option(
+    "--concurrency",
+    default=10,
+    show_default=True,
+    help="Max number of concurrent KMD requests",
+)
 @click.pass_context
-def generate_accounts(ctx: click.Context, count: int):
+def generate_accounts(ctx: click.Context, count: int, concurrency: int):
     """
     Generate wallet accounts
     """
     app = cast(App, ctx.obj)
 
+    async def generate(wallet_session: WalletSession) -> list[Address]:
+        accounts: list[Address] = []
+        with click.progressbar(
+            length=count,
+            label="Generating accounts",
+            file=click.get_text_stream("stderr"),
+        ) as progress:
+            async for account in wallet_session.generate_accounts(count, concurrency):
+                accounts.append(account)
+                progress.update(1)
+        return accounts
+
     with asyncio.Runner() as runner:
         name = runner.run(get_name(app, mode=GetNameMode.MustExist))
         password = get_password(confirm_password=False)
         try:
             wallet_session = runner.run(app.kmd.connect(name, password, app.algod))
-            for _ in range(count):
-                account = runner.run(wallet_session.generate_account())
+            for account in runner.run(generate(wallet_session)):
                 click.echo(account)
         except Exception as err:
             ctx.fail(str(err))
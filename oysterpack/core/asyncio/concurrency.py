@@ -0,0 +1,139 @@
+"""
+Provides support for running bounded concurrent tasks
+"""
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from typing import TypeVar
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+async def map_concurrently(
+    func: Callable[[_T], Awaitable[_R]],
+    items: Iterable[_T],
+    max_concurrency: int,
+) -> AsyncIterator[tuple[_T, _R]]:
+    """
+    Applies the async function to each item, running at most `max_concurrency` calls concurrently.
+
+    Notes
+    -----
+    - Results are yielded as they complete, i.e., not in item order.
+    - Items are consumed lazily, i.e., at most `max_concurrency` items are in flight at any time.
+    - If any call fails, then the remaining in flight calls are cancelled and the exception is raised.
+    - In flight calls are cancelled when the generator is closed.
+
+    :return: (item, result) pairs
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be >= 1")
+
+    async def call(item: _T) -> tuple[_T, _R]:
+        return item, await func(item)
+
+    items_iter = iter(items)
+    pending: set[asyncio.Task[tuple[_T, _R]]] = set()
+    try:
+        while True:
+            for item in items_iter:
+                pending.add(asyncio.create_task(call(item)))
+                if len(pending) >= max_concurrency:
+                    break
+            if not pending:
+                return
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket rate limiter, whose rate is adapted using AIMD (additive increase, multiplicative decrease).
+
+    - `on_success()` increases the rate by `increase` per second, up to `max_rate`.
+    - `on_overload()` multiplies the rate by `decrease_factor`, down to `min_rate`. Use it when the downstream service
+      rejects requests because it is overloaded.
+
+    Notes
+    -----
+    - Waiters acquire tokens in FIFO order.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        *,
+        burst: float | None = None,
+        min_rate: float = 1.0,
+        max_rate: float | None = None,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+    ):
+        """
+        :param rate: initial number of tokens per second
+        :param burst: max number of tokens that can be accumulated - defaults to 1 second worth of tokens
+        :param max_rate: defaults to the initial rate
+        """
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        if not 0 < min_rate <= rate:
+            raise ValueError("min_rate must be > 0 and <= rate")
+        if max_rate is not None and max_rate < rate:
+            raise ValueError("max_rate must be >= rate")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be > 0 and < 1")
+
+        self._rate = rate
+        self._burst = burst
+        self._min_rate = min_rate
+        self._max_rate = max_rate if max_rate is not None else rate
+        self._increase = increase
+        self._decrease_factor = decrease_factor
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @property
+    def burst(self) -> float:
+        return self._burst if self._burst is not None else max(self._rate, 1.0)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self._rate
+        )
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1.0):
+        """
+        Waits until the tokens are available.
+
+        :param tokens: requests that need more tokens than the burst size wait until the bucket is full
+        """
+        async with self._lock:
+            self._refill()
+            needed = min(tokens, self.burst)
+            while self._tokens < needed:
+                await asyncio.sleep((needed - self._tokens) / self._rate)
+                self._refill()
+            self._tokens -= tokens
+
+    def on_success(self):
+        self._refill()
+        self._rate = min(self._max_rate, self._rate + self._increase / self._rate)
+
+    def on_overload(self):
+        self._refill()
+        self._rate = max(self._min_rate, self._rate * self._decrease_factor)
+        self._tokens = min(self._tokens, self.burst)
@@ -7,7 +7,8 @@ Used to schedule tasks as reliable “fire-and-forget” background tasks
 """
 import asyncio
 import logging
-from asyncio import Task
+import threading
+from asyncio import AbstractEventLoop, Task
 from collections.abc import Callable, Coroutine
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Any, TypeVar
@@ -99,10 +100,51 @@ async def schedule_cpu_bound_task(func: Callable[..., _T], *args: Any) -> _T:
     """
     Runs the function using a ProcessPoolExecutor
 
-    NOTES
+    Notes
     -----
     All arg and return types must be able to be marshalled, i.e. pickled, across processes
     """
     return await asyncio.get_running_loop().run_in_executor(
         __process_pool_executor, func, *args
     )
+
+
+__background_loop: AbstractEventLoop | None = None
+__background_loop_thread: threading.Thread | None = None
+__background_loop_lock = threading.Lock()
+
+
+def __get_background_loop() -> AbstractEventLoop:
+    global __background_loop, __background_loop_thread
+    with __background_loop_lock:
+        if __background_loop is None:
+            __background_loop = asyncio.new_event_loop()
+            __background_loop_thread = threading.Thread(
+                target=__background_loop.run_forever,
+                name="task_manager/background_loop",
+                daemon=True,
+            )
+            __background_loop_thread.start()
+        return __background_loop
+
+
+def run_coroutine(coroutine: Coroutine[Any, Any, _T]) -> _T:
+    """
+    Runs the coroutine on a shared background event loop, and blocks until it completes.
+
+    Use this to call async code from sync code, e.g., sync callback APIs. It can be called from any thread,
+    including a thread that is running an event loop. A single event loop is reused across calls,
+    i.e., an event loop is not created per call.
+
+    Notes
+    -----
+    - If called from a thread that is running an event loop, then that event loop is blocked until the coroutine
+      completes. The coroutine must not depend on the caller's event loop.
+
+    :raises RuntimeError: if called from the background event loop thread, which would deadlock
+    """
+    loop = __get_background_loop()
+    if threading.current_thread() is __background_loop_thread:
+        coroutine.close()
+        raise RuntimeError("run_coroutine() cannot be called from the background loop")
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
@@ -0,0 +1,166 @@
+import json
+import logging
+import threading
+import time
+import unittest
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+import msgpack  # type: ignore
+from algosdk.v2client.algod import AlgodClient
+
+from oysterpack.algorand.accounts import get_account_summaries, get_account_summary
+from oysterpack.algorand.keys import AlgoPrivateKey
+from oysterpack.core.asyncio.task_manager import schedule_blocking_io_task
+from oysterpack.core.logging import configure_logging
+
+logger = logging.getLogger(__name__)
+configure_logging(logging.INFO)
+
+# simulated algod round trip latency
+LATENCY = 0.005
+
+
+def account_info(
+    address: str, auth_address: str, *, exclude_all: bool
+) -> dict[str, Any]:
+    """
+    Simulates an asset and app heavy account
+    """
+    account: dict[str, Any] = {
+        "address": address,
+        "amount": 1_000_000,
+        "amount-without-pending-rewards": 1_000_000,
+        "auth-addr": auth_address,
+        "min-balance": 100_000,
+        "pending-rewards": 0,
+        "rewards": 0,
+        "round": 100,
+        "status": "Offline",
+        "total-apps-opted-in": 50,
+        "total-assets-opted-in": 1000,
+    }
+    if exclude_all:
+        return account
+    return {
+        **account,
+        "assets": [
+            {"amount": i, "asset-id": 1_000_000 + i, "is-frozen": False}
+            for i in range(1000)
+        ],
+        "apps-local-state": [
+            {
+                "id": 2_000_000 + i,
+                "schema": {"num-byte-slice": 8, "num-uint": 8},
+                "key-value": [
+                    {
+                        "key": f"a2V5LXt7aX19LX{j}",
+                        "value": {"bytes": "dmFsdWU=" * 8, "type": 1, "uint": 0},
+                    }
+                    for j in range(16)
+                ],
+            }
+            for i in range(50)
+        ],
+    }
+
+
+class StubAlgodRequestHandler(BaseHTTPRequestHandler):
+    server: "StubAlgodServer"
+
+    def log_message(self, fmt: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        address = url.path.split("/")[-1]
+        account = account_info(
+            address,
+            self.server.auth_address,
+            exclude_all=query.get("exclude") == ["all"],
+        )
+        if query.get("format") == ["msgpack"]:
+            body = msgpack.packb(account)
+            content_type = "application/msgpack"
+        else:
+            body = json.dumps(account).encode()
+            content_type = "application/json"
+
+        self.server.bytes_sent += len(body)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubAlgodServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubAlgodRequestHandler)
+        self.auth_address = AlgoPrivateKey().signing_address
+        self.bytes_sent = 0
+
+
+class AccountLookupBenchmark(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = StubAlgodServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        self.algod_client = AlgodClient("", f"http://{host}:{port}")
+        self.addresses = [AlgoPrivateKey().signing_address for _ in range(100)]
+
+    async def asyncTearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def run_lookups(self, lookup: Callable[[str], object]) -> tuple[float, int]:
+        self.server.bytes_sent = 0
+        start = time.perf_counter()
+        for address in self.addresses:
+            await schedule_blocking_io_task(lookup, address)
+        return time.perf_counter() - start, self.server.bytes_sent
+
+    async def test_account_lookups(self):
+        full_secs, full_bytes = await self.run_lookups(self.algod_client.account_info)
+        exclude_all_secs, exclude_all_bytes = await self.run_lookups(
+            lambda address: self.algod_client.account_info(address, "all")
+        )
+
+        self.server.bytes_sent = 0
+        start = time.perf_counter()
+        for address in self.addresses:
+            summary = await get_account_summary(address, self.algod_client)
+            self.assertEqual(self.server.auth_address, summary.auth_address)
+        lean_secs = time.perf_counter() - start
+        lean_bytes = self.server.bytes_sent
+
+        start = time.perf_counter()
+        summaries = await get_account_summaries(
+            self.addresses, self.algod_client, max_concurrency=10
+        )
+        bulk_secs = time.perf_counter() - start
+        self.assertEqual(len(self.addresses), len(summaries))
+
+        logger.info(
+            "%d account lookups with %.3fs latency: full json=%.3fs (%d bytes) exclude=all json=%.3fs (%d bytes) "
+            "lean msgpack=%.3fs (%d bytes) lean msgpack bulk=%.3fs",
+            len(self.addresses),
+            LATENCY,
+            full_secs,
+            full_bytes,
+            exclude_all_secs,
+            exclude_all_bytes,
+            lean_secs,
+            lean_bytes,
+            bulk_secs,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
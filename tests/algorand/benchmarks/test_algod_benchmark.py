@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import time
+import unittest
+
+from algosdk.transaction import PaymentTxn
+from algosdk.v2client.algod import AlgodClient
+
+from oysterpack.algorand.algod import AsyncAlgodClient
+from oysterpack.algorand.emulator.algod import AlgodEmulator
+from oysterpack.algorand.keys import AlgoPrivateKey
+from oysterpack.algorand.submitter import TransactionSubmitter
+from oysterpack.algorand.transactions import send_transaction
+from oysterpack.core.logging import configure_logging
+
+logger = logging.getLogger(__name__)
+configure_logging(logging.INFO)
+
+# simulated algod round trip latency
+LATENCY = 0.005
+
+
+class TransactionSubmissionBenchmark(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.emulator = AlgodEmulator(latency=LATENCY)
+        self.emulator.start()
+        self.algod_client = AsyncAlgodClient(
+            AlgodClient(self.emulator.token, self.emulator.url)
+        )
+        self.sender = AlgoPrivateKey()
+        self.receiver = AlgoPrivateKey()
+        self.emulator.fund(self.sender.signing_address, 1_000_000_000)
+        self.emulator.fund(self.receiver.signing_address, 1_000_000)
+
+    async def asyncTearDown(self) -> None:
+        self.emulator.close()
+
+    async def payments(self, count: int, note: bytes) -> list:
+        suggested_params = await self.algod_client.suggested_params_with_flat_flee()
+        return [
+            self.sender.sign_transaction(
+                PaymentTxn(
+                    sender=self.sender.signing_address,
+                    receiver=self.receiver.signing_address,
+                    amt=i + 1,
+                    note=note,
+                    sp=suggested_params,
+                )
+            )
+            for i in range(count)
+        ]
+
+    async def test_sequential_vs_submitter(self):
+        count = 50
+
+        txns = await self.payments(count, b"sequential")
+        start = time.perf_counter()
+        for txn in txns:
+            await send_transaction(self.algod_client.algod_client, txn)
+        sequential_secs = time.perf_counter() - start
+
+        txns = await self.payments(count, b"submitter")
+        start = time.perf_counter()
+        async with TransactionSubmitter(self.algod_client, rate=1000) as submitter:
+            submissions = [await submitter.submit(txn) for txn in txns]
+            await asyncio.gather(*(submission.confirmed for submission in submissions))
+        submitter_secs = time.perf_counter() - start
+
+        logger.info(
+            "send and confirm %d payments with %.3fs latency: sequential=%.3fs submitter=%.3fs",
+            count,
+            LATENCY,
+            sequential_secs,
+            submitter_secs,
+        )
+        logger.info("algod requests: %s", dict(self.emulator.request_counts))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import logging
+import os
+import time
+import unittest
+
+from oysterpack.algorand.keys import (
+    AlgoPrivateKey,
+    SignedMessageItem,
+    generate_private_keys,
+    verify_signed_messages,
+)
+from oysterpack.core.logging import configure_logging
+
+logger = logging.getLogger(__name__)
+configure_logging(logging.INFO)
+
+
+class VerifySignedMessagesBenchmark(unittest.IsolatedAsyncioTestCase):
+    async def test_verifications_per_second(self):
+        senders = [AlgoPrivateKey() for _ in range(50)]
+        items = [
+            SignedMessageItem(
+                signing_address=sender.signing_address,
+                message=f"msg-{i}".encode(),
+                signature=sender.sign(f"msg-{i}".encode()).signature,
+            )
+            for i in range(100)
+            for sender in senders
+        ]
+
+        start = time.perf_counter()
+        for item in items:
+            self.assertTrue(
+                item.signing_address.verify_message(item.message, item.signature)
+            )
+        serial_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = await verify_signed_messages(items)
+        batch_secs = time.perf_counter() - start
+        self.assertTrue(all(results))
+
+        logger.info(
+            "verifications/sec: serial=%d batch=%d",
+            len(items) / serial_secs,
+            len(items) / batch_secs,
+        )
+
+
+class GeneratePrivateKeysBenchmark(unittest.IsolatedAsyncioTestCase):
+    async def test_keys_per_second_per_core(self):
+        count = 5000
+
+        start = time.perf_counter()
+        for _ in range(count):
+            AlgoPrivateKey()
+        serial_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        keys = [key async for key in generate_private_keys(count, batch_size=500)]
+        bulk_secs = time.perf_counter() - start
+        self.assertEqual(count, len(keys))
+
+        cores = os.cpu_count() or 1
+        logger.info(
+            "keys/sec: serial=%d bulk=%d bulk/core=%d (cores=%d)",
+            count / serial_secs,
+            count / bulk_secs,
+            count / bulk_secs / cores,
+            cores,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
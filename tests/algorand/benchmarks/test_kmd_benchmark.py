@@ -0,0 +1,156 @@
+import base64
+import logging
+import time
+import unittest
+
+from algosdk.transaction import Multisig
+from algosdk.v2client.algod import AlgodClient
+
+from oysterpack.algorand import Address
+from oysterpack.algorand.emulator.kmd import KmdEmulator
+from oysterpack.algorand.keys import AlgoPrivateKey
+from oysterpack.algorand.kmd import KmdService, WalletSession, WalletSessionPool
+from oysterpack.core.logging import configure_logging
+
+logger = logging.getLogger(__name__)
+configure_logging(logging.INFO)
+
+# simulated KMD round trip latency
+LATENCY = 0.01
+
+
+class StubKMDWallet:
+    """
+    Simulates a KMD wallet, where each operation costs a round trip
+    """
+
+    def __init__(self, latency: float):
+        self.name = "stub"
+        self.handle = None
+        self.latency = latency
+        self.keys = {
+            key.signing_address: key for key in (AlgoPrivateKey() for _ in range(30))
+        }
+        addresses = list(self.keys)
+        self.multisigs = {
+            multisig.address(): multisig
+            for multisig in (
+                Multisig(1, 2, addresses[i:] + addresses[:i])
+                for i in range(len(addresses))
+            )
+        }
+
+    def list_keys(self) -> list[str]:
+        time.sleep(self.latency)
+        return list(self.keys)
+
+    def export_key(self, address: str) -> str:
+        time.sleep(self.latency)
+        key = self.keys[address]
+        return base64.b64encode(bytes(key) + bytes(key.signing_key.verify_key)).decode()
+
+    def list_multisig(self) -> list[str]:
+        time.sleep(self.latency)
+        return list(self.multisigs)
+
+    def export_multisig(self, address: str) -> Multisig:
+        time.sleep(self.latency)
+        return self.multisigs[address]
+
+
+class WalletSessionBenchmark(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.wallet = StubKMDWallet(LATENCY)
+        self.wallet_session = WalletSession(
+            self.wallet,  # type: ignore
+            AlgodClient("", "http://localhost"),
+        )
+
+    async def test_export_private_keys(self):
+        addresses = [Address(address) for address in self.wallet.keys]
+
+        start = time.perf_counter()
+        for address in addresses:
+            await self.wallet_session.export_private_key(address)
+        serial_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        exported = [
+            address
+            async for address, _mnemonic in self.wallet_session.export_private_keys(
+                addresses, max_concurrency=10
+            )
+        ]
+        concurrent_secs = time.perf_counter() - start
+        self.assertEqual(sorted(addresses), sorted(exported))
+
+        logger.info(
+            "export %d private keys with %.3fs latency: serial=%.3fs concurrent=%.3fs",
+            len(addresses),
+            LATENCY,
+            serial_secs,
+            concurrent_secs,
+        )
+
+    async def test_list_multisigs(self):
+        start = time.perf_counter()
+        multisigs = await self.wallet_session.list_multisigs(max_concurrency=1)
+        serial_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.assertEqual(
+            multisigs, await self.wallet_session.list_multisigs(max_concurrency=10)
+        )
+        concurrent_secs = time.perf_counter() - start
+
+        logger.info(
+            "list %d multisigs with %.3fs latency: serial=%.3fs concurrent=%.3fs",
+            len(multisigs),
+            LATENCY,
+            serial_secs,
+            concurrent_secs,
+        )
+
+
+class WalletSessionPoolBenchmark(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.emulator = KmdEmulator(latency=LATENCY)
+        self.emulator.start()
+        self.kmd_service = KmdService(url=self.emulator.url, token=self.emulator.token)
+        await self.kmd_service.create_wallet("wallet", "password")
+        self.algod_client = AlgodClient("", "http://localhost")
+
+    async def asyncTearDown(self) -> None:
+        self.emulator.close()
+
+    async def test_connect_vs_pool(self):
+        requests = 20
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            wallet_session = await self.kmd_service.connect(
+                "wallet", "password", self.algod_client
+            )
+            await wallet_session.list_accounts()
+            await wallet_session.release()
+        connect_secs = time.perf_counter() - start
+
+        async with WalletSessionPool(self.kmd_service, self.algod_client) as pool:
+            await pool.register("wallet", "password")
+            start = time.perf_counter()
+            for _ in range(requests):
+                async with pool.session("wallet") as wallet_session:
+                    await wallet_session.list_accounts()
+            pool_secs = time.perf_counter() - start
+
+        logger.info(
+            "%d requests with %.3fs latency: connect per request=%.3fs pool=%.3fs",
+            requests,
+            LATENCY,
+            connect_secs,
+            pool_secs,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
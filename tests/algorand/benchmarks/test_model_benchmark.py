@@ -0,0 +1,52 @@
+import base64
+import logging
+import time
+import unittest
+
+from algosdk import constants, mnemonic
+from algosdk.account import generate_account
+
+from oysterpack.algorand import Mnemonic
+from oysterpack.core.logging import configure_logging
+
+logger = logging.getLogger(__name__)
+configure_logging(logging.INFO)
+
+
+class MnemonicBenchmark(unittest.TestCase):
+    def test_bulk_conversions(self):
+        private_keys = [
+            base64.b64decode(generate_account()[0])[: constants.key_len_bytes]
+            for _ in range(5000)
+        ]
+
+        # per key path via algosdk word list helpers and base64 strings
+        start = time.perf_counter()
+        word_lists = [
+            mnemonic.from_private_key(base64.b64encode(private_key).decode())
+            for private_key in private_keys
+        ]
+        decoded_keys = [
+            base64.b64decode(mnemonic.to_private_key(word_list))[
+                : constants.key_len_bytes
+            ]
+            for word_list in word_lists
+        ]
+        per_key_secs = time.perf_counter() - start
+        self.assertEqual(private_keys, decoded_keys)
+
+        start = time.perf_counter()
+        mnemonics = Mnemonic.from_private_keys(private_keys)
+        decoded_keys = Mnemonic.to_private_keys_bytes(mnemonics)
+        bulk_secs = time.perf_counter() - start
+        self.assertEqual(private_keys, decoded_keys)
+
+        logger.info(
+            "mnemonic round trips/sec: per key=%d bulk=%d",
+            len(private_keys) / per_key_secs,
+            len(private_keys) / bulk_secs,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,276 @@
+import asyncio
+import tempfile
+import unittest
+from contextlib import aclosing
+from pathlib import Path
+from typing import cast
+
+from algosdk.error import AlgodHTTPError
+from algosdk.transaction import PaymentTxn, assign_group_id
+from algosdk.v2client.algod import AlgodClient
+
+from oysterpack.algorand import Address
+from oysterpack.algorand.accounts import get_account_summary, get_algo_balance
+from oysterpack.algorand.algod import AsyncAlgodClient
+from oysterpack.algorand.emulator.algod import (
+    AlgodEmulator,
+    AlgodRecorder,
+    AlgodReplayer,
+)
+from oysterpack.algorand.keys import AlgoPrivateKey
+from oysterpack.algorand.transactions import create_rekey_txn, send_transaction
+
+
+class AlgodEmulatorTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.emulator = AlgodEmulator()
+        self.emulator.start()
+        self.algod_client = AlgodClient(self.emulator.token, self.emulator.url)
+        self.async_algod_client = AsyncAlgodClient(self.algod_client)
+        self.sender = AlgoPrivateKey()
+        self.receiver = AlgoPrivateKey()
+        self.emulator.fund(self.sender.signing_address, 10_000_000)
+
+    async def asyncTearDown(self) -> None:
+        self.emulator.close()
+
+    async def payment(
+        self, sender: AlgoPrivateKey, receiver: AlgoPrivateKey, amount: int
+    ) -> PaymentTxn:
+        return PaymentTxn(
+            sender=sender.signing_address,
+            receiver=receiver.signing_address,
+            amt=amount,
+            sp=await self.async_algod_client.suggested_params_with_flat_flee(),
+        )
+
+    async def test_send_transaction(self):
+        await self.async_algod_client.check_node_status()
+        txn = await self.payment(self.sender, self.receiver, 1_000_000)
+        txid = await send_transaction(
+            self.algod_client, self.sender.sign_transaction(txn)
+        )
+        self.assertEqual(1, self.emulator.round)
+
+        txn_info = await self.async_algod_client.wait_for_confirmation(txid)
+        self.assertEqual(1, txn_info["confirmed-round"])
+        self.assertEqual(
+            1_000_000,
+            await get_algo_balance(
+                Address(self.receiver.signing_address), self.algod_client
+            ),
+        )
+        self.assertEqual(
+            10_000_000 - 1_000_000 - 1000,
+            await get_algo_balance(
+                Address(self.sender.signing_address), self.algod_client
+            ),
+        )
+
+        with self.subTest("JSON account info"):
+            account_info = cast(
+                dict, self.algod_client.account_info(self.receiver.signing_address)
+            )
+            self.assertEqual(1_000_000, account_info["amount"])
+            self.assertNotIn("auth-addr", account_info)
+
+        with self.subTest("duplicate transactions are rejected"):
+            with self.assertRaises(AlgodHTTPError) as err:
+                await self.async_algod_client.send_transaction(
+                    self.sender.sign_transaction(txn)
+                )
+            self.assertIn("transaction already in ledger", str(err.exception))
+
+    async def test_rejected_transactions(self):
+        with self.subTest("overspend"):
+            txn = await self.payment(self.sender, self.receiver, 100_000_000)
+            with self.assertRaises(AlgodHTTPError) as err:
+                await self.async_algod_client.send_transaction(
+                    self.sender.sign_transaction(txn)
+                )
+            self.assertEqual(400, err.exception.code)
+            self.assertIn("overspend", str(err.exception))
+
+        with self.subTest("below min balance"):
+            txn = await self.payment(self.sender, self.receiver, 1000)
+            with self.assertRaises(AlgodHTTPError) as err:
+                await self.async_algod_client.send_transaction(
+                    self.sender.sign_transaction(txn)
+                )
+            self.assertIn("below min", str(err.exception))
+
+        with self.subTest("invalid signature"):
+            txn = await self.payment(self.sender, self.receiver, 1_000_000)
+            with self.assertRaises(AlgodHTTPError) as err:
+                await self.async_algod_client.send_transaction(
+                    self.receiver.sign_transaction(txn)
+                )
+            self.assertIn("should have been authorized by", str(err.exception))
+
+        self.assertEqual(0, self.emulator.round)
+
+    async def test_rekey(self):
+        sender = Address(self.sender.signing_address)
+        txn = create_rekey_txn(
+            sender,
+            Address(self.receiver.signing_address),
+            await self.async_algod_client.suggested_params_with_flat_flee(),
+        )
+        await send_transaction(self.algod_client, self.sender.sign_transaction(txn))
+        account = await get_account_summary(sender, self.algod_client)
+        self.assertEqual(self.receiver.signing_address, account.auth_address)
+
+        # the rekeyed account is signed by its auth account
+        txn = await self.payment(self.sender, self.receiver, 1_000_000)
+        with self.assertRaises(AlgodHTTPError):
+            await self.async_algod_client.send_transaction(
+                self.sender.sign_transaction(txn)
+            )
+        await send_transaction(self.algod_client, self.receiver.sign_transaction(txn))
+
+    async def test_atomic_group(self):
+        txns = assign_group_id(
+            [
+                await self.payment(self.sender, self.receiver, 1_000_000),
+                await self.payment(self.sender, self.receiver, 2_000_000),
+            ]
+        )
+        txid = await self.async_algod_client.send_transactions(
+            [self.sender.sign_transaction(txn) for txn in txns]
+        )
+        await self.async_algod_client.wait_for_confirmation(txid)
+        self.assertEqual(
+            3_000_000,
+            await get_algo_balance(
+                Address(self.receiver.signing_address), self.algod_client
+            ),
+        )
+
+        with self.subTest("groups are applied atomically"):
+            txns = assign_group_id(
+                [
+                    await self.payment(self.sender, self.receiver, 1_000_000),
+                    await self.payment(self.sender, self.receiver, 100_000_000),
+                ]
+            )
+            with self.assertRaises(AlgodHTTPError):
+                await self.async_algod_client.send_transactions(
+                    [self.sender.sign_transaction(txn) for txn in txns]
+                )
+            self.assertEqual(
+                3_000_000,
+                await get_algo_balance(
+                    Address(self.receiver.signing_address), self.algod_client
+                ),
+            )
+
+    async def test_blocks(self):
+        txn = await self.payment(self.sender, self.receiver, 1_000_000)
+        txid = await send_transaction(
+            self.algod_client, self.sender.sign_transaction(txn)
+        )
+        self.emulator.advance(2)
+
+        async with aclosing(self.async_algod_client.follow_blocks(1)) as blocks:
+            block = await anext(blocks)
+            self.assertEqual(1, block.round)
+            self.assertEqual(1, len(block.txns))
+            self.assertEqual(1_000_000, block.txns[0]["txn"]["amt"])
+            self.assertEqual(2, (await anext(blocks)).round)
+            self.assertEqual(3, (await anext(blocks)).round)
+
+        self.assertEqual(
+            {"blockTxids": [txid]},
+            self.algod_client.algod_request("GET", "/blocks/1/txids"),
+        )
+        with self.assertRaises(AlgodHTTPError) as err:
+            self.algod_client.block_info(4, "msgpack")
+        self.assertEqual(404, err.exception.code)
+
+    async def test_request_counts_and_latency(self):
+        self.emulator.latency = 0.05
+        self.algod_client.status()
+        self.assertEqual(1, self.emulator.request_counts["GET /v2/status"])
+
+        with self.subTest("invalid token"):
+            with self.assertRaises(AlgodHTTPError) as err:
+                AlgodClient("invalid", self.emulator.url).status()
+            self.assertEqual(401, err.exception.code)
+
+
+class AlgodEmulatorBlockProductionTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_advance(self):
+        with AlgodEmulator(dev_mode=False, wait_timeout=1.0) as emulator:
+            algod_client = AsyncAlgodClient(AlgodClient(emulator.token, emulator.url))
+            sender, receiver = AlgoPrivateKey(), AlgoPrivateKey()
+            emulator.fund(sender.signing_address, 10_000_000)
+            txn = PaymentTxn(
+                sender=sender.signing_address,
+                receiver=receiver.signing_address,
+                amt=1_000_000,
+                sp=await algod_client.suggested_params_with_flat_flee(),
+            )
+            txid = await algod_client.send_transaction(sender.sign_transaction(txn))
+
+            pending_info = cast(
+                dict, algod_client.algod_client.pending_transaction_info(txid)
+            )
+            self.assertNotIn("confirmed-round", pending_info)
+            self.assertEqual("", pending_info["pool-error"])
+
+            confirmation = asyncio.create_task(algod_client.wait_for_confirmation(txid))
+            await asyncio.sleep(0.1)
+            self.assertFalse(confirmation.done())
+            emulator.advance()
+            self.assertEqual(1, (await confirmation)["confirmed-round"])
+
+            with self.subTest("wait for block after times out"):
+                status = cast(dict, algod_client.algod_client.status_after_block(1))
+                self.assertEqual(1, status["last-round"])
+
+
+class AlgodRecordReplayTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_record_replay(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            recording = Path(tmp_dir) / "algod.jsonl"
+            account = AlgoPrivateKey().signing_address
+            with AlgodEmulator() as emulator:
+                emulator.fund(account, 1_000_000)
+                with AlgodRecorder(emulator.url, emulator.token, recording) as recorder:
+                    algod_client = AlgodClient(recorder.token, recorder.url)
+                    recorded_status = algod_client.status()
+                    emulator.advance()
+                    recorded_next_status = algod_client.status()
+                    recorded_balance = await get_algo_balance(
+                        Address(account), algod_client
+                    )
+                    with self.assertRaises(AlgodHTTPError):
+                        algod_client.block_info(100, "msgpack")
+
+            # the algod emulator is closed, i.e., responses are served from the recording
+            with AlgodReplayer(recording) as replayer:
+                algod_client = AlgodClient(replayer.token, replayer.url)
+                self.assertEqual(recorded_status, algod_client.status())
+                self.assertEqual(recorded_next_status, algod_client.status())
+                # the last recorded response is repeated
+                self.assertEqual(recorded_next_status, algod_client.status())
+                self.assertEqual(
+                    recorded_balance,
+                    await get_algo_balance(Address(account), algod_client),
+                )
+                with self.assertRaises(AlgodHTTPError) as err:
+                    algod_client.block_info(100, "msgpack")
+                self.assertEqual(404, err.exception.code)
+
+                with self.subTest("requests that were not recorded"):
+                    with self.assertRaises(AlgodHTTPError) as err:
+                        algod_client.suggested_params()
+                    self.assertIn("no recorded response", str(err.exception))
+
+                with self.subTest("rewind"):
+                    replayer.rewind()
+                    self.assertEqual(recorded_status, algod_client.status())
+
+
+if __name__ == "__main__":
+    unittest.main()
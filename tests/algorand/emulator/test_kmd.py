@@ -0,0 +1,313 @@
+import asyncio
+import unittest
+from typing import cast
+
+from algosdk.error import KMDHTTPError
+from algosdk.transaction import (
+    Multisig,
+    MultisigTransaction,
+    PaymentTxn,
+    SignedTransaction,
+    SuggestedParams,
+)
+from algosdk.v2client.algod import AlgodClient
+
+from oysterpack.algorand.algod import AsyncAlgodClient
+from oysterpack.algorand.emulator.kmd import KmdEmulator
+from oysterpack.algorand.keys import AlgoPrivateKey
+from oysterpack.algorand.kmd import (
+    KmdService,
+    Wallet,
+    WalletSessionPool,
+    derive_private_key,
+)
+
+SUGGESTED_PARAMS = SuggestedParams(
+    fee=1000,
+    first=1,
+    last=1000,
+    gh="SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=",
+    flat_fee=True,
+)
+
+
+class KmdEmulatorTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.emulator = KmdEmulator()
+        self.emulator.start()
+        self.kmd_service = KmdService(url=self.emulator.url, token=self.emulator.token)
+        # the emulator does not provide algod - auth addresses are served from the cache
+        self.algod_client = AsyncAlgodClient(AlgodClient("", "http://localhost:1"))
+        await self.kmd_service.create_wallet("wallet", "password")
+        self.wallet_session = await self.kmd_service.connect(
+            "wallet", "password", self.algod_client
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.wallet_session.release()
+        self.emulator.close()
+
+    def register_auth_address(self, address: str, auth_address: str | None = None):
+        self.algod_client.auth_address_cache.put(
+            address, auth_address or address, 0  # type: ignore
+        )
+
+    async def test_wallets(self):
+        self.assertEqual(
+            ["wallet"],
+            [wallet.name for wallet in await self.kmd_service.list_wallets()],
+        )
+
+        with self.assertRaises(KMDHTTPError) as err:
+            await self.kmd_service.create_wallet("wallet", "password")
+        self.assertIn("wallet with same name already exists", str(err.exception))
+
+        with self.subTest("invalid password"):
+            with self.assertRaises(KMDHTTPError):
+                await self.kmd_service.connect("wallet", "invalid", self.algod_client)
+
+        with self.subTest("rename"):
+            await self.wallet_session.rename("wallet-2")
+            self.assertIsNotNone(await self.kmd_service.get_wallet("wallet-2"))
+            self.assertIsNone(await self.kmd_service.get_wallet("wallet"))
+
+    async def test_wallet_index(self):
+        await self.kmd_service.get_wallet("wallet")
+        list_wallets_count = self.emulator.request_counts["GET /v1/wallets"]
+
+        with self.subTest("lookups are served from the index"):
+            self.assertIsNotNone(await self.kmd_service.get_wallet("wallet"))
+            self.assertIsNone(await self.kmd_service.get_wallet("unknown"))
+            self.assertEqual(
+                list_wallets_count, self.emulator.request_counts["GET /v1/wallets"]
+            )
+
+        with self.subTest("index is updated when wallets are created and renamed"):
+            await self.kmd_service.create_wallet("wallet-2", "password")
+            await self.wallet_session.rename("wallet-3")
+            wallets = await self.kmd_service.get_wallets(
+                ["wallet", "wallet-2", "wallet-3"]
+            )
+            self.assertIsNone(wallets["wallet"])
+            self.assertEqual("wallet-2", cast(Wallet, wallets["wallet-2"]).name)
+            self.assertEqual("wallet-3", cast(Wallet, wallets["wallet-3"]).name)
+            self.assertEqual(
+                list_wallets_count, self.emulator.request_counts["GET /v1/wallets"]
+            )
+
+        with self.subTest("index expires"):
+            kmd_service = KmdService(
+                url=self.emulator.url, token=self.emulator.token, wallet_index_ttl=0
+            )
+            await kmd_service.get_wallet("wallet-2")
+            await kmd_service.get_wallet("wallet-2")
+            self.assertEqual(
+                list_wallets_count + 2, self.emulator.request_counts["GET /v1/wallets"]
+            )
+
+    async def test_keys(self):
+        accounts = [
+            address async for address in self.wallet_session.generate_accounts(5)
+        ]
+        self.assertEqual(
+            sorted(accounts), sorted(await self.wallet_session.list_accounts())
+        )
+
+        with self.subTest("exported private keys match the accounts"):
+            async for address, mnemonic in self.wallet_session.export_private_keys(
+                accounts
+            ):
+                self.assertEqual(address, AlgoPrivateKey(mnemonic).signing_address)
+
+        with self.subTest("recovered wallet regenerates the same keys"):
+            master_derivation_key = (
+                await self.wallet_session.export_master_derivation_key()
+            )
+            await self.kmd_service.recover_wallet(
+                "recovered", "password", master_derivation_key
+            )
+            recovered_wallet_session = await self.kmd_service.connect(
+                "recovered", "password", self.algod_client
+            )
+            self.assertEqual(
+                sorted(accounts),
+                sorted(
+                    [
+                        address
+                        async for address in recovered_wallet_session.generate_accounts(
+                            5
+                        )
+                    ]
+                ),
+            )
+            await recovered_wallet_session.release()
+
+        with self.subTest("existing keys are rejected"):
+            private_key = AlgoPrivateKey(
+                (await anext(self.wallet_session.export_private_keys(accounts[:1])))[1]
+            )
+            with self.assertRaises(KMDHTTPError) as err:
+                await self.wallet_session.import_private_key(private_key)
+            self.assertIn("key already exists in wallet", str(err.exception))
+
+        with self.subTest("delete key"):
+            await self.wallet_session.delete_account(accounts[0])
+            self.wallet_session.invalidate_cache()
+            self.assertFalse(await self.wallet_session.contains_account(accounts[0]))
+
+    async def test_generate_key_skips_existing_keys(self):
+        await self.wallet_session.generate_account()
+        master_derivation_key = (
+            await self.wallet_session.export_master_derivation_key()
+        ).to_private_key_bytes()
+        # the keys for the next derivation indexes are imported
+        for index in (1, 2):
+            await self.wallet_session.import_private_key(
+                derive_private_key(master_derivation_key, index)
+            )
+
+        for index in (3, 4):
+            self.assertEqual(
+                derive_private_key(master_derivation_key, index).signing_address,
+                await self.wallet_session.generate_account(),
+            )
+
+    async def test_sign_transactions(self):
+        accounts = [
+            address async for address in self.wallet_session.generate_accounts(4)
+        ]
+        multisig = Multisig(1, 2, accounts[:3])
+        await self.wallet_session.import_multisig(multisig)
+        for account in accounts[:3]:
+            self.register_auth_address(account)
+        self.register_auth_address(multisig.address())
+        # rekeyed account
+        self.register_auth_address(accounts[3], accounts[0])
+
+        txns = [
+            PaymentTxn(sender, SUGGESTED_PARAMS, accounts[0], 0)
+            for sender in [*accounts, multisig.address()]
+        ]
+        signed_txns = await self.wallet_session.sign_transaction_group(
+            txns, list(range(len(txns)))
+        )
+
+        for txn, signed_txn in zip(txns[:3], signed_txns[:3], strict=True):
+            self.assertIsInstance(signed_txn, SignedTransaction)
+            self.assertEqual(txn.sender, signed_txn.transaction.sender)
+            self.assertIsNone(signed_txn.authorizing_address)
+        self.assertEqual(accounts[0], signed_txns[3].authorizing_address)
+
+        multisig_txn = signed_txns[4]
+        self.assertIsInstance(multisig_txn, MultisigTransaction)
+        self.assertEqual(
+            3,
+            len(
+                [subsig for subsig in multisig_txn.multisig.subsigs if subsig.signature]
+            ),
+        )
+
+        with self.subTest("signatures match client side signatures"):
+            private_key = await self.wallet_session.export_private_key(accounts[0])
+            self.assertEqual(
+                txns[0].sign(private_key.to_private_key()).signature,
+                signed_txns[0].signature,
+            )
+
+    async def test_sign_multisig_transaction(self):
+        accounts = [
+            address async for address in self.wallet_session.generate_accounts(3)
+        ]
+        multisig = Multisig(1, 2, [*accounts, AlgoPrivateKey().signing_address])
+        await self.wallet_session.import_multisig(multisig)
+        txn = MultisigTransaction(
+            PaymentTxn(multisig.address(), SUGGESTED_PARAMS, accounts[0], 0),
+            multisig,
+        )
+
+        with self.subTest("all wallet cosigners sign"):
+            list_keys_count = self.emulator.request_counts["POST /v1/key/list"]
+            signed_txn = await self.wallet_session.sign_multisig_transaction(txn)
+            self.assertEqual(
+                [True, True, True, False],
+                [bool(subsig.signature) for subsig in signed_txn.multisig.subsigs],
+            )
+            # cosigner membership is checked using the cached wallet accounts
+            self.assertEqual(
+                list_keys_count, self.emulator.request_counts["POST /v1/key/list"]
+            )
+
+        with self.subTest("specified cosigners sign"):
+            signed_txn = await self.wallet_session.sign_multisig_transaction(
+                txn, accounts[1]
+            )
+            signed_txn = await self.wallet_session.sign_multisig_transaction(
+                signed_txn, accounts[2]
+            )
+            self.assertEqual(
+                [False, True, True, False],
+                [bool(subsig.signature) for subsig in signed_txn.multisig.subsigs],
+            )
+
+            with self.assertRaises(AssertionError):
+                await self.wallet_session.sign_multisig_transaction(
+                    txn, multisig.get_public_keys()[3]
+                )
+
+    async def test_injected_faults(self):
+        self.emulator.fault_rate = 1.0
+        with self.assertRaises(KMDHTTPError):
+            await self.kmd_service.list_wallets()
+
+        self.emulator.fault_rate = 0.0
+        await self.kmd_service.list_wallets()
+
+    async def test_wallet_session_pool(self):
+        async with WalletSessionPool(
+            self.kmd_service,
+            self.algod_client,
+            sessions_per_wallet=2,
+            renew_interval=0.05,
+        ) as pool:
+            await pool.register("wallet", "password")
+            async with pool.session("wallet") as wallet_session:
+                account = await wallet_session.generate_account()
+
+            with self.subTest("expired handles are re-initialized"):
+                self.emulator.expire_handles()
+                await asyncio.sleep(0.2)
+                async with pool.session("wallet") as wallet_session:
+                    wallet_session.invalidate_cache()
+                    self.assertTrue(await wallet_session.contains_account(account))
+
+        self.assertEqual(2, self.emulator.request_counts["POST /v1/wallet/release"])
+
+    async def test_wallet_session_pool_renews_idle_sessions(self):
+        async with WalletSessionPool(
+            self.kmd_service,
+            self.algod_client,
+            renew_interval=0.05,
+        ) as pool:
+            await pool.register("wallet", "password")
+            async with pool.session("wallet"):
+                renew_count = self.emulator.request_counts["POST /v1/wallet/renew"]
+                await asyncio.sleep(0.2)
+                # checked out sessions are not renewed in the background
+                self.assertEqual(
+                    renew_count, self.emulator.request_counts["POST /v1/wallet/renew"]
+                )
+            await asyncio.sleep(0.2)
+            self.assertGreater(
+                self.emulator.request_counts["POST /v1/wallet/renew"], renew_count
+            )
+
+    async def test_wallet_session_pool_closed_while_checked_out(self):
+        pool = WalletSessionPool(self.kmd_service, self.algod_client)
+        await pool.register("wallet", "password")
+        async with pool.session("wallet"):
+            await pool.close()
+        self.assertEqual(1, self.emulator.request_counts["POST /v1/wallet/release"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,21 @@
+import time
 import unittest
 
+from algosdk.encoding import decode_address
 from algosdk.transaction import wait_for_confirmation
 from beaker import localnet
 
-from oysterpack.algorand.accounts import get_algo_balance, get_auth_address
+from oysterpack.algorand.accounts import (
+    AuthAddressCache,
+    get_account_summaries,
+    get_account_summary,
+    get_algo_balance,
+    get_auth_address,
+)
 from oysterpack.algorand.keys import AlgoPrivateKey
 from oysterpack.algorand.transactions import create_rekey_txn
 from oysterpack.core.asyncio.task_manager import schedule_blocking_io_task
-from tests.test_support import fund_account
+from tests.test_support import StubAccountAlgodClient, fund_account
 
 
 class AccountsTestCase(unittest.IsolatedAsyncioTestCase):
@@ -46,5 +54,99 @@ class AccountsTestCase(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(0, algo_balance)
 
 
+class AccountSummaryTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_get_account_summary(self):
+        account = AlgoPrivateKey().signing_address
+        auth_account = AlgoPrivateKey().signing_address
+        algod_client = StubAccountAlgodClient(
+            {
+                account: {"amount": 100, "auth-addr": auth_account},
+                auth_account: {"amount": 200},
+            }
+        )
+
+        summary = await get_account_summary(account, algod_client)
+        self.assertEqual(100, summary.amount)
+        self.assertEqual(auth_account, summary.auth_address)
+        self.assertEqual(10, summary.round)
+        self.assertEqual(
+            (f"/accounts/{account}", {"exclude": "all", "format": "msgpack"}),
+            algod_client.requests[0],
+        )
+
+        with self.subTest("account is not rekeyed"):
+            summary = await get_account_summary(auth_account, algod_client)
+            self.assertEqual(auth_account, summary.auth_address)
+
+        with self.subTest("ledger field names"):
+            algod_client.accounts[account] = {
+                "algo": 300,
+                "spend": decode_address(auth_account),
+            }
+            summary = await get_account_summary(account, algod_client)
+            self.assertEqual(300, summary.amount)
+            self.assertEqual(auth_account, summary.auth_address)
+
+        with self.subTest("bulk lookup"):
+            summaries = await get_account_summaries(
+                [account, auth_account], algod_client, max_concurrency=2
+            )
+            self.assertEqual({account, auth_account}, set(summaries))
+            self.assertEqual(200, summaries[auth_account].amount)
+
+
+class AuthAddressCacheTestCase(unittest.TestCase):
+    def test_get_put(self):
+        cache = AuthAddressCache()
+        account = AlgoPrivateKey().signing_address
+        auth_account = AlgoPrivateKey().signing_address
+        self.assertIsNone(cache.get(account))
+
+        cache.put(account, auth_account, 100)
+        self.assertEqual(auth_account, cache.get(account))
+        self.assertEqual(100, cache.current_round)
+
+        with self.subTest("invalidate"):
+            cache.invalidate(account)
+            self.assertIsNone(cache.get(account))
+            cache.put(account, auth_account, 100)
+            cache.invalidate()
+            self.assertEqual(0, len(cache))
+
+    def test_round_based_ttl(self):
+        cache = AuthAddressCache(ttl_rounds=10)
+        account = AlgoPrivateKey().signing_address
+        cache.put(account, account, 100)
+
+        cache.observe_round(110)
+        self.assertEqual(account, cache.get(account))
+        cache.observe_round(111)
+        self.assertIsNone(cache.get(account))
+
+        with self.subTest("older rounds are ignored"):
+            cache.observe_round(50)
+            self.assertEqual(111, cache.current_round)
+
+        with self.subTest("current round is estimated between observations"):
+            cache = AuthAddressCache(ttl_rounds=10, avg_round_time=0.001)
+            cache.put(account, account, 100)
+            time.sleep(0.02)
+            self.assertGreater(cache.current_round, 110)
+            self.assertIsNone(cache.get(account))
+
+    def test_max_size(self):
+        cache = AuthAddressCache(max_size=2)
+        accounts = [AlgoPrivateKey().signing_address for _ in range(3)]
+        cache.put(accounts[0], accounts[0], 1)
+        cache.put(accounts[1], accounts[1], 1)
+        # access the first entry, which makes the second entry the least recently used
+        cache.get(accounts[0])
+        cache.put(accounts[2], accounts[2], 1)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get(accounts[1]))
+        self.assertIsNotNone(cache.get(accounts[0]))
+        self.assertIsNotNone(cache.get(accounts[2]))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,93 @@
+import asyncio
+import time
+import unittest
+from typing import Any
+
+from algosdk.transaction import SuggestedParams
+from algosdk.v2client.algod import AlgodClient
+
+from oysterpack.algorand.algod import AsyncAlgodClient, SuggestedParamsCache
+
+
+class StubAlgodClient(AlgodClient):
+    """
+    Serves suggested params for the current round, which is advanced by the test
+    """
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__("", "http://localhost:1")
+        self.latency = latency
+        self.round = 1
+        self.suggested_params_count = 0
+
+    def suggested_params(self, **kwargs: Any) -> SuggestedParams:
+        time.sleep(self.latency)
+        self.suggested_params_count += 1
+        return SuggestedParams(
+            fee=0,
+            first=self.round,
+            last=self.round + 1000,
+            gh="SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=",
+            min_fee=1000,
+        )
+
+
+class SuggestedParamsCacheTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_get(self):
+        algod_client = StubAlgodClient(latency=0.05)
+        cache = SuggestedParamsCache(algod_client, ttl=60)
+
+        with self.subTest("concurrent lookups share a single algod request"):
+            results = await asyncio.gather(*[cache.get() for _ in range(10)])
+            self.assertEqual(1, algod_client.suggested_params_count)
+            for suggested_params in results:
+                self.assertEqual(1000, suggested_params.fee)
+                self.assertTrue(suggested_params.flat_fee)
+
+        with self.subTest("fee is scaled by txn count on a copy"):
+            suggested_params = await cache.get(txn_count=3)
+            self.assertEqual(3000, suggested_params.fee)
+            self.assertEqual(1000, (await cache.get()).fee)
+            self.assertEqual(1, algod_client.suggested_params_count)
+
+        with self.subTest("new round triggers a background refresh"):
+            algod_client.round = 2
+            cache.observe_round(2)
+            # stale params are served while the refresh is in flight
+            self.assertEqual(1, (await cache.get()).first)
+            await asyncio.sleep(0.2)
+            self.assertEqual(2, (await cache.get()).first)
+            self.assertEqual(2, algod_client.suggested_params_count)
+
+        with self.subTest("invalid txn count"):
+            with self.assertRaises(ValueError):
+                await cache.get(txn_count=0)
+
+    async def test_ttl(self):
+        algod_client = StubAlgodClient()
+        cache = SuggestedParamsCache(algod_client, ttl=0.05)
+        await cache.get()
+        await asyncio.sleep(0.1)
+        await cache.get()
+        await asyncio.sleep(0.05)
+        self.assertEqual(2, algod_client.suggested_params_count)
+
+    async def test_max_age(self):
+        algod_client = StubAlgodClient()
+        cache = SuggestedParamsCache(algod_client, ttl=0, max_age=0)
+        await cache.get()
+        algod_client.round = 2
+        await asyncio.sleep(0.01)
+        # params older than max age are not served
+        self.assertEqual(2, (await cache.get()).first)
+
+    async def test_async_algod_client(self):
+        algod_client = StubAlgodClient()
+        client = AsyncAlgodClient(algod_client, suggested_params_ttl=60)
+        for _ in range(10):
+            await client.suggested_params_with_flat_flee()
+        self.assertEqual(1, algod_client.suggested_params_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
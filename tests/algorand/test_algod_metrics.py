@@ -0,0 +1,166 @@
+import asyncio
+import json
+import logging
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client.algod import AlgodClient
+
+from oysterpack.algorand.accounts import get_algo_balance
+from oysterpack.algorand.algod import AsyncAlgodClient
+from oysterpack.algorand.algod_metrics import (
+    ERROR_STATUS,
+    AlgodRequestMetrics,
+    InstrumentedAlgodClient,
+    endpoint_name,
+)
+from oysterpack.algorand.algod_pool import AlgodClientPool
+from oysterpack.algorand.emulator.algod import AlgodEmulator
+from oysterpack.algorand.keys import AlgoPrivateKey
+from tests.test_support import StubAccountAlgodClient, StubJsonAlgodClient
+
+
+class AcceptedRequestHandler(BaseHTTPRequestHandler):
+    """
+    Responds to every request with 202 Accepted
+    """
+
+    def do_GET(self) -> None:
+        body = json.dumps({"last-round": 1}).encode()
+        self.send_response(202)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt: str, *args: object) -> None:
+        pass
+
+
+class EndpointNameTestCase(unittest.TestCase):
+    def test_endpoint_name(self):
+        address = AlgoPrivateKey().signing_address
+        self.assertEqual(
+            "GET /accounts/{address}", endpoint_name("GET", f"/accounts/{address}")
+        )
+        self.assertEqual("GET /blocks/{id}", endpoint_name("GET", "/blocks/100"))
+        self.assertEqual(
+            "GET /transactions/pending/{txid}",
+            endpoint_name("GET", f"/transactions/pending/{'A' * 52}"),
+        )
+        self.assertEqual("POST /transactions", endpoint_name("POST", "/transactions"))
+
+
+class InstrumentedAlgodClientTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_instrumentation(self):
+        node = StubJsonAlgodClient("http://node")
+        algod_client = InstrumentedAlgodClient(node)
+
+        self.assertEqual(100, algod_client.status()["last-round"])
+        with self.assertRaises(AlgodHTTPError):
+            algod_client.algod_request("GET", "/accounts/unknown")
+        node.down = True
+        with self.assertRaises(ConnectionRefusedError):
+            algod_client.status()
+
+        metrics = algod_client.metrics.snapshot()
+        status_stats = metrics["GET /status"]
+        self.assertEqual(2, status_stats.count)
+        self.assertEqual(1, status_stats.errors)
+        self.assertEqual({200: 1, ERROR_STATUS: 1}, status_stats.status_codes)
+        self.assertEqual(
+            len(json.dumps({"last-round": 100, "catchup-time": 0})),
+            status_stats.bytes_in,
+        )
+        self.assertEqual(2, sum(status_stats.latency_histogram))
+        self.assertGreater(status_stats.latency_percentile(0.99), 0)
+        self.assertEqual({404: 1}, metrics["GET /accounts/unknown"].status_codes)
+
+        with self.subTest("reset"):
+            algod_client.metrics.reset()
+            self.assertEqual({}, algod_client.metrics.snapshot())
+
+    async def test_helpers_are_instrumented(self):
+        account = AlgoPrivateKey().signing_address
+        algod_client = InstrumentedAlgodClient(
+            StubAccountAlgodClient({account: {"amount": 100}})
+        )
+        self.assertEqual(100, await get_algo_balance(account, algod_client))
+        stats = algod_client.metrics.snapshot()["GET /accounts/{address}"]
+        self.assertEqual(1, stats.count)
+        self.assertGreater(stats.bytes_in, 0)
+
+    async def test_successful_responses_are_recorded_as_200(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), AcceptedRequestHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            algod_client = InstrumentedAlgodClient(
+                AlgodClient("", f"http://127.0.0.1:{server.server_address[1]}")
+            )
+            self.assertEqual({"last-round": 1}, algod_client.status())
+            stats = algod_client.metrics.snapshot()["GET /status"]
+            # AlgodClient does not expose the HTTP status of successful responses
+            self.assertEqual({200: 1}, stats.status_codes)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    async def test_async_algod_client_metrics(self):
+        with AlgodEmulator() as emulator:
+            metrics = AlgodRequestMetrics()
+            algod_client = AsyncAlgodClient(
+                AlgodClient(emulator.token, emulator.url), metrics=metrics
+            )
+            self.assertIs(metrics, algod_client.metrics)
+            self.assertIsInstance(algod_client.algod_client, InstrumentedAlgodClient)
+            await algod_client.check_node_status()
+            with self.assertRaises(AlgodHTTPError):
+                algod_client.algod_client.block_info(100, "msgpack")
+
+            snapshot = metrics.snapshot()
+            self.assertEqual({200: 1}, snapshot["GET /status"].status_codes)
+            self.assertEqual({404: 1}, snapshot["GET /blocks/{id}"].status_codes)
+
+        with self.subTest("metrics are disabled by default"):
+            self.assertIsNone(AsyncAlgodClient(AlgodClient("", "http://node")).metrics)
+
+    async def test_pool_retries(self):
+        metrics = AlgodRequestMetrics()
+        nodes = [
+            StubJsonAlgodClient("http://node-1"),
+            StubJsonAlgodClient("http://node-2"),
+        ]
+        pool = AlgodClientPool(nodes, health_check_interval=60)
+        # each pool node is instrumented
+        AsyncAlgodClient(pool, metrics=metrics)
+        try:
+            pool.check_nodes()
+            # the first node is preferred
+            for node in nodes:
+                node.latency = 0.001 if node is nodes[0] else 0.01
+            pool.check_nodes()
+            nodes[0].down = True
+            pool.algod_request("POST", "/transactions")
+            stats = metrics.snapshot()["POST /transactions"]
+            self.assertEqual(1, stats.retries)
+            self.assertEqual(2, stats.count)
+            self.assertEqual(1, stats.errors)
+        finally:
+            pool.close()
+
+    async def test_periodic_log(self):
+        metrics = AlgodRequestMetrics()
+        metrics.record("GET /status", 0.01, 200)
+        with self.assertLogs("test_periodic_log", logging.INFO) as logs:
+            task = metrics.schedule_periodic_log(
+                0.01, logging.getLogger("test_periodic_log")
+            )
+            await asyncio.sleep(0.05)
+            task.cancel()
+        self.assertIn("GET /status: count=1", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
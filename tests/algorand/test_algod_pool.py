@@ -0,0 +1,120 @@
+import time
+import unittest
+
+from algosdk.error import AlgodHTTPError
+
+from oysterpack.algorand.algod import AsyncAlgodClient
+from oysterpack.algorand.algod_pool import AlgodClientPool
+from tests.test_support import StubAlgodNode
+
+
+class AlgodClientPoolTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fast = StubAlgodNode("http://fast", latency=0.001)
+        self.slow = StubAlgodNode("http://slow", latency=0.02)
+        self.pool = AlgodClientPool(
+            [self.slow, self.fast],
+            min_hedge_delay=0.05,
+            eject_secs=60,
+            health_check_interval=60,
+        )
+
+    def tearDown(self) -> None:
+        self.pool.close()
+
+    def request(self) -> str:
+        return self.pool.algod_request("GET", "/accounts/address")["node"]
+
+    def test_latency_aware_routing(self):
+        self.pool.check_nodes()
+        self.assertEqual(
+            ["http://fast"] * 5,
+            [self.request() for _ in range(5)],
+        )
+        statuses = {status.url: status for status in self.pool.node_statuses()}
+        self.assertLess(
+            statuses["http://fast"].latency, statuses["http://slow"].latency
+        )
+
+    def test_failover(self):
+        self.pool.check_nodes()
+        self.fast.down = True
+        self.assertEqual("http://slow", self.request())
+        statuses = {status.url: status for status in self.pool.node_statuses()}
+        self.assertFalse(statuses["http://fast"].healthy)
+
+        with self.subTest("ejected nodes are not used"):
+            self.fast.requests.clear()
+            self.assertEqual("http://slow", self.request())
+            self.assertEqual([], self.fast.requests)
+
+        with self.subTest("ejected nodes are fallen back to if all healthy nodes fail"):
+            self.fast.down = False
+            self.slow.down = True
+            self.assertEqual("http://fast", self.request())
+            self.slow.down = False
+
+        with self.subTest("restarted node is restored by the health check"):
+            self.fast.down = False
+            self.pool.check_nodes()
+            self.assertEqual("http://fast", self.request())
+
+        with self.subTest("all nodes down"):
+            self.fast.down = True
+            self.slow.down = True
+            with self.assertRaises(ConnectionRefusedError):
+                self.request()
+
+    def test_client_errors_are_not_failed_over(self):
+        self.pool.check_nodes()
+        with self.assertRaises(AlgodHTTPError):
+            self.pool.algod_request("GET", "/accounts/unknown")
+        self.assertNotIn("/accounts/unknown", self.slow.requests)
+        self.assertTrue(all(status.healthy for status in self.pool.node_statuses()))
+
+    def test_lagging_and_catching_up_nodes_are_ejected(self):
+        self.slow.last_round = 90
+        statuses = {status.url: status for status in self.pool.check_nodes()}
+        self.assertFalse(statuses["http://slow"].healthy)
+        self.assertTrue(statuses["http://fast"].healthy)
+
+        self.slow.last_round = 100
+        self.fast.catchup_time = 1000
+        statuses = {status.url: status for status in self.pool.check_nodes()}
+        self.assertTrue(statuses["http://slow"].healthy)
+        self.assertFalse(statuses["http://fast"].healthy)
+        self.assertEqual("http://slow", self.request())
+
+    def test_hedged_reads(self):
+        self.pool.check_nodes()
+        # the preferred node becomes slow
+        self.fast.latency = 1.0
+        start = time.perf_counter()
+        self.assertEqual("http://slow", self.request())
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+        with self.subTest("writes are not hedged"):
+            self.fast.latency = 0.1
+            self.slow.requests.clear()
+            self.pool.algod_request("POST", "/transactions")
+            self.assertNotIn("/transactions", self.slow.requests)
+
+
+class AsyncAlgodClientPoolTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_check_node_status(self):
+        nodes = [StubAlgodNode("http://node-1"), StubAlgodNode("http://node-2")]
+        pool = AlgodClientPool(nodes, health_check_interval=60)
+        try:
+            algod_client = AsyncAlgodClient(pool)
+            await algod_client.check_node_status()
+
+            for node in nodes:
+                node.down = True
+            with self.assertRaises(AssertionError):
+                await algod_client.check_node_status()
+        finally:
+            pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
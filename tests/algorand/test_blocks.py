@@ -0,0 +1,126 @@
+import tempfile
+import unittest
+from contextlib import aclosing
+from pathlib import Path
+from typing import Any
+
+import msgpack  # type: ignore
+
+from oysterpack.algorand.algod import AsyncAlgodClient
+from oysterpack.algorand.blocks import BlockCheckpoint, decode_block, follow_blocks
+from tests.test_support import StubAlgodClient
+
+
+class StubBlockAlgodClient(StubAlgodClient):
+    """
+    Serves msgpack encoded blocks for rounds that have been produced
+    """
+
+    def __init__(self):
+        super().__init__(round_time=0.01)
+        self.block_requests: list[int] = []
+
+    def block_info(
+        self, block: int | None = None, response_format: str = "json", **kwargs: Any
+    ) -> bytes:
+        assert response_format == "msgpack"
+        assert block is not None and block <= self.round
+        self.block_requests.append(block)
+        return msgpack.packb(
+            {
+                "block": {
+                    "rnd": block,
+                    "ts": 1_000_000 + block,
+                    "txns": [{"txn": {"type": "pay", "amt": block}}],
+                }
+            }
+        )
+
+
+class DecodeBlockTestCase(unittest.TestCase):
+    def test_binary_strings(self):
+        # algod encodes binary app state keys, byte slice values, and logs as msgpack strings
+        data = msgpack.packb(
+            {
+                "block": {
+                    "rnd": 1,
+                    "txns": [
+                        {
+                            "dt": {
+                                "gd": {"KKKK": {"at": 1, "bs": "VV"}},
+                                "lg": ["LLL"],
+                            }
+                        }
+                    ],
+                }
+            }
+        )
+        data = (
+            data.replace(b"\xa4KKKK", b"\xa4\xff\x00k\xfe")
+            .replace(b"\xa2VV", b"\xa2\xc3\x28")
+            .replace(b"\xa3LLL", b"\xa3\x80\x81\x82")
+        )
+
+        block = decode_block(data)
+        [(key, value)] = block.txns[0]["dt"]["gd"].items()
+        self.assertEqual(b"\xff\x00k\xfe", key.encode("utf-8", "surrogateescape"))
+        self.assertEqual(b"\xc3\x28", value["bs"].encode("utf-8", "surrogateescape"))
+        self.assertEqual(
+            b"\x80\x81\x82",
+            block.txns[0]["dt"]["lg"][0].encode("utf-8", "surrogateescape"),
+        )
+
+
+class FollowBlocksTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_follow_blocks(self):
+        algod_client = StubBlockAlgodClient()
+        rounds = []
+        async with aclosing(follow_blocks(algod_client, 1, prefetch=3)) as blocks:
+            async for block in blocks:
+                rounds.append(block.round)
+                self.assertEqual(1_000_000 + block.round, block.timestamp)
+                self.assertEqual(block.round, block.txns[0]["txn"]["amt"])
+                self.assertNotIn("txns", block.header)
+                if len(rounds) == 10:
+                    break
+        self.assertEqual(list(range(1, 11)), rounds)
+        # blocks are never requested before they are produced, and each block is requested once
+        self.assertEqual(
+            len(set(algod_client.block_requests)), len(algod_client.block_requests)
+        )
+
+    async def test_resume_from_checkpoint(self):
+        algod_client = StubBlockAlgodClient()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint = BlockCheckpoint(Path(temp_dir) / "checkpoint")
+            self.assertIsNone(checkpoint.load())
+
+            async def follow(count: int) -> list[int]:
+                rounds = []
+                async with aclosing(
+                    follow_blocks(algod_client, 1, checkpoint=checkpoint)
+                ) as blocks:
+                    async for block in blocks:
+                        rounds.append(block.round)
+                        if len(rounds) == count:
+                            break
+                return rounds
+
+            self.assertEqual([1, 2, 3], await follow(3))
+            # the last block was not checkpointed, because the consumer did not request the next block
+            self.assertEqual(2, checkpoint.load())
+            self.assertEqual([3, 4, 5], await follow(3))
+
+    async def test_async_algod_client(self):
+        algod_client = AsyncAlgodClient(StubBlockAlgodClient())
+        async with aclosing(algod_client.follow_blocks(prefetch=1)) as blocks:
+            block = await anext(blocks)
+        self.assertEqual(block.round, algod_client.auth_address_cache.current_round)
+
+        with self.subTest("invalid prefetch"):
+            with self.assertRaises(ValueError):
+                await anext(algod_client.follow_blocks(prefetch=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import asyncio
+import unittest
+
+from algosdk.error import (
+    AlgodHTTPError,
+    ConfirmationTimeoutError,
+    TransactionRejectedError,
+)
+
+from oysterpack.algorand import TxnId
+from oysterpack.algorand.confirmations import ConfirmationTracker
+from tests.test_support import StubAlgodClient
+
+
+class ConfirmationTrackerTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_wait_for_confirmations(self):
+        for block_txids_supported in (True, False):
+            with self.subTest(block_txids_supported=block_txids_supported):
+                algod_client = StubAlgodClient(
+                    block_txids_supported=block_txids_supported
+                )
+                tracker = ConfirmationTracker(algod_client)
+                txids = [TxnId(f"txid-{i}") for i in range(500)]
+                for i, txid in enumerate(txids):
+                    algod_client.confirm(txid, rounds=1 + i % 3)
+
+                txn_infos = await asyncio.gather(
+                    *[tracker.wait_for_confirmation(txid) for txid in txids]
+                )
+                for txid, txn_info in zip(txids, txn_infos, strict=True):
+                    self.assertEqual(
+                        algod_client.confirmations[txid], txn_info["confirmed-round"]
+                    )
+                self.assertEqual(0, tracker.pending_count)
+                # the tracker waits for each round once, independent of the number of transactions
+                self.assertLessEqual(
+                    algod_client.request_counts["status_after_block"], 5
+                )
+
+    async def test_already_confirmed(self):
+        algod_client = StubAlgodClient()
+        algod_client.confirm("txid", rounds=0)
+        tracker = ConfirmationTracker(algod_client)
+        txn_info = await tracker.wait_for_confirmation(TxnId("txid"))
+        self.assertEqual(
+            algod_client.confirmations["txid"], txn_info["confirmed-round"]
+        )
+        self.assertEqual(0, algod_client.request_counts["status_after_block"])
+
+    async def test_rejected(self):
+        algod_client = StubAlgodClient()
+        algod_client.rejected.add("txid")
+        tracker = ConfirmationTracker(algod_client)
+        with self.assertRaises(TransactionRejectedError):
+            await tracker.wait_for_confirmation(TxnId("txid"))
+
+    async def test_rejected_while_tracked(self):
+        algod_client = StubAlgodClient(round_time=0.01)
+        tracker = ConfirmationTracker(algod_client, pending_check_rounds=2)
+        confirmation = asyncio.create_task(
+            tracker.wait_for_confirmation(TxnId("txid"), wait_rounds=100)
+        )
+        while algod_client.request_counts["pending_transaction_info"] == 0:
+            await asyncio.sleep(0.01)
+        algod_client.rejected.add("txid")
+        with self.assertRaises(TransactionRejectedError):
+            await confirmation
+        self.assertLess(algod_client.round, 20)
+
+    async def test_block_not_found(self):
+        algod_client = StubAlgodClient()
+        tracker = ConfirmationTracker(algod_client)
+        # simulates a lagging node that does not have the block yet
+        algod_client.fail("block_txids", 404, count=2)
+        algod_client.confirm("txid", rounds=1)
+        txn_info = await tracker.wait_for_confirmation(TxnId("txid"))
+        self.assertEqual(
+            algod_client.confirmations["txid"], txn_info["confirmed-round"]
+        )
+        self.assertTrue(tracker._block_txids_supported)
+
+        with self.subTest("block txids not implemented"):
+            algod_client.fail("block_txids", 501)
+            algod_client.confirm("txid-2", rounds=1)
+            txn_info = await tracker.wait_for_confirmation(TxnId("txid-2"))
+            self.assertEqual(
+                algod_client.confirmations["txid-2"], txn_info["confirmed-round"]
+            )
+            self.assertFalse(tracker._block_txids_supported)
+
+    async def test_transient_node_errors(self):
+        algod_client = StubAlgodClient()
+        tracker = ConfirmationTracker(algod_client)
+        algod_client.fail("status_after_block", 503, count=2)
+        algod_client.confirm("txid", rounds=2)
+        txn_info = await tracker.wait_for_confirmation(TxnId("txid"))
+        self.assertEqual(
+            algod_client.confirmations["txid"], txn_info["confirmed-round"]
+        )
+        self.assertNotIn("status_after_block", algod_client.failures)
+
+        with self.subTest("client errors fail pending transactions"):
+            algod_client.fail("status_after_block", 400)
+            algod_client.confirm("txid-2", rounds=2)
+            with self.assertRaises(AlgodHTTPError):
+                await tracker.wait_for_confirmation(TxnId("txid-2"))
+
+    async def test_cancelled(self):
+        algod_client = StubAlgodClient(round_time=0.01)
+        tracker = ConfirmationTracker(algod_client)
+        confirmations = [
+            asyncio.create_task(
+                tracker.wait_for_confirmation(TxnId("txid"), wait_rounds=100)
+            )
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.05)
+        self.assertEqual(1, tracker.pending_count)
+
+        with self.subTest("the transaction is tracked while any caller is waiting"):
+            confirmations[0].cancel()
+            await asyncio.sleep(0)
+            self.assertEqual(1, tracker.pending_count)
+
+        confirmations[1].cancel()
+        await asyncio.gather(*confirmations, return_exceptions=True)
+        self.assertEqual(0, tracker.pending_count)
+
+    async def test_timeout(self):
+        algod_client = StubAlgodClient(round_time=0.01)
+        tracker = ConfirmationTracker(algod_client)
+        algod_client.confirm("confirmed", rounds=1)
+        results = await asyncio.gather(
+            tracker.wait_for_confirmation(TxnId("unknown"), wait_rounds=3),
+            tracker.wait_for_confirmation(TxnId("confirmed"), wait_rounds=3),
+            return_exceptions=True,
+        )
+        self.assertIsInstance(results[0], ConfirmationTimeoutError)
+        self.assertIsInstance(results[1], dict)
+        self.assertEqual(0, tracker.pending_count)
+
+        with self.subTest("invalid wait rounds"):
+            with self.assertRaises(ValueError):
+                await tracker.wait_for_confirmation(TxnId("txid"), wait_rounds=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
+import asyncio
 import base64
+import io
 import logging
 import unittest
+from contextlib import aclosing
 
 import nacl.exceptions
 from algosdk import constants, transaction
@@ -10,7 +13,16 @@ from algosdk.util import algos_to_microalgos
 from beaker import localnet
 
 from oysterpack.algorand import Mnemonic, keys
-from oysterpack.algorand.keys import AlgoPrivateKey
+from oysterpack.algorand.keys import (
+    AlgoPrivateKey,
+    MultiRecipientMessage,
+    SignedMessageItem,
+    SigningAddress,
+    TruncatedStreamError,
+    generate_private_keys,
+    search_private_keys,
+    verify_signed_messages,
+)
 from oysterpack.core.logging import configure_logging
 
 logger = logging.getLogger(__name__)
@@ -115,6 +127,40 @@ class AlgoPrivateKeyTestCase(unittest.TestCase):
             msg, recipient.decrypt(encrypted_msg, sender.encryption_address)
         )
 
+    def test_multi_recipient_encryption(self):
+        sender = AlgoPrivateKey()
+        recipients = [AlgoPrivateKey() for _ in range(3)]
+
+        msg = b"data" * 100
+        encrypted_msg = sender.encrypt_for_recipients(
+            msg, [recipient.encryption_address for recipient in recipients]
+        )
+        self.assertEqual(sender.encryption_address, encrypted_msg.sender)
+        self.assertEqual(len(recipients), len(encrypted_msg.encrypted_keys))
+        for recipient in recipients:
+            self.assertEqual(
+                msg, recipient.decrypt_multi_recipient_message(encrypted_msg)
+            )
+
+        with self.subTest("pack and unpack"):
+            unpacked_msg = MultiRecipientMessage.unpack(encrypted_msg.pack())
+            self.assertEqual(encrypted_msg, unpacked_msg)
+            for recipient in recipients:
+                self.assertEqual(
+                    msg, recipient.decrypt_multi_recipient_message(unpacked_msg)
+                )
+
+        with self.subTest("not a recipient"):
+            with self.assertRaises(ValueError) as err:
+                AlgoPrivateKey().decrypt_multi_recipient_message(encrypted_msg)
+            logger.error(err.exception)
+
+        with self.subTest("sender was spoofed"):
+            encrypted_msg.sender = AlgoPrivateKey().encryption_address
+            with self.assertRaises(nacl.exceptions.CryptoError) as err:
+                recipients[0].decrypt_multi_recipient_message(encrypted_msg)
+            logger.error(err.exception)
+
     def test_transaction_signer(self):
         sender = AlgoPrivateKey()
         recipient = AlgoPrivateKey()
@@ -145,5 +191,197 @@ class AlgoPrivateKeyTestCase(unittest.TestCase):
             sender.sign_transactions(txn_group=txn_group, indexes=list(range(2)))
 
 
+class StreamEncryptionTestCase(unittest.IsolatedAsyncioTestCase):
+    def test_encrypt_decrypt_stream(self):
+        sender = AlgoPrivateKey()
+        recipient = AlgoPrivateKey()
+
+        for size in (0, 1, 100, 1024, 1025, 10_000):
+            with self.subTest(size=size):
+                data = bytes(i % 256 for i in range(size))
+                encrypted = io.BytesIO()
+                sender.encrypt_stream(
+                    io.BytesIO(data),
+                    encrypted,
+                    recipient.encryption_address,
+                    chunk_size=1024,
+                )
+                decrypted = io.BytesIO()
+                recipient.decrypt_stream(
+                    io.BytesIO(encrypted.getvalue()),
+                    decrypted,
+                    sender.encryption_address,
+                )
+                self.assertEqual(data, decrypted.getvalue())
+
+        encrypted = io.BytesIO()
+        sender.encrypt_stream(io.BytesIO(b"data" * 1024), encrypted, chunk_size=1024)
+        encrypted_data = encrypted.getvalue()
+
+        with self.subTest("self encrypted"):
+            decrypted = io.BytesIO()
+            sender.decrypt_stream(io.BytesIO(encrypted_data), decrypted)
+            self.assertEqual(b"data" * 1024, decrypted.getvalue())
+
+        with self.subTest("truncated stream"):
+            # drop the final frame
+            with self.assertRaises(TruncatedStreamError):
+                sender.decrypt_stream(
+                    io.BytesIO(encrypted_data[: -(1024 + 4 + 17)]), io.BytesIO()
+                )
+            with self.assertRaises(TruncatedStreamError):
+                sender.decrypt_stream(io.BytesIO(encrypted_data[:-1]), io.BytesIO())
+
+        with self.subTest("tampered stream"):
+            tampered = bytearray(encrypted_data)
+            tampered[100] ^= 1
+            with self.assertRaises(nacl.exceptions.CryptoError):
+                sender.decrypt_stream(io.BytesIO(tampered), io.BytesIO())
+
+        with self.subTest("data appended after final chunk"):
+            with self.assertRaises(ValueError):
+                sender.decrypt_stream(io.BytesIO(encrypted_data + b"x"), io.BytesIO())
+
+        with self.subTest("wrong key"):
+            with self.assertRaises(nacl.exceptions.CryptoError):
+                recipient.decrypt_stream(io.BytesIO(encrypted_data), io.BytesIO())
+
+        with self.subTest("invalid chunk size"):
+            with self.assertRaises(ValueError):
+                sender.encrypt_stream(io.BytesIO(b"data"), io.BytesIO(), chunk_size=0)
+
+    async def test_encrypt_decrypt_async_stream(self):
+        sender = AlgoPrivateKey()
+        recipient = AlgoPrivateKey()
+        data = b"data" * 10_000
+
+        def stream_reader(data: bytes) -> asyncio.StreamReader:
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+            return reader
+
+        encrypted = b"".join(
+            [
+                chunk
+                async for chunk in sender.encrypt_async_stream(
+                    stream_reader(data),
+                    recipient.encryption_address,
+                    chunk_size=1024,
+                )
+            ]
+        )
+
+        decrypted = b"".join(
+            [
+                chunk
+                async for chunk in recipient.decrypt_async_stream(
+                    stream_reader(encrypted), sender.encryption_address
+                )
+            ]
+        )
+        self.assertEqual(data, decrypted)
+
+        with self.subTest("async and sync streams are compatible"):
+            decrypted_stream = io.BytesIO()
+            recipient.decrypt_stream(
+                io.BytesIO(encrypted), decrypted_stream, sender.encryption_address
+            )
+            self.assertEqual(data, decrypted_stream.getvalue())
+
+        with self.subTest("truncated stream"):
+            with self.assertRaises(TruncatedStreamError):
+                async for _ in recipient.decrypt_async_stream(
+                    stream_reader(encrypted[:-10]), sender.encryption_address
+                ):
+                    pass
+
+
+class VerifySignedMessagesTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_verify_signed_messages(self):
+        senders = [AlgoPrivateKey() for _ in range(3)]
+        items = [
+            SignedMessageItem(
+                signing_address=sender.signing_address,
+                message=f"msg-{i}".encode(),
+                signature=sender.sign(f"msg-{i}".encode()).signature,
+            )
+            for i in range(10)
+            for sender in senders
+        ]
+
+        with self.subTest("all signatures are valid"):
+            results = await verify_signed_messages(items, chunk_size=4)
+            self.assertEqual(len(items), len(results))
+            self.assertTrue(all(results))
+
+        with self.subTest("invalid signatures are reported per item"):
+            items[1].message = b"other msg"
+            items[5].signature = b"invalid signature"
+            items[7].signing_address = senders[0].signing_address
+            results = await verify_signed_messages(items, chunk_size=4)
+            self.assertEqual(
+                [i for i, result in enumerate(results) if not result], [1, 5, 7]
+            )
+
+        with self.subTest("malformed signing addresses fail verification"):
+            signing_address = senders[0].signing_address
+            # invalid checksum
+            items[2].signing_address = SigningAddress(
+                signing_address[:-1] + ("A" if signing_address[-1] != "A" else "B")
+            )
+            # invalid length
+            items[3].signing_address = SigningAddress(signing_address[:-2])
+            results = await verify_signed_messages(items, chunk_size=4)
+            self.assertEqual(
+                [i for i, result in enumerate(results) if not result], [1, 2, 3, 5, 7]
+            )
+
+        with self.subTest("empty batch"):
+            self.assertEqual([], await verify_signed_messages([]))
+
+        with self.subTest("invalid chunk size"):
+            with self.assertRaises(ValueError):
+                await verify_signed_messages(items, chunk_size=0)
+
+
+class GeneratePrivateKeysTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_generate_private_keys(self):
+        private_keys = [key async for key in generate_private_keys(10, batch_size=3)]
+        self.assertEqual(10, len(private_keys))
+        self.assertEqual(10, len({key.signing_address for key in private_keys}))
+
+        with self.subTest("keys are valid Algorand keys"):
+            key = private_keys[0]
+            self.assertEqual(key, AlgoPrivateKey(key.mnemonic))
+
+        with self.subTest("count is zero"):
+            self.assertEqual([], [key async for key in generate_private_keys(0)])
+
+        with self.subTest("stop early"):
+            async with aclosing(generate_private_keys(100, batch_size=10)) as keys:
+                async for _ in keys:
+                    break
+
+        with self.subTest("invalid args"):
+            with self.assertRaises(ValueError):
+                await anext(generate_private_keys(-1))
+            with self.assertRaises(ValueError):
+                await anext(generate_private_keys(10, batch_size=0))
+
+    async def test_search_private_keys(self):
+        private_keys = [
+            key async for key in search_private_keys("A", count=3, batch_size=100)
+        ]
+        self.assertEqual(3, len(private_keys))
+        for key in private_keys:
+            self.assertTrue(key.signing_address.startswith("A"))
+
+        with self.subTest("invalid prefix"):
+            for prefix in ("", "a", "A1", "A" * 52):
+                with self.assertRaises(ValueError):
+                    await anext(search_private_keys(prefix))
+
+
 if __name__ == "__main__":
     unittest.main()
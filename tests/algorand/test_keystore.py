@@ -0,0 +1,118 @@
+import logging
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+import nacl.exceptions
+import nacl.pwhash.argon2id
+
+from oysterpack.algorand.keys import AlgoPrivateKey
+from oysterpack.algorand.keystore import KeyStore
+from oysterpack.core.logging import configure_logging
+
+logger = logging.getLogger(__name__)
+configure_logging(logging.DEBUG)
+
+OPS_LIMIT = nacl.pwhash.argon2id.OPSLIMIT_MIN
+MEM_LIMIT = nacl.pwhash.argon2id.MEMLIMIT_MIN
+
+
+class KeyStoreTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / "keystore.db"
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def create_keystore(self, password: str = "password") -> KeyStore:
+        return KeyStore.create(
+            self.path, password, ops_limit=OPS_LIMIT, mem_limit=MEM_LIMIT
+        )
+
+    def test_create_and_open(self):
+        private_keys = [AlgoPrivateKey() for _ in range(10)]
+        with self.create_keystore() as keystore:
+            keystore.add_all(private_keys)
+            self.assertEqual(10, len(keystore))
+
+        with KeyStore.open(self.path, "password") as keystore:
+            self.assertEqual(
+                {key.signing_address for key in private_keys},
+                set(keystore.addresses()),
+            )
+
+        with self.subTest("keystore already exists"):
+            with self.assertRaises(FileExistsError):
+                self.create_keystore()
+
+        with self.subTest("keystore does not exist"):
+            with self.assertRaises(FileNotFoundError):
+                KeyStore.open(self.path.with_name("other.db"), "password")
+
+        with self.subTest("invalid password"):
+            with self.assertRaises(ValueError) as err:
+                KeyStore.open(self.path, "invalid password")
+            logger.error(err.exception)
+
+        with self.subTest("blank password"):
+            with self.assertRaises(ValueError):
+                KeyStore.create(self.path.with_name("other.db"), " ")
+
+    def test_key_management(self):
+        private_key = AlgoPrivateKey()
+        with self.create_keystore() as keystore:
+            self.assertIsNone(keystore.get(private_key.signing_address))
+            self.assertNotIn(private_key.signing_address, keystore)
+
+            address = keystore.add(private_key)
+            self.assertEqual(private_key.signing_address, address)
+            self.assertIn(address, keystore)
+            self.assertEqual(private_key, keystore.get(address))
+
+            with self.subTest("adding the same key is a no-op"):
+                keystore.add(private_key)
+                self.assertEqual(1, len(keystore))
+
+            with self.subTest("delete key"):
+                self.assertTrue(keystore.delete(address))
+                self.assertFalse(keystore.delete(address))
+                self.assertNotIn(address, keystore)
+
+    def test_load_all(self):
+        private_keys = {
+            key.signing_address: key for key in (AlgoPrivateKey() for _ in range(100))
+        }
+        with self.create_keystore() as keystore:
+            keystore.add_all(private_keys.values())
+
+        with KeyStore.open(self.path, "password") as keystore:
+            self.assertEqual(private_keys, keystore.load_all())
+
+    def test_encrypted_keys_are_bound_to_address(self):
+        key_1 = AlgoPrivateKey()
+        key_2 = AlgoPrivateKey()
+        with self.create_keystore() as keystore:
+            keystore.add_all([key_1, key_2])
+
+        # swap the encrypted keys
+        with sqlite3.connect(self.path) as connection:
+            ((encrypted_key_1,),) = connection.execute(
+                "SELECT encrypted_key FROM private_keys WHERE address = ?",
+                (key_1.signing_address,),
+            )
+            connection.execute(
+                "UPDATE private_keys SET encrypted_key = ? WHERE address = ?",
+                (encrypted_key_1, key_2.signing_address),
+            )
+        connection.close()
+
+        with KeyStore.open(self.path, "password") as keystore:
+            self.assertEqual(key_1, keystore.get(key_1.signing_address))
+            with self.assertRaises(nacl.exceptions.CryptoError):
+                keystore.get(key_2.signing_address)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
+import asyncio
 import decimal
 import json
+import threading
 import unittest
 
 from algosdk.atomic_transaction_composer import (
@@ -18,9 +20,10 @@ from beaker import localnet
 from password_validator import PasswordValidator
 from ulid import ULID
 
+from oysterpack.algorand import Address
 from oysterpack.algorand.accounts import get_auth_address
 from oysterpack.algorand.keys import AlgoPrivateKey
-from oysterpack.algorand.kmd import KmdService
+from oysterpack.algorand.kmd import KmdService, WalletSessionPool, _WalletAddressCache
 from oysterpack.algorand.transactions import (
     create_rekey_txn,
     send_transaction,
@@ -341,6 +344,42 @@ class WalletSessionServiceTestCase(unittest.IsolatedAsyncioTestCase):
         with self.subTest("deleting an unregistered account is a noop"):
             await wallet_session.delete_account(address)
 
+        with self.subTest("generate accounts concurrently"):
+            addresses = [
+                address
+                async for address in wallet_session.generate_accounts(
+                    10, max_concurrency=4
+                )
+            ]
+            self.assertEqual(10, len(set(addresses)))
+            self.assertEqual(set(addresses), set(await wallet_session.list_accounts()))
+
+    async def test_wallet_address_cache(self):
+        wallet_session = await self.kmd_service.connect(
+            self.name, self.password, localnet.get_algod_client()
+        )
+        other_wallet_session = await self.kmd_service.connect(
+            self.name, self.password, localnet.get_algod_client()
+        )
+        address = await wallet_session.generate_account()
+        self.assertTrue(await wallet_session.contains_account(address))
+
+        with self.subTest("changes made outside the session are not visible"):
+            other_address = await other_wallet_session.generate_account()
+            self.assertFalse(await wallet_session.contains_account(other_address))
+
+        with self.subTest("changes are visible after the cache is invalidated"):
+            wallet_session.invalidate_cache()
+            self.assertTrue(await wallet_session.contains_account(other_address))
+
+        with self.subTest("cache expires"):
+            wallet_session = await self.kmd_service.connect(
+                self.name, self.password, localnet.get_algod_client(), cache_ttl=0
+            )
+            self.assertTrue(await wallet_session.contains_account(other_address))
+            await other_wallet_session.delete_account(other_address)
+            self.assertFalse(await wallet_session.contains_account(other_address))
+
     async def test_export_private_key(self):
         wallet_session = await self.kmd_service.connect(
             self.name, self.password, localnet.get_algod_client()
@@ -363,6 +402,23 @@ class WalletSessionServiceTestCase(unittest.IsolatedAsyncioTestCase):
         signed_txn_2 = payment_txn.sign(private_key_mnemonic.to_private_key())
         self.assertEqual(signed_txn_1.signature, signed_txn_2.signature)
 
+        with self.subTest("export private keys concurrently"):
+            accounts = [await wallet_session.generate_account() for _ in range(5)]
+            exported = {
+                address: private_key_mnemonic
+                async for address, private_key_mnemonic in wallet_session.export_private_keys(
+                    accounts, max_concurrency=3
+                )
+            }
+            self.assertEqual(set(accounts), set(exported))
+            for address, private_key_mnemonic in exported.items():
+                self.assertEqual(
+                    address,
+                    AlgoPrivateKey(
+                        private_key_mnemonic.to_private_key()
+                    ).signing_address,
+                )
+
     async def test_sign_transaction(self):
         wallet_session = await self.kmd_service.connect(
             self.name, self.password, localnet.get_algod_client()
@@ -433,6 +489,49 @@ class WalletSessionServiceTestCase(unittest.IsolatedAsyncioTestCase):
         )
         await schedule_blocking_io_task(atc.execute, localnet.get_algod_client(), 2)
 
+    async def test_sign_transaction_group(self):
+        wallet_session = await self.kmd_service.connect(
+            self.name, self.password, localnet.get_algod_client()
+        )
+        senders = [await wallet_session.generate_account() for _ in range(3)]
+        for sender in senders:
+            await fund_account(sender)
+        await wallet_session.rekey(senders[0], senders[1])
+
+        receiver = await wallet_session.generate_account()
+        sp = await schedule_blocking_io_task(
+            localnet.get_algod_client().suggested_params
+        )
+        txns = [
+            PaymentTxn(
+                sender=sender,
+                receiver=receiver,
+                amt=algos_to_microalgos(decimal.Decimal("0.1")),  # type: ignore
+                sp=sp,
+            )
+            for sender in senders
+        ]
+
+        with self.subTest("signed transactions are returned in indexes order"):
+            signed_txns = await wallet_session.sign_transaction_group(
+                txns, [2, 0], max_concurrency=2
+            )
+            self.assertEqual(
+                [senders[2], senders[0]],
+                [signed_txn.transaction.sender for signed_txn in signed_txns],
+            )
+            # rekeyed account is signed by the authorized account
+            self.assertEqual(senders[1], signed_txns[1].authorizing_address)
+
+        with self.subTest("sync signer can be called from a running event loop"):
+            atc = AtomicTransactionComposer()
+            for txn in txns:
+                atc.add_transaction(TransactionWithSigner(txn, wallet_session))
+            signed_txns = atc.gather_signatures()
+            await schedule_blocking_io_task(
+                localnet.get_algod_client().send_transactions, signed_txns
+            )
+
     async def test_rekeying(self):
         wallet_session = await self.kmd_service.connect(
             self.name, self.password, localnet.get_algod_client()
@@ -678,5 +777,102 @@ class WalletSessionServiceTestCase(unittest.IsolatedAsyncioTestCase):
             await send_transaction(localnet.get_algod_client(), multisig_txn)
 
 
+class WalletSessionPoolTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.kmd_service = KmdService(
+            url=localnet.kmd.DEFAULT_KMD_ADDRESS,
+            token=localnet.kmd.DEFAULT_KMD_TOKEN,
+        )
+        self.name = str(ULID())
+        self.password = str(ULID())
+        await self.kmd_service.create_wallet(name=self.name, password=self.password)
+
+    async def test_session_checkout(self):
+        async with WalletSessionPool(
+            self.kmd_service,
+            localnet.get_algod_client(),
+            sessions_per_wallet=2,
+            renew_interval=0.1,
+        ) as pool:
+            await pool.register(self.name, self.password)
+            self.assertEqual([self.name], pool.wallet_names)
+
+            async def generate_account() -> str:
+                async with pool.session(self.name) as wallet_session:
+                    return await wallet_session.generate_account()
+
+            accounts = await asyncio.gather(*(generate_account() for _ in range(4)))
+            self.assertEqual(4, pool.stats(self.name).checkouts)
+
+            # wallet handles are renewed in the background
+            await asyncio.sleep(0.3)
+            async with pool.session(self.name) as wallet_session:
+                self.assertEqual(
+                    set(accounts), set(await wallet_session.list_accounts())
+                )
+
+            with self.assertRaises(ValueError):
+                async with pool.session("unregistered"):
+                    pass
+
+        with self.subTest("wallet sessions are released when the pool is closed"):
+            self.assertEqual(0, len(pool.wallet_names))
+            self.assertIsNone(wallet_session._wallet.handle)
+            with self.assertRaises(ValueError):
+                async with pool.session(self.name):
+                    pass
+
+
+class WalletAddressCacheTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.addresses = [AlgoPrivateKey().signing_address for _ in range(3)]
+        self.loads = 0
+        self.loading = threading.Event()
+        self.release = threading.Event()
+        self.cache = _WalletAddressCache(self.list_addresses, ttl=None)
+
+    def list_addresses(self) -> list[str]:
+        self.loads += 1
+        addresses = list(self.addresses)
+        self.loading.set()
+        self.release.wait(5)
+        return addresses
+
+    async def wait_for_load(self):
+        await schedule_blocking_io_task(self.loading.wait, 5)
+        self.loading.clear()
+
+    async def test_concurrent_misses_share_load(self):
+        self.release.set()
+        results = await asyncio.gather(*[self.cache.get() for _ in range(10)])
+        self.assertEqual(1, self.loads)
+        for result in results:
+            self.assertEqual(set(self.addresses), result)
+
+    async def test_changes_made_while_loading(self):
+        load = asyncio.create_task(self.cache.get())
+        await self.wait_for_load()
+        added = Address(AlgoPrivateKey().signing_address)
+        self.cache.add(added)
+        self.cache.discard(Address(self.addresses[0]))
+        self.release.set()
+        self.assertEqual({added, *self.addresses[1:]}, await load)
+        self.assertEqual({added, *self.addresses[1:]}, await self.cache.get())
+        self.assertEqual(1, self.loads)
+
+    async def test_invalidated_while_loading(self):
+        load = asyncio.create_task(self.cache.get())
+        await self.wait_for_load()
+        self.cache.invalidate()
+        self.addresses.append(AlgoPrivateKey().signing_address)
+        reload = asyncio.create_task(self.cache.get())
+        self.release.set()
+        self.assertEqual(set(self.addresses[:-1]), await load)
+        # the stale load is not cached
+        self.assertEqual(set(self.addresses), await reload)
+        self.assertEqual(set(self.addresses), await self.cache.get())
+        self.assertEqual(2, self.loads)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -3,7 +3,7 @@ import logging
 import re
 import unittest
 
-from algosdk import constants, mnemonic
+from algosdk import constants, error, mnemonic
 from algosdk.account import generate_account
 from beaker.localnet.kmd import get_localnet_default_wallet
 
@@ -41,6 +41,40 @@ class ModelTestCase(unittest.TestCase):
                 mnemonic1.to_kmd_master_derivation_key(),
             )
 
+    def test_mnemonic_bulk_conversions(self) -> None:
+        private_keys = [
+            base64.b64decode(generate_account()[0])[: constants.key_len_bytes]
+            for _ in range(100)
+        ]
+
+        mnemonics = Mnemonic.from_private_keys(private_keys)
+        for private_key, mnemonic1 in zip(private_keys, mnemonics, strict=True):
+            self.assertEqual(
+                mnemonic.from_private_key(base64.b64encode(private_key).decode()),
+                str(mnemonic1),
+            )
+            self.assertEqual(private_key, mnemonic1.to_private_key_bytes())
+
+        self.assertEqual(private_keys, Mnemonic.to_private_keys_bytes(mnemonics))
+
+        with self.subTest("4 letter word prefixes are supported"):
+            mnemonic1 = Mnemonic(
+                tuple(word[:4] for word in mnemonics[0].word_list)  # type: ignore
+            )
+            self.assertEqual(private_keys[0], mnemonic1.to_private_key_bytes())
+
+        with self.subTest("invalid word"):
+            with self.assertRaises(ValueError) as err:
+                Mnemonic(("invalid",) * 25).to_private_key_bytes()  # type: ignore
+            logger.error(err.exception)
+
+        with self.subTest("invalid checksum"):
+            word_list = list(mnemonics[0].word_list)
+            word_list[0], word_list[1] = word_list[1], word_list[0]
+            if word_list != list(mnemonics[0].word_list):
+                with self.assertRaises(error.WrongChecksumError):
+                    Mnemonic.from_word_list(" ".join(word_list)).to_private_key()
+
 
 if __name__ == "__main__":
     unittest.main()
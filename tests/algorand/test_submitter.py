@@ -0,0 +1,185 @@
+import asyncio
+import unittest
+from typing import Any
+
+from algosdk.error import AlgodHTTPError
+from algosdk.transaction import (
+    GenericSignedTransaction,
+    PaymentTxn,
+    SuggestedParams,
+    assign_group_id,
+)
+
+from oysterpack.algorand.algod import AsyncAlgodClient
+from oysterpack.algorand.keys import AlgoPrivateKey
+from oysterpack.algorand.submitter import TransactionSubmitter
+from tests.test_support import StubAlgodClient
+
+SUGGESTED_PARAMS = SuggestedParams(
+    fee=1000,
+    first=1,
+    last=1000,
+    gh="SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=",
+    flat_fee=True,
+)
+
+
+class StubSubmissionAlgodClient(StubAlgodClient):
+    """
+    Confirms submitted transactions in the next round.
+    Rejects the first `overloads` submissions because the transaction pool is full.
+    The first `timeouts` submissions are accepted, but then time out.
+    """
+
+    def __init__(self, overloads: int = 0, timeouts: int = 0):
+        super().__init__(round_time=0.02)
+        self.overloads = overloads
+        self.timeouts = timeouts
+        self.submissions: list[int] = []
+
+    def send_transactions(
+        self, txns: list[GenericSignedTransaction], **kwargs: Any
+    ) -> str:
+        if self.overloads > 0:
+            self.overloads -= 1
+            raise AlgodHTTPError("TransactionPool.Remember: transaction pool is full")
+        if any(txn.transaction.note == b"invalid" for txn in txns):
+            raise AlgodHTTPError("invalid transaction", 400)
+        if txns[0].get_txid() in self.confirmations:
+            raise AlgodHTTPError(
+                f"transaction already in ledger: {txns[0].get_txid()}", 400
+            )
+        self.submissions.append(len(txns))
+        for txn in txns:
+            self.confirm(txn.get_txid())
+        if self.timeouts > 0:
+            self.timeouts -= 1
+            raise TimeoutError("timed out")
+        return txns[0].get_txid()
+
+
+class TransactionSubmitterTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.account = AlgoPrivateKey()
+
+    def create_txn(self, i: int, note: bytes | None = None) -> PaymentTxn:
+        return PaymentTxn(
+            self.account.signing_address,
+            SUGGESTED_PARAMS,
+            self.account.signing_address,
+            i,
+            note=note,
+        )
+
+    async def test_submit(self):
+        algod_client = StubSubmissionAlgodClient()
+        async with TransactionSubmitter(
+            AsyncAlgodClient(algod_client), rate=1000, max_queue_size=10
+        ) as submitter:
+            submissions = [
+                await submitter.submit(
+                    self.account.sign_transaction(self.create_txn(i))
+                )
+                for i in range(100)
+            ]
+            group = assign_group_id([self.create_txn(i) for i in range(3)])
+            group_submission = await submitter.submit(
+                [self.account.sign_transaction(txn) for txn in group]
+            )
+
+            await asyncio.gather(
+                *[submission.confirmed for submission in submissions],
+                group_submission.confirmed,
+            )
+
+        metrics = submitter.metrics()
+        self.assertEqual(103, metrics.submitted)
+        self.assertEqual(103, metrics.confirmed)
+        self.assertEqual(0, metrics.failed)
+        self.assertEqual(0, metrics.queued)
+        # the group is submitted in a single submission
+        self.assertEqual(101, len(algod_client.submissions))
+        self.assertIn(3, algod_client.submissions)
+
+    async def test_overloaded_submissions_are_retried(self):
+        algod_client = StubSubmissionAlgodClient(overloads=2)
+        async with TransactionSubmitter(
+            AsyncAlgodClient(algod_client), rate=100, workers=1
+        ) as submitter:
+            submission = await submitter.submit(
+                self.account.sign_transaction(self.create_txn(1))
+            )
+            await submission.sent
+
+        metrics = submitter.metrics()
+        self.assertEqual(2, metrics.overloads)
+        self.assertEqual(3, submission.attempts)
+        self.assertLess(metrics.rate, 100)
+
+    async def test_timed_out_submission_is_not_resubmitted(self):
+        algod_client = StubSubmissionAlgodClient(timeouts=1)
+        async with TransactionSubmitter(
+            AsyncAlgodClient(algod_client), workers=1
+        ) as submitter:
+            submission = await submitter.submit(
+                self.account.sign_transaction(self.create_txn(1))
+            )
+            await submission.confirmed
+
+        metrics = submitter.metrics()
+        # the retry is rejected, because the transaction is already in the ledger
+        self.assertEqual(2, submission.attempts)
+        self.assertEqual([1], algod_client.submissions)
+        self.assertEqual(1, metrics.submitted)
+        self.assertEqual(0, metrics.failed)
+
+        with self.subTest("duplicate submissions are rejected"):
+            async with TransactionSubmitter(
+                AsyncAlgodClient(algod_client), workers=1
+            ) as submitter:
+                submission = await submitter.submit(submission.txns)
+                with self.assertRaises(AlgodHTTPError):
+                    await submission.sent
+            self.assertEqual(1, submitter.metrics().failed)
+
+    async def test_invalid_submissions(self):
+        algod_client = StubSubmissionAlgodClient()
+        async with TransactionSubmitter(AsyncAlgodClient(algod_client)) as submitter:
+            submission = await submitter.submit(
+                self.account.sign_transaction(self.create_txn(1, note=b"invalid"))
+            )
+            with self.assertRaises(AlgodHTTPError):
+                await submission.sent
+            with self.assertRaises(AlgodHTTPError):
+                await submission.confirmed
+
+            group = assign_group_id(
+                [self.create_txn(i, note=b"invalid") for i in range(3)]
+            )
+            group_submission = await submitter.submit(
+                [self.account.sign_transaction(txn) for txn in group]
+            )
+            with self.assertRaises(AlgodHTTPError):
+                await group_submission.sent
+
+            with self.subTest("transactions must belong to the same group"):
+                with self.assertRaises(ValueError):
+                    await submitter.submit(
+                        [
+                            self.account.sign_transaction(self.create_txn(i))
+                            for i in range(2)
+                        ]
+                    )
+
+        # failed transactions are counted
+        self.assertEqual(4, submitter.metrics().failed)
+
+        with self.subTest("submitter is not started"):
+            with self.assertRaises(AssertionError):
+                await submitter.submit(
+                    self.account.sign_transaction(self.create_txn(1))
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
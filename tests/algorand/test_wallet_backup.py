@@ -0,0 +1,159 @@
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+
+import nacl.pwhash.argon2id
+from algosdk.transaction import Multisig
+from algosdk.v2client.algod import AlgodClient
+
+from oysterpack.algorand.emulator.kmd import KmdEmulator
+from oysterpack.algorand.keys import AlgoPrivateKey
+from oysterpack.algorand.kmd import KmdService
+from oysterpack.algorand.secretstream import TruncatedStreamError
+from oysterpack.algorand.wallet_backup import (
+    WalletBackupSummary,
+    backup_wallet,
+    restore_wallet,
+)
+
+# fast password hashing for tests
+OPS_LIMIT = nacl.pwhash.argon2id.OPSLIMIT_MIN
+MEM_LIMIT = nacl.pwhash.argon2id.MEMLIMIT_MIN
+
+
+class WalletBackupTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.emulator = KmdEmulator()
+        self.emulator.start()
+        self.kmd_service = KmdService(url=self.emulator.url, token=self.emulator.token)
+        self.algod_client = AlgodClient("", "http://localhost:1")
+        await self.kmd_service.create_wallet("wallet", "password")
+        self.wallet_session = await self.kmd_service.connect(
+            "wallet", "password", self.algod_client
+        )
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "wallet.backup"
+
+    async def asyncTearDown(self) -> None:
+        await self.wallet_session.release()
+        self.emulator.close()
+        self.temp_dir.cleanup()
+
+    async def backup(self, **kwargs: Any) -> WalletBackupSummary:
+        return await backup_wallet(
+            self.wallet_session,
+            self.path,
+            "backup password",
+            ops_limit=OPS_LIMIT,
+            mem_limit=MEM_LIMIT,
+            **kwargs,
+        )
+
+    async def test_backup_and_restore(self):
+        accounts = [
+            address async for address in self.wallet_session.generate_accounts(20)
+        ]
+        imported_account = await self.wallet_session.import_private_key(
+            AlgoPrivateKey()
+        )
+        multisig = Multisig(1, 2, accounts[:3])
+        await self.wallet_session.import_multisig(multisig)
+        # leaves a gap in the derived keys
+        deleted_account = accounts.pop(5)
+        await self.wallet_session.delete_account(deleted_account)
+
+        backup_progress: list[tuple[int, int]] = []
+        summary = await self.backup(
+            batch_size=7,
+            progress=lambda completed, total: backup_progress.append(
+                (completed, total)
+            ),
+        )
+        self.assertEqual(20, summary.keys)
+        self.assertEqual(1, summary.multisigs)
+        self.assertEqual((21, 21), backup_progress[-1])
+        self.assertEqual(4, len(backup_progress))
+
+        restore_progress: list[tuple[int, int]] = []
+        wallet_session, summary = await restore_wallet(
+            self.kmd_service,
+            self.path,
+            "backup password",
+            "restored",
+            "password",
+            self.algod_client,
+            max_concurrency=4,
+            progress=lambda completed, total: restore_progress.append(
+                (completed, total)
+            ),
+        )
+        try:
+            self.assertEqual(20, summary.keys)
+            self.assertEqual(1, summary.multisigs)
+            self.assertEqual((21, 21), restore_progress[-1])
+            self.assertEqual(
+                sorted([*accounts, imported_account]),
+                sorted(await wallet_session.list_accounts()),
+            )
+            self.assertEqual(
+                [multisig.address()], list(await wallet_session.list_multisigs())
+            )
+            self.assertEqual(
+                await self.wallet_session.export_master_derivation_key(),
+                await wallet_session.export_master_derivation_key(),
+            )
+
+            with self.subTest("generated keys do not collide with restored keys"):
+                address = await wallet_session.generate_account()
+                self.assertEqual(await self.wallet_session.generate_account(), address)
+                self.assertNotIn(address, [*accounts, deleted_account])
+        finally:
+            await wallet_session.release()
+
+    async def test_invalid_backups(self):
+        await self.wallet_session.generate_account()
+        await self.backup()
+
+        with self.subTest("backup file already exists"):
+            with self.assertRaises(FileExistsError):
+                await self.backup()
+
+        with self.subTest("failed backup does not leave a partial archive"):
+            self.path.unlink()
+
+            def fail(completed: int, total: int):
+                raise RuntimeError("backup failed")
+
+            with self.assertRaises(RuntimeError):
+                await self.backup(progress=fail)
+            self.assertFalse(self.path.exists())
+            await self.backup()
+
+        with self.subTest("invalid password"):
+            with self.assertRaises(ValueError):
+                await restore_wallet(
+                    self.kmd_service,
+                    self.path,
+                    "invalid password",
+                    "restored",
+                    "password",
+                    self.algod_client,
+                )
+
+        with self.subTest("truncated backup"):
+            truncated_path = Path(self.temp_dir.name) / "truncated.backup"
+            truncated_path.write_bytes(self.path.read_bytes()[:-10])
+            with self.assertRaises(TruncatedStreamError):
+                await restore_wallet(
+                    self.kmd_service,
+                    truncated_path,
+                    "backup password",
+                    "truncated",
+                    "password",
+                    self.algod_client,
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+import asyncio
+import unittest
+from contextlib import aclosing
+from typing import Any
+
+import msgpack  # type: ignore
+from algosdk.encoding import decode_address
+
+from oysterpack.algorand.algod import AsyncAlgodClient
+from oysterpack.algorand.blocks import Block
+from oysterpack.algorand.keys import AlgoPrivateKey
+from oysterpack.algorand.watched_accounts import WatchedAccounts
+from tests.test_support import StubAlgodClient
+
+
+class StubLedgerAlgodClient(StubAlgodClient):
+    """
+    Serves account summaries loaded at round 10, and blocks that are registered by the test
+    """
+
+    def __init__(self):
+        super().__init__(round_time=0.01)
+        self.balances: dict[str, int] = {}
+        self.blocks: dict[int, list[dict]] = {}
+        self.account_requests = 0
+
+    def algod_request(
+        self, method: str, requrl: str, *args: Any, **kwargs: Any
+    ) -> bytes:
+        self.account_requests += 1
+        address = requrl.split("/")[-1]
+        return msgpack.packb({"round": 10, "amount": self.balances.get(address, 0)})
+
+    def block_info(
+        self, block: int | None = None, response_format: str = "json", **kwargs: Any
+    ) -> bytes:
+        return msgpack.packb(
+            {"block": {"rnd": block, "ts": 0, "txns": self.blocks.get(block, [])}}
+        )
+
+
+def pay(
+    sender: str, receiver: str, amount: int, fee: int = 1000, **kwargs: Any
+) -> dict:
+    return {
+        "txn": {
+            "type": "pay",
+            "snd": decode_address(sender),
+            "rcv": decode_address(receiver),
+            "amt": amount,
+            "fee": fee,
+            **kwargs,
+        }
+    }
+
+
+class WatchedAccountsTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.algod_client = StubLedgerAlgodClient()
+        self.accounts = [AlgoPrivateKey().signing_address for _ in range(3)]
+        self.unwatched_account = AlgoPrivateKey().signing_address
+        for account in self.accounts:
+            self.algod_client.balances[account] = 1_000_000
+        self.watched_accounts = WatchedAccounts(AsyncAlgodClient(self.algod_client))
+        await self.watched_accounts.watch(self.accounts)
+
+    async def test_watch(self):
+        self.assertEqual(3, len(self.watched_accounts))
+        self.assertEqual(sorted(self.accounts), sorted(self.watched_accounts.addresses))
+        for account in self.accounts:
+            self.assertEqual(1_000_000, self.watched_accounts.get_algo_balance(account))
+            self.assertEqual(account, self.watched_accounts.get_auth_address(account))
+
+        with self.subTest("already watched accounts are not reloaded"):
+            await self.watched_accounts.watch(self.accounts)
+            self.assertEqual(3, self.algod_client.account_requests)
+
+        with self.subTest("unwatched account"):
+            with self.assertRaises(ValueError):
+                self.watched_accounts.get_algo_balance(self.unwatched_account)
+
+        with self.subTest("unwatch"):
+            self.watched_accounts.unwatch(self.accounts[0])
+            self.assertNotIn(self.accounts[0], self.watched_accounts)
+            self.assertEqual(2, len(self.watched_accounts))
+            self.assertEqual(
+                sorted(self.accounts[1:]), sorted(self.watched_accounts.addresses)
+            )
+            for account in self.accounts[1:]:
+                self.assertEqual(
+                    1_000_000, self.watched_accounts.get_algo_balance(account)
+                )
+
+    async def test_apply_block(self):
+        account_1, account_2, account_3 = self.accounts
+        self.watched_accounts.apply_block(
+            Block(
+                round=11,
+                timestamp=0,
+                header={},
+                txns=[
+                    pay(account_1, account_2, 100),
+                    pay(self.unwatched_account, account_1, 50),
+                    pay(account_3, account_3, 0, rekey=decode_address(account_1)),
+                    {
+                        "txn": {
+                            "type": "appl",
+                            "snd": decode_address(account_2),
+                            "fee": 2000,
+                        },
+                        "dt": {
+                            "itx": [pay(self.unwatched_account, account_2, 500, fee=0)]
+                        },
+                    },
+                ],
+            )
+        )
+        self.assertEqual(11, self.watched_accounts.round)
+        self.assertEqual(
+            1_000_000 - 100 - 1000 + 50,
+            self.watched_accounts.get_algo_balance(account_1),
+        )
+        self.assertEqual(
+            1_000_000 + 100 - 2000 + 500,
+            self.watched_accounts.get_algo_balance(account_2),
+        )
+        self.assertEqual(account_1, self.watched_accounts.get_auth_address(account_3))
+        self.assertEqual(
+            account_1,
+            self.watched_accounts._algod_client.auth_address_cache.get(account_3),
+        )
+
+        with self.subTest("close out"):
+            self.watched_accounts.apply_block(
+                Block(
+                    round=12,
+                    timestamp=0,
+                    header={},
+                    txns=[
+                        {
+                            **pay(
+                                account_3,
+                                account_2,
+                                1000,
+                                close=decode_address(account_2),
+                            ),
+                            "ca": 997_000,
+                        }
+                    ],
+                )
+            )
+            self.assertEqual(0, self.watched_accounts.get_algo_balance(account_3))
+            self.assertEqual(
+                account_3, self.watched_accounts.get_auth_address(account_3)
+            )
+            self.assertEqual(
+                1_000_000 + 100 - 2000 + 500 + 1000 + 997_000,
+                self.watched_accounts.get_algo_balance(account_2),
+            )
+
+        with self.subTest("blocks at or before the load round are skipped"):
+            self.watched_accounts.apply_block(
+                Block(
+                    round=10,
+                    timestamp=0,
+                    header={},
+                    txns=[pay(self.unwatched_account, account_1, 1)],
+                )
+            )
+            self.assertEqual(
+                1_000_000 - 100 - 1000 + 50,
+                self.watched_accounts.get_algo_balance(account_1),
+            )
+
+    async def test_follow(self):
+        account_1, account_2, _ = self.accounts
+        self.algod_client.blocks[11] = [pay(account_1, account_2, 100)]
+        self.algod_client.blocks[12] = [pay(account_2, account_1, 10)]
+        async with aclosing(self.watched_accounts.follow()) as blocks:
+            async for block in blocks:
+                if block.round == 12:
+                    break
+        self.assertEqual(
+            1_000_000 - 100 - 1000 + 10,
+            self.watched_accounts.get_algo_balance(account_1),
+        )
+        self.assertEqual(
+            1_000_000 + 100 - 10 - 1000,
+            self.watched_accounts.get_algo_balance(account_2),
+        )
+
+    async def test_follow_nothing_watched(self):
+        algod_client = StubLedgerAlgodClient()
+        while algod_client.round < 20:
+            await asyncio.sleep(0.01)
+        current_round = algod_client.round
+        watched_accounts = WatchedAccounts(AsyncAlgodClient(algod_client))
+        async with aclosing(watched_accounts.follow()) as blocks:
+            block = await anext(blocks)
+        # the chain is followed from the current round, i.e., not from genesis
+        self.assertGreaterEqual(block.round, current_round)
+        self.assertEqual(block.round, watched_accounts.round)
+
+
+if __name__ == "__main__":
+    unittest.main()
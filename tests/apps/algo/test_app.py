@@ -5,6 +5,7 @@ from tempfile import NamedTemporaryFile
 from beaker import localnet
 from ulid import ULID
 
+from oysterpack.algorand.algod_pool import AlgodClientPool
 from oysterpack.apps.algo.app import App, AppConfig
 
 localnet_config = f"""
@@ -46,6 +47,28 @@ class AppConfigTestCase(unittest.TestCase):
                     app_config.kmd_config.token,
                 )
 
+        with self.subTest("multiple algod urls"):
+            with NamedTemporaryFile() as config_file:
+                config_file.write(
+                    b"""
+                [algod]
+                token="aaa"
+                url=["http://localhost:4001", "http://localhost:4011"]
+
+                [kmd]
+                token="bbb"
+                url="http://localhost:4002"
+                """
+                )
+                config_file.flush()
+                app_config = AppConfig.from_config_file(Path(config_file.name))
+                self.assertEqual(
+                    ["http://localhost:4001", "http://localhost:4011"],
+                    app_config.algod_config.url,
+                )
+                algod_client = app_config.algod_config.create_client()
+                self.assertIsInstance(algod_client.algod_client, AlgodClientPool)
+
         with self.subTest("empty config file"):
             with NamedTemporaryFile() as config_file:
                 with self.assertRaises(KeyError) as err:
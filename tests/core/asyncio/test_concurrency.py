@@ -0,0 +1,102 @@
+import asyncio
+import time
+import unittest
+from contextlib import aclosing
+
+from oysterpack.core.asyncio.concurrency import AdaptiveRateLimiter, map_concurrently
+
+
+class MapConcurrentlyTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_map_concurrently(self):
+        running = 0
+        max_running = 0
+
+        async def square(x: int) -> int:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return x * x
+
+        results = dict(
+            [result async for result in map_concurrently(square, range(20), 5)]
+        )
+        self.assertEqual({x: x * x for x in range(20)}, results)
+        self.assertEqual(5, max_running)
+
+        with self.subTest("no items"):
+            self.assertEqual(
+                [], [result async for result in map_concurrently(square, [], 5)]
+            )
+
+        with self.subTest("invalid max_concurrency"):
+            with self.assertRaises(ValueError):
+                await anext(map_concurrently(square, range(20), 0))
+
+    async def test_failure_cancels_in_flight_calls(self):
+        cancelled = 0
+
+        async def func(x: int) -> int:
+            nonlocal cancelled
+            if x == 0:
+                raise ValueError("BOOM")
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled += 1
+                raise
+            return x
+
+        with self.assertRaises(ValueError):
+            async for _ in map_concurrently(func, range(10), 3):
+                pass
+        await asyncio.sleep(0)
+        self.assertEqual(2, cancelled)
+
+    async def test_close_cancels_in_flight_calls(self):
+        async def func(x: int) -> int:
+            await asyncio.sleep(x / 100)
+            return x
+
+        async with aclosing(map_concurrently(func, range(10), 3)) as results:
+            async for item, _ in results:
+                self.assertEqual(0, item)
+                break
+
+
+class AdaptiveRateLimiterTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_acquire(self):
+        rate_limiter = AdaptiveRateLimiter(100, burst=10)
+        start = time.monotonic()
+        for _ in range(30):
+            await rate_limiter.acquire()
+        # the first 10 tokens are available immediately, and the next 20 are refilled at 100 per second
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+
+        with self.subTest("requests larger than the burst size"):
+            await rate_limiter.acquire(20)
+
+    async def test_aimd(self):
+        rate_limiter = AdaptiveRateLimiter(100, min_rate=10, max_rate=110, increase=100)
+        rate_limiter.on_success()
+        self.assertEqual(101, rate_limiter.rate)
+        for _ in range(100):
+            rate_limiter.on_success()
+        self.assertEqual(110, rate_limiter.rate)
+
+        rate_limiter.on_overload()
+        self.assertEqual(55, rate_limiter.rate)
+        for _ in range(10):
+            rate_limiter.on_overload()
+        self.assertEqual(10, rate_limiter.rate)
+
+        with self.subTest("invalid rates"):
+            with self.assertRaises(ValueError):
+                AdaptiveRateLimiter(0)
+            with self.assertRaises(ValueError):
+                AdaptiveRateLimiter(10, max_rate=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
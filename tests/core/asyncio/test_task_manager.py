@@ -131,6 +131,39 @@ class TaskManagerTestCase(unittest.IsolatedAsyncioTestCase):
         rand_num = await task_manager.schedule_cpu_bound_task(random.randint, 1, 1000)
         self.assertTrue(1 <= rand_num <= 1000)
 
+    async def test_run_coroutine(self) -> None:
+        async def get_loop() -> asyncio.AbstractEventLoop:
+            await asyncio.sleep(0)
+            return asyncio.get_running_loop()
+
+        with self.subTest("called from a running event loop"):
+            loop = task_manager.run_coroutine(get_loop())
+            self.assertIsNot(asyncio.get_running_loop(), loop)
+
+        with self.subTest("called from another thread"):
+            self.assertIs(
+                loop,
+                await task_manager.schedule_blocking_io_task(
+                    task_manager.run_coroutine, get_loop()
+                ),
+            )
+
+        with self.subTest("exceptions are propagated"):
+
+            async def fail():
+                raise ValueError("BOOM!")
+
+            with self.assertRaises(ValueError):
+                task_manager.run_coroutine(fail())
+
+        with self.subTest("called from the background event loop"):
+
+            async def nested():
+                task_manager.run_coroutine(get_loop())
+
+            with self.assertRaises(RuntimeError):
+                task_manager.run_coroutine(nested())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,7 +1,15 @@
+import json
+import threading
+import time
+from collections import Counter
 from dataclasses import dataclass
+from typing import Any
 
+import msgpack  # type: ignore
+from algosdk.error import AlgodHTTPError
 from algosdk.transaction import PaymentTxn
 from algosdk.util import algos_to_microalgos
+from algosdk.v2client.algod import AlgodClient, AlgodResponseType, ParamsType
 from algosdk.wallet import Wallet
 from beaker import localnet
 from beaker.localnet import LocalAccount
@@ -78,3 +86,155 @@ async def fund_account(account: Address, amt: MicroAlgos | None = None):
         txn,
     )
     await send_transaction(algod_client, signed_txn)
+
+
+class StubAlgodClient(AlgodClient):
+    """
+    Simulates an algod node that produces a new round every `round_time` seconds.
+
+    Transactions are confirmed in the round that they are scheduled for.
+    """
+
+    def __init__(self, round_time: float = 0.05, *, block_txids_supported: bool = True):
+        super().__init__("", "http://localhost:1")
+        self.round_time = round_time
+        self.block_txids_supported = block_txids_supported
+        self.started_at = time.monotonic()
+        # txid -> round
+        self.confirmations: dict[str, int] = {}
+        self.rejected: set[str] = set()
+        self.request_counts: Counter[str] = Counter()
+        # request -> (HTTP status code, number of requests that will fail)
+        self.failures: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def fail(self, request: str, code: int, count: int = 1):
+        """
+        The next `count` requests fail with the specified HTTP status code.
+        """
+        self.failures[request] = (code, count)
+
+    def _count(self, request: str):
+        with self._lock:
+            self.request_counts[request] += 1
+            if (failure := self.failures.get(request)) is not None:
+                code, count = failure
+                if count > 1:
+                    self.failures[request] = (code, count - 1)
+                else:
+                    del self.failures[request]
+                raise AlgodHTTPError("stub failure", code)
+
+    @property
+    def round(self) -> int:
+        return 1 + int((time.monotonic() - self.started_at) / self.round_time)
+
+    def confirm(self, txid: str, rounds: int = 1):
+        self.confirmations[txid] = self.round + rounds
+
+    def status(self, **kwargs: Any) -> dict[str, Any]:
+        self._count("status")
+        return {"last-round": self.round}
+
+    def status_after_block(
+        self, block_num: int | None = None, round_num: int | None = None, **kwargs: Any
+    ) -> dict[str, Any]:
+        self._count("status_after_block")
+        while self.round <= (block_num or 0):
+            time.sleep(self.round_time / 10)
+        return {"last-round": self.round}
+
+    def pending_transaction_info(
+        self, transaction_id: str, **kwargs: Any
+    ) -> dict[str, Any]:
+        self._count("pending_transaction_info")
+        if transaction_id in self.rejected:
+            return {"pool-error": "overspend", "confirmed-round": 0}
+        confirmed_round = self.confirmations.get(transaction_id)
+        if confirmed_round is None or confirmed_round > self.round:
+            return {"pool-error": "", "confirmed-round": 0}
+        return {"pool-error": "", "confirmed-round": confirmed_round}
+
+    def algod_request(
+        self, method: str, requrl: str, *args: Any, **kwargs: Any
+    ) -> AlgodResponseType:
+        self._count("block_txids")
+        if not self.block_txids_supported:
+            raise AlgodHTTPError("not found", 404)
+        round_num = int(requrl.split("/")[2])
+        return {
+            "blockTxids": [
+                txid
+                for txid, confirmed_round in self.confirmations.items()
+                if confirmed_round == round_num
+            ]
+        }
+
+
+class StubAlgodNode(AlgodClient):
+    """
+    Simulates an algod node with configurable latency, failures, and status
+    """
+
+    def __init__(self, url: str, latency: float = 0.0):
+        super().__init__("", url)
+        self.latency = latency
+        self.down = False
+        self.last_round = 100
+        self.catchup_time = 0
+        self.requests: list[str] = []
+
+    def algod_request(
+        self, method: str, requrl: str, *args: Any, **kwargs: Any
+    ) -> dict[str, Any]:
+        self.requests.append(requrl)
+        time.sleep(self.latency)
+        if self.down:
+            raise ConnectionRefusedError(self.algod_address)
+        if requrl == "/status":
+            return {"last-round": self.last_round, "catchup-time": self.catchup_time}
+        if requrl == "/accounts/unknown":
+            raise AlgodHTTPError("account not found", 404)
+        return {"node": self.algod_address}
+
+
+class StubJsonAlgodClient(StubAlgodNode):
+    """
+    Returns response bodies as bytes, like AlgodClient does for non JSON response formats
+    """
+
+    def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params: ParamsType | None = None,
+        data: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        response_format: str | None = "json",
+    ) -> bytes:
+        response = super().algod_request(method, requrl, params, data, headers)
+        assert response_format == "bytes"
+        return json.dumps(response).encode()
+
+
+class StubAccountAlgodClient(AlgodClient):
+    """
+    Serves msgpack encoded account info
+    """
+
+    def __init__(self, accounts: dict[str, dict]):
+        super().__init__("", "http://localhost:1")
+        self.accounts = accounts
+        self.requests: list[tuple[str, ParamsType | None]] = []
+
+    def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params: ParamsType | None = None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> bytes:
+        self.requests.append((requrl, params))
+        address = requrl.split("/")[-1]
+        return msgpack.packb({"round": 10, **self.accounts[address]})